@@ -1,85 +1,98 @@
 """
 Configuration loader for projects.
 """
+import copy
 import json
 import os
-from typing import Dict, Any
-from google.cloud import secretmanager
+from typing import Dict, Any, Optional, List, Tuple
+from configs.secrets import SecretCache, SecretKey, secret_key
+from utils.deadline import Deadline
 
+# Config keys: {"api_key_secret": "<secret name>", "api_key_secret_version": "<version>"} -> {"api_key": "<value>"}
+SECRET_REFERENCE_KEY = "api_key_secret"
+SECRET_VERSION_KEY = "api_key_secret_version"
+SECRET_VALUE_KEY = "api_key"
 
-def get_secret(secret_name: str, project_id: str = None) -> str:
+# Parsed config files by environment (see preload_configs)
+_file_configs: Dict[str, Dict[str, Any]] = {}
+
+
+def get_secret(secret_name: str, project_id: str = None, deadline: Optional[Deadline] = None, version: Optional[str] = None) -> str:
     """
-    Get secret value from Secret Manager.
+    Get secret value from Secret Manager (cached, see configs/secrets.py).
     
     Args:
         secret_name: Name of the secret
         project_id: Google Cloud project ID (defaults to GOOGLE_CLOUD_PROJECT env)
+        deadline: Optional request deadline (bounds the call timeout and retries)
+        version: Secret version (defaults to "latest")
     
     Returns:
         Secret value as string
+    
+    Raises:
+        SecretError: If the secret does not exist, is not readable or Secret Manager failed
+        DeadlineExceededError: If the deadline ran out before the secret was read
     """
-    if not project_id:
-        project_id = os.getenv("GOOGLE_CLOUD_PROJECT", "pipuli-dev")
-    
-    try:
-        client = secretmanager.SecretManagerServiceClient()
-        secret_path = f"projects/{project_id}/secrets/{secret_name}/versions/latest"
-        response = client.access_secret_version(request={"name": secret_path})
-        return response.payload.data.decode("UTF-8").strip()
-    except Exception:
-        # If secret doesn't exist, return empty string
-        return ""
+    return SecretCache.get(secret_key(secret_name, project_id, version), deadline)
+
+
+def _collect_secret_references(config: Any, found: List[Tuple[Dict[str, Any], str, Optional[str]]]):
+    """Find every dict holding an api_key_secret reference."""
+    if isinstance(config, dict):
+        value = config.get(SECRET_REFERENCE_KEY)
+        if isinstance(value, str):
+            found.append((config, value, config.get(SECRET_VERSION_KEY)))
+        for nested in config.values():
+            if isinstance(nested, (dict, list)):
+                _collect_secret_references(nested, found)
+    elif isinstance(config, list):
+        for item in config:
+            _collect_secret_references(item, found)
 
 
-def resolve_secrets(config: Dict[str, Any], project_id: str = None):
+def resolve_secrets(config: Dict[str, Any], project_id: str = None, deadline: Optional[Deadline] = None):
     """
     Resolve secret references in configuration.
     Replaces api_key_secret references with actual values from Secret Manager.
     
+    References are collected first and fetched concurrently (cached per
+    project, secret and version), so several keys cost one round trip.
+    
     Args:
         config: Configuration dictionary (modified in place)
         project_id: Google Cloud project ID
+        deadline: Optional request deadline for Secret Manager calls
+    
+    Raises:
+        SecretError: If a referenced secret could not be read
+        DeadlineExceededError: If the deadline ran out while reading secrets
     """
-    if isinstance(config, dict):
-        # Create list of keys to avoid modification during iteration
-        keys_to_process = list(config.keys())
-        
-        for key in keys_to_process:
-            value = config[key]
-            if key == "api_key_secret" and isinstance(value, str):
-                # Replace secret name with actual secret value
-                config["api_key"] = get_secret(value, project_id)
-                # Remove the secret name reference
-                config.pop("api_key_secret", None)
-            elif isinstance(value, dict):
-                # Recursively resolve secrets in nested dictionaries
-                resolve_secrets(value, project_id)
-            elif isinstance(value, list):
-                # Handle lists (though unlikely in configs)
-                for item in value:
-                    if isinstance(item, dict):
-                        resolve_secrets(item, project_id)
+    references: List[Tuple[Dict[str, Any], str, Optional[str]]] = []
+    _collect_secret_references(config, references)
+    if not references:
+        return
+    
+    keys: List[SecretKey] = [secret_key(name, project_id, version) for _, name, version in references]
+    values = SecretCache.get_many(keys, deadline)
+    
+    for (target, _, _), key in zip(references, keys):
+        # Replace the secret name reference with the actual value
+        target[SECRET_VALUE_KEY] = values[key]
+        target.pop(SECRET_REFERENCE_KEY, None)
+        target.pop(SECRET_VERSION_KEY, None)
 
 
-def load_config(project_id: str) -> Dict[str, Any]:
+def _read_config_file(env: str) -> Dict[str, Any]:
     """
-    Load project configuration from JSON file.
+    Parse the config file of an environment.
     
     Args:
-        project_id: Project identifier
+        env: Environment name ("dev", "prod", ...)
     
     Returns:
-        Project configuration dictionary
-    
-    Steps:
-        1. Try to load project-specific config: configs/{project_id}.json
-        2. If not found, load default: configs/default.json
-        3. Resolve secrets from Secret Manager
-        4. Add project_id to config
+        Config from {env}.json, else default.json, else a minimal default
     """
-    # Determine environment (default to 'dev')
-    env = os.getenv("ENV", "dev").lower()
-    
     # Get base directory (where configs folder is)
     base_dir = os.path.dirname(os.path.abspath(__file__))
     
@@ -104,6 +117,49 @@ def load_config(project_id: str) -> Dict[str, Any]:
                 "database_id": "(default)"
             }
         }
+    return config
+
+
+def preload_configs(env: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Read and cache the config file of an environment.
+    
+    Config files ship with the image, so they are parsed once per process
+    (at startup, see gateway/warmup.py); load_config() copies the cached
+    version instead of reading the file on every request.
+    
+    Args:
+        env: Environment name (defaults to the ENV env var, "dev")
+    
+    Returns:
+        Cached config, before secret resolution (do not modify)
+    """
+    env = (env or os.getenv("ENV", "dev")).lower()
+    config = _file_configs.get(env)
+    if config is None:
+        config = _file_configs[env] = _read_config_file(env)
+    return config
+
+
+def load_config(project_id: str, deadline: Optional[Deadline] = None) -> Dict[str, Any]:
+    """
+    Load project configuration from JSON file.
+    
+    Args:
+        project_id: Project identifier
+        deadline: Optional request deadline for secret resolution
+    
+    Returns:
+        Project configuration dictionary
+    
+    Steps:
+        1. Copy the cached config of the environment: configs/{env}.json,
+           falling back to configs/default.json
+        2. Resolve secrets from Secret Manager
+        3. Add project_id to config
+    """
+    # Config of the environment (ENV, default 'dev'); the copy is this request's to modify
+    config = copy.deepcopy(preload_configs())
     
     # Add/Ensure project_id (Application Context) is set
     # Note: gcp_project_id should come from the loaded file
@@ -112,6 +168,6 @@ def load_config(project_id: str) -> Dict[str, Any]:
     # Resolve secrets from Secret Manager
     # Use gcp_project_id from config, or fallback to env var
     gcp_project = config.get("gcp_project_id", os.getenv("GOOGLE_CLOUD_PROJECT", "stan-baas"))
-    resolve_secrets(config, gcp_project)
+    resolve_secrets(config, gcp_project, deadline)
     
     return config
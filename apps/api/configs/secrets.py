@@ -0,0 +1,292 @@
+"""
+Cached, concurrent Secret Manager access.
+
+One SecretManagerServiceClient is shared by the process. Values are cached
+per (project, secret, version): fresh for SECRET_CACHE_TTL_SECONDS, then
+served stale for up to SECRET_MAX_STALE_SECONDS while a background refresh
+runs. Concurrent requests for the same secret share one fetch, and
+SecretCache.get_many() reads several secrets in parallel, so a config with
+several third-party keys costs one round trip.
+
+Failures raise SecretError subclasses instead of returning "", so a
+missing secret is not mistaken for an empty one.
+"""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, Future, TimeoutError as FutureTimeoutError
+from typing import Dict, Any, Optional, List, Tuple
+from utils.deadline import Deadline, DeadlineExceededError, is_timeout_error
+from utils.constants import (
+    DEFAULT_SECRET_VERSION,
+    SECRET_CACHE_TTL_SECONDS,
+    SECRET_MAX_STALE_SECONDS,
+    SECRET_FETCH_WORKERS,
+    SECRET_FETCH_TIMEOUT,
+)
+
+# (gcp project, secret name, version)
+SecretKey = Tuple[str, str, str]
+
+
+class SecretError(Exception):
+    """A secret could not be read."""
+    
+    def __init__(self, key: SecretKey, reason: str):
+        self.key = key
+        self.reason = reason
+        super().__init__(f"Secret '{key[1]}' ({key[0]}, version {key[2]}): {reason}")
+
+
+class SecretNotFoundError(SecretError):
+    """The secret or version does not exist."""
+
+
+class SecretAccessDeniedError(SecretError):
+    """The service account may not read the secret."""
+
+
+class SecretUnavailableError(SecretError):
+    """Secret Manager failed or could not be reached."""
+
+
+def default_gcp_project() -> str:
+    """Project used when a secret reference does not name one."""
+    return os.getenv("GOOGLE_CLOUD_PROJECT", "pipuli-dev")
+
+
+def secret_key(secret_name: str, project_id: Optional[str] = None, version: Optional[str] = None) -> SecretKey:
+    """
+    Build the cache key of a secret.
+    
+    Args:
+        secret_name: Secret name
+        project_id: GCP project (defaults to GOOGLE_CLOUD_PROJECT)
+        version: Secret version (defaults to "latest")
+    
+    Returns:
+        (project, secret, version)
+    """
+    return (project_id or default_gcp_project(), secret_name, str(version or DEFAULT_SECRET_VERSION))
+
+
+class _Entry:
+    """A cached secret value."""
+    
+    __slots__ = ("value", "fetched_at")
+    
+    def __init__(self, value: str, fetched_at: float):
+        self.value = value
+        self.fetched_at = fetched_at
+
+
+class SecretCache:
+    """
+    Process-wide secret cache with a shared client and stale-while-revalidate.
+    """
+    
+    _client = None
+    _executor: Optional[ThreadPoolExecutor] = None
+    _entries: Dict[SecretKey, _Entry] = {}
+    _inflight: Dict[SecretKey, Future] = {}
+    _lock = threading.Lock()
+    _stats = {"hits": 0, "stale_hits": 0, "misses": 0, "refreshes": 0, "errors": 0}
+    
+    ttl_seconds = SECRET_CACHE_TTL_SECONDS
+    max_stale_seconds = SECRET_MAX_STALE_SECONDS
+    
+    @classmethod
+    def client(cls):
+        """Shared SecretManagerServiceClient, created on first use."""
+        if cls._client is None:
+            with cls._lock:
+                if cls._client is None:
+                    from google.cloud import secretmanager
+                    cls._client = secretmanager.SecretManagerServiceClient()
+        return cls._client
+    
+    @classmethod
+    def reset(cls):
+        """
+        Drop cached values, in-flight fetches and the client.
+        
+        Needed in child processes after fork: gRPC channels must not be
+        shared across a fork.
+        """
+        with cls._lock:
+            cls._client = None
+            cls._executor = None
+            cls._entries = {}
+            cls._inflight = {}
+    
+    @classmethod
+    def _pool(cls) -> ThreadPoolExecutor:
+        if cls._executor is None:
+            with cls._lock:
+                if cls._executor is None:
+                    cls._executor = ThreadPoolExecutor(max_workers=SECRET_FETCH_WORKERS, thread_name_prefix="secrets")
+        return cls._executor
+    
+    @classmethod
+    def _fetch(cls, key: SecretKey) -> str:
+        """
+        Read a secret version from Secret Manager (no caching).
+        
+        Fetches are shared between requests, so they run with their own
+        timeout; each request bounds only its wait by its deadline.
+        """
+        project_id, secret_name, version = key
+        try:
+            response = cls.client().access_secret_version(
+                request={"name": f"projects/{project_id}/secrets/{secret_name}/versions/{version}"},
+                timeout=SECRET_FETCH_TIMEOUT
+            )
+        except Exception as e:
+            raise cls._classify(key, e) from e
+        return response.payload.data.decode("UTF-8").strip()
+    
+    @staticmethod
+    def _classify(key: SecretKey, error: Exception) -> SecretError:
+        """Map a client exception to a SecretError subclass."""
+        try:
+            from google.api_core import exceptions as gcp_exceptions
+        except ImportError:
+            gcp_exceptions = None
+        if gcp_exceptions is not None:
+            if isinstance(error, gcp_exceptions.NotFound):
+                return SecretNotFoundError(key, "not found")
+            if isinstance(error, gcp_exceptions.PermissionDenied):
+                return SecretAccessDeniedError(key, "permission denied")
+        if is_timeout_error(error):
+            return SecretUnavailableError(key, f"timed out after {SECRET_FETCH_TIMEOUT}s")
+        return SecretUnavailableError(key, str(error) or type(error).__name__)
+    
+    @classmethod
+    def _start_fetch(cls, key: SecretKey) -> Future:
+        """Start the fetch of a key, or join the one in flight."""
+        pool = cls._pool()
+        with cls._lock:
+            future = cls._inflight.get(key)
+            if future is None:
+                future = pool.submit(cls._fetch_and_store, key)
+                cls._inflight[key] = future
+            return future
+    
+    @classmethod
+    def _fetch_and_store(cls, key: SecretKey) -> str:
+        try:
+            value = cls._fetch(key)
+        except Exception:
+            with cls._lock:
+                cls._stats["errors"] += 1
+            raise
+        else:
+            with cls._lock:
+                cls._entries[key] = _Entry(value, time.monotonic())
+            return value
+        finally:
+            with cls._lock:
+                cls._inflight.pop(key, None)
+    
+    @classmethod
+    def get_many(cls, keys: List[SecretKey], deadline: Optional[Deadline] = None) -> Dict[SecretKey, str]:
+        """
+        Resolve several secrets, fetching the missing ones concurrently.
+        
+        Args:
+            keys: Secret keys (see secret_key())
+            deadline: Optional request deadline (bounds the wait for fetches)
+        
+        Returns:
+            key -> value
+        
+        Raises:
+            SecretError: If a secret could not be read and no usable cached
+                value exists (the first failure's type; the message lists all)
+            DeadlineExceededError: If the deadline ran out while waiting
+        """
+        now = time.monotonic()
+        values: Dict[SecretKey, str] = {}
+        pending: Dict[SecretKey, Future] = {}
+        
+        for key in dict.fromkeys(keys):
+            with cls._lock:
+                entry = cls._entries.get(key)
+                age = now - entry.fetched_at if entry else None
+                if entry and age < cls.ttl_seconds:
+                    state = "hits"
+                elif entry and age < cls.ttl_seconds + cls.max_stale_seconds:
+                    state = "stale_hits"
+                else:
+                    state = "misses"
+                cls._stats[state] += 1
+                refresh = state == "stale_hits" and key not in cls._inflight
+                if refresh:
+                    cls._stats["refreshes"] += 1
+            
+            if state == "misses":
+                pending[key] = cls._start_fetch(key)
+                continue
+            values[key] = entry.value
+            if refresh:
+                # Serve stale and refresh in the background; a failed refresh keeps the stale value
+                cls._start_fetch(key)
+        
+        errors: List[Exception] = []
+        for key, future in pending.items():
+            try:
+                timeout = deadline.timeout(operation=f"reading secret '{key[1]}'") if deadline else None
+                values[key] = future.result(timeout=timeout)
+            except FutureTimeoutError:
+                raise DeadlineExceededError(f"Timed out reading secret '{key[1]}'")
+            except DeadlineExceededError:
+                # Raised by deadline.timeout(): the gateway answers 504, not a secret error
+                raise
+            except Exception as e:
+                errors.append(e)
+        
+        if errors:
+            first = errors[0]
+            if len(errors) == 1 or not isinstance(first, SecretError):
+                raise first
+            # Futures are shared between requests: report all failures on a new exception
+            others = "; ".join(str(e) for e in errors[1:])
+            raise type(first)(first.key, f"{first.reason} (also failed: {others})") from first
+        return values
+    
+    @classmethod
+    def get(cls, key: SecretKey, deadline: Optional[Deadline] = None) -> str:
+        """
+        Resolve one secret.
+        
+        Args:
+            key: Secret key (see secret_key())
+            deadline: Optional request deadline
+        
+        Returns:
+            Secret value
+        
+        Raises:
+            SecretError: If the secret could not be read
+            DeadlineExceededError: If the deadline ran out while waiting
+        """
+        return cls.get_many([key], deadline)[key]
+    
+    @classmethod
+    def invalidate(cls, key: SecretKey):
+        """Forget a cached value (e.g. after a rotation was detected)."""
+        with cls._lock:
+            cls._entries.pop(key, None)
+    
+    @classmethod
+    def age(cls, key: SecretKey) -> Optional[float]:
+        """Seconds since a key was fetched, or None if not cached."""
+        with cls._lock:
+            entry = cls._entries.get(key)
+        return time.monotonic() - entry.fetched_at if entry else None
+    
+    @classmethod
+    def stats(cls) -> Dict[str, Any]:
+        """Cache counters and size."""
+        with cls._lock:
+            return {**cls._stats, "entries": len(cls._entries), "inflight": len(cls._inflight)}
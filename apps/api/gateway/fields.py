@@ -0,0 +1,41 @@
+"""
+Sparse fieldset parsing for the `fields` request parameter.
+"""
+import re
+from typing import List, Optional
+from utils.constants import MAX_FIELDS
+
+FIELD_PATH_PATTERN = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z_][A-Za-z0-9_]*)*$")
+
+
+def parse_fields(value: Optional[str]) -> Optional[List[str]]:
+    """
+    Parse a comma-separated fields parameter.
+    
+    Args:
+        value: Raw parameter value (e.g. "name,type,balance")
+    
+    Returns:
+        List of unique field paths in request order, or None if not provided
+    
+    Raises:
+        ValueError: If a field path is invalid or too many fields are requested
+    """
+    if value is None:
+        return None
+    
+    fields = []
+    for raw in value.split(","):
+        field = raw.strip()
+        if not field:
+            continue
+        if not FIELD_PATH_PATTERN.match(field):
+            raise ValueError(f"Invalid field name: '{field}'")
+        if field not in fields:
+            fields.append(field)
+    
+    if not fields:
+        return None
+    if len(fields) > MAX_FIELDS:
+        raise ValueError(f"Too many fields requested (max {MAX_FIELDS})")
+    return fields
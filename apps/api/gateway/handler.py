@@ -5,6 +5,9 @@ import importlib
 import os
 from typing import Dict, Any, Optional
 from utils.logger import Logger
+from utils.deadline import Deadline, DeadlineExceededError
+from utils.messages import ErrorMessages
+from utils.constants import DEADLINE_KEY, ERROR_DEADLINE_EXCEEDED
 from configs.loader import load_config
 from response.formatter import error_response
 
@@ -13,7 +16,8 @@ async def handle_request(
     project_id: str,
     flow_name: str,
     body: Dict[str, Any],
-    logger: Optional[Logger] = None
+    logger: Optional[Logger] = None,
+    deadline: Optional[Deadline] = None
 ) -> Dict[str, Any]:
     """
     Handle incoming request and route to appropriate workflow.
@@ -23,6 +27,8 @@ async def handle_request(
         flow_name: Workflow name to execute
         body: Request body data
         logger: Logger instance for logging
+        deadline: Optional request deadline, passed to the workflow's
+            services through config["_deadline"]
     
     Returns:
         Response from workflow execution
@@ -36,8 +42,9 @@ async def handle_request(
         # Load project configuration
         if handler_logger:
             handler_logger.info("Loading project configuration")
-        config = load_config(project_id)
-
+        config = load_config(project_id, deadline)
+        if deadline:
+            config[DEADLINE_KEY] = deadline
         
         if handler_logger:
             handler_logger.info("Configuration loaded", {"config_keys": list(config.keys())})
@@ -94,6 +101,16 @@ async def handle_request(
         
         return response
         
+    except DeadlineExceededError as e:
+        if handler_logger:
+            handler_logger.error("Request deadline exceeded", error=e, data={
+                "flow_name": flow_name,
+                "elapsed_ms": round(deadline.elapsed() * 1000, 1) if deadline else None
+            })
+        return error_response(
+            error=ERROR_DEADLINE_EXCEEDED,
+            message=ErrorMessages.DEADLINE_EXCEEDED
+        )
     except Exception as e:
         if handler_logger:
             handler_logger.error("Error handling request", error=e, data={"flow_name": flow_name, "project_id": project_id})
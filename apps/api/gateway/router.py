@@ -2,16 +2,47 @@
 Gateway router for handling API requests.
 """
 from fastapi import APIRouter, Header, HTTPException, Request
+from fastapi.responses import JSONResponse
 from typing import Optional, Dict, Any
 from gateway.validator import validate_api_key
 from gateway.handler import handle_request
+from gateway.fields import parse_fields
+from gateway.schemas import SchemaRegistry
 from utils.logger import Logger
+from utils.deadline import Deadline, DeadlineExceededError, default_request_timeout, resolve_request_timeout
+from utils.messages import ErrorMessages
 from services.auth import AuthService
-from response.formatter import error_response as format_error_response
+from response.formatter import error_response as format_error_response, select_fields
+from utils.constants import FIELDS_PARAM, FIELDS_KEY, DEADLINE_KEY, ERROR_DEADLINE_EXCEEDED, ERROR_INVALID_INPUT
 
 router = APIRouter()
 
 
+def _deadline_exceeded(logger: Logger, deadline: Deadline, error: Optional[Exception] = None):
+    """
+    Log and raise the 504 response for an exhausted request deadline.
+    
+    Args:
+        logger: Request logger
+        deadline: Request deadline
+        error: Optional exception that signalled the timeout
+    
+    Raises:
+        HTTPException: Always (504)
+    """
+    logger.for_module("gateway").error("Request deadline exceeded", error=error, data={
+        "timeout": deadline.seconds,
+        "elapsed_ms": round(deadline.elapsed() * 1000, 1)
+    })
+    error_response = format_error_response(
+        error=ERROR_DEADLINE_EXCEEDED,
+        message=ErrorMessages.DEADLINE_EXCEEDED
+    )
+    logger.save_response(504, error_response)
+    logger.save()
+    raise HTTPException(status_code=504, detail=error_response.get("message"))
+
+
 @router.api_route("/{project_id}/{flow_name}", methods=["GET", "POST"])
 async def process_request(
     project_id: str,
@@ -33,6 +64,9 @@ async def process_request(
     Returns:
         Response from workflow execution
     """
+    # Request budget starts now; narrowed to the project/flow timeout once config is loaded
+    deadline = Deadline(default_request_timeout())
+    
     # Initialize logger
     logger = Logger(project_id, flow_name)
     gateway_logger = logger.for_module("gateway")
@@ -55,6 +89,8 @@ async def process_request(
     # Merge Query Parameters into body
     # This allows GET requests to pass data to workflows
     query_params = dict(request.query_params)
+    # Sparse fieldset is a gateway concern, not workflow input
+    fields_param = query_params.pop(FIELDS_PARAM, None)
     if query_params:
         body.update(query_params)
         gateway_logger.info("Merged query parameters into body", {"params": list(query_params.keys())})
@@ -85,8 +121,10 @@ async def process_request(
     try:
         # Validate API key via Secret Manager
         gateway_logger.info("Validating API key")
-        validate_api_key(x_api_key)
+        validate_api_key(x_api_key, deadline)
         gateway_logger.info("API key validated successfully")
+    except DeadlineExceededError as e:
+        _deadline_exceeded(logger, deadline, e)
     except ValueError as e:
         gateway_logger.error("API key validation failed", error=e)
         error_response = format_error_response(
@@ -97,12 +135,43 @@ async def process_request(
         logger.save()
         raise HTTPException(status_code=401, detail=error_response.get("message"))
     
+    # Check the workflow's declared input schema (only for authenticated callers,
+    # so the input contract is not exposed) before loading config or verifying tokens
+    schema = SchemaRegistry.get(project_id, flow_name)
+    if schema:
+        violations = schema.validate(body.get("data", body))
+        if violations:
+            gateway_logger.warning("Input schema violations", {"violations": violations})
+            error_response = format_error_response(
+                error=ERROR_INVALID_INPUT,
+                message=ErrorMessages.INVALID_INPUT,
+                details={"violations": violations}
+            )
+            logger.save_response(400, error_response)
+            logger.save()
+            return JSONResponse(status_code=400, content=error_response)
+    
+    # Parse sparse fieldset (?fields=name,type,balance)
+    try:
+        fields = parse_fields(fields_param)
+    except ValueError as e:
+        gateway_logger.warning("Invalid fields parameter", {"fields": fields_param})
+        error_response = format_error_response(
+            error="invalid_fields",
+            message=str(e)
+        )
+        logger.save_response(400, error_response)
+        logger.save()
+        raise HTTPException(status_code=400, detail=error_response.get("message"))
+    
     # Handle request (route to workflow)
     try:
         # Load config first to check for auth requirements
         from configs.loader import load_config
-        config = load_config(project_id)
+        config = load_config(project_id, deadline)
         config["project_id"] = project_id
+        deadline = deadline.with_timeout(resolve_request_timeout(config, project_id, flow_name))
+        config[DEADLINE_KEY] = deadline
         
         # Validate User Token (if auth_project_id is configured)
         if config.get("auth_project_id"):
@@ -147,9 +216,17 @@ async def process_request(
                 logger.save()
                 raise HTTPException(status_code=401, detail=error_response.get("message"))
 
+        if fields:
+            # Workflows pass data["_fields"] to DatabaseService reads as a projection
+            target_dict = body["data"] if isinstance(body.get("data"), dict) else body
+            target_dict[FIELDS_KEY] = fields
+        
         gateway_logger.info("Routing to handler")
         # We pass the modified body with injected auth data
-        response = await handle_request(project_id, flow_name, body, logger)
+        response = await handle_request(project_id, flow_name, body, logger, deadline)
+        
+        if isinstance(response, dict) and response.get("error") == ERROR_DEADLINE_EXCEEDED:
+            _deadline_exceeded(logger, deadline)
         
         # Ensure response is standardized
         if not isinstance(response, dict) or "success" not in response:
@@ -159,12 +236,17 @@ async def process_request(
                 message="Response format error"
             )
         
+        if fields and response.get("success") and "data" in response:
+            response["data"] = select_fields(response["data"], fields)
+        
         gateway_logger.info("Request processed successfully")
         logger.save_response(200, response)
         logger.save()
         return response
     except HTTPException:
         raise
+    except DeadlineExceededError as e:
+        _deadline_exceeded(logger, deadline, e)
     except Exception as e:
         gateway_logger.error("Error processing request", error=e)
         error_response = format_error_response(
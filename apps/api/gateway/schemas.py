@@ -0,0 +1,199 @@
+"""
+Workflow input schemas, checked by the router before dispatch.
+
+A workflow declares its input at module level as INPUT_SCHEMA, either in
+the ValidationService rule format or as a Pydantic model:
+
+    INPUT_SCHEMA = [
+        {"require": ["assetId", "month"]},
+        {"type": {"assetId": str, "contribution": (int, float)}},
+    ]
+
+    class INPUT_SCHEMA(BaseModel):
+        assetId: str
+        contribution: float = 0
+
+Schemas are compiled once when the app starts (SchemaRegistry.load). The
+router checks them right after API key validation, so unauthenticated
+callers never see a flow's input contract, and a bad request is rejected
+before config loading, token verification and workflow execution.
+"""
+import importlib
+import os
+import pkgutil
+import threading
+from types import ModuleType
+from typing import Dict, Any, Optional, List, Tuple
+from services.validation import ValidationService, CompiledRules
+from utils.logger import Logger
+from utils.constants import WORKFLOW_SCHEMA_ATTRIBUTE, WORKFLOWS_PACKAGE
+
+
+def _workflow_key(project_id: str, flow_name: str) -> Tuple[str, str]:
+    """Registry key, sanitized the way the handler builds module paths."""
+    return project_id.replace("-", "_"), flow_name.replace("-", "_")
+
+
+class InputSchema:
+    """
+    A compiled workflow input schema.
+    """
+    
+    def __init__(self, declaration: Any):
+        """
+        Compile a schema declaration.
+        
+        Args:
+            declaration: Rule list (ValidationService format) or Pydantic model class
+        
+        Raises:
+            ValueError: If the declaration is neither, or a rule is invalid
+        """
+        self.model = None
+        self.rules: Optional[CompiledRules] = None
+        
+        if isinstance(declaration, list):
+            self.rules = ValidationService.compile(declaration)
+            return
+        
+        try:
+            from pydantic import BaseModel
+        except ImportError:
+            BaseModel = None
+        if BaseModel is not None and isinstance(declaration, type) and issubclass(declaration, BaseModel):
+            self.model = declaration
+            return
+        
+        raise ValueError(f"{WORKFLOW_SCHEMA_ATTRIBUTE} must be a rule list or a Pydantic model, got {type(declaration).__name__}")
+    
+    def validate(self, data: Any) -> List[Dict[str, Any]]:
+        """
+        List every violation of the schema.
+        
+        Args:
+            data: Workflow input (the request body's "data", or the body itself)
+        
+        Returns:
+            Violations ({"field", "message"}); empty if the input is valid
+        """
+        if not isinstance(data, dict):
+            return [{"message": "Request data must be a JSON object"}]
+        
+        if self.rules is not None:
+            return self.rules.errors(data)
+        
+        from pydantic import ValidationError
+        try:
+            self.model.model_validate(data)
+        except ValidationError as e:
+            violations = []
+            for error in e.errors():
+                field = ".".join(str(part) for part in error["loc"])
+                violations.append({"field": field, "message": error["msg"]} if field else {"message": error["msg"]})
+            return violations
+        return []
+
+
+class SchemaRegistry:
+    """
+    Process-wide registry of workflow input schemas, keyed by (project, flow).
+    """
+    
+    _schemas: Dict[Tuple[str, str], InputSchema] = {}
+    # Every workflow module imported by load(), with or without a schema
+    _modules: Dict[Tuple[str, str], ModuleType] = {}
+    _loaded = False
+    _lock = threading.Lock()
+    
+    @classmethod
+    def load(cls, package: str = WORKFLOWS_PACKAGE, logger: Optional[Logger] = None) -> int:
+        """
+        Import every workflow module and compile the schemas they declare.
+        
+        Workflows live at {package}/{project}/{flow}.py. Modules that fail
+        to import are skipped (the handler reports them when called);
+        invalid schema declarations raise, so they fail at startup.
+        
+        Args:
+            package: Workflows package
+            logger: Optional logger
+        
+        Returns:
+            Number of schemas registered
+        
+        Raises:
+            ValueError: If a workflow declares an invalid schema
+        """
+        registry_logger = logger.for_module("schemas") if logger else None
+        root = importlib.import_module(package)
+        schemas: Dict[Tuple[str, str], InputSchema] = {}
+        modules: Dict[Tuple[str, str], ModuleType] = {}
+        
+        for project in pkgutil.iter_modules([os.path.dirname(root.__file__)]):
+            if not project.ispkg:
+                continue
+            project_module = importlib.import_module(f"{package}.{project.name}")
+            for flow in pkgutil.iter_modules(project_module.__path__):
+                path = f"{package}.{project.name}.{flow.name}"
+                try:
+                    module = importlib.import_module(path)
+                except Exception as e:
+                    if registry_logger:
+                        registry_logger.warning("Skipping workflow that failed to import", {"module": path, "error": str(e)})
+                    continue
+                modules[(project.name, flow.name)] = module
+                declaration = getattr(module, WORKFLOW_SCHEMA_ATTRIBUTE, None)
+                if declaration is None:
+                    continue
+                try:
+                    schemas[(project.name, flow.name)] = InputSchema(declaration)
+                except ValueError as e:
+                    raise ValueError(f"Invalid {WORKFLOW_SCHEMA_ATTRIBUTE} in {path}: {e}") from e
+        
+        with cls._lock:
+            cls._schemas = schemas
+            cls._modules = modules
+            cls._loaded = True
+        
+        if registry_logger:
+            registry_logger.info("Workflow input schemas loaded", {"schemas": len(schemas), "workflows": len(modules)})
+        return len(schemas)
+    
+    @classmethod
+    def get(cls, project_id: str, flow_name: str) -> Optional[InputSchema]:
+        """
+        Schema of a workflow, or None if it declares none (or schemas were not loaded).
+        
+        Args:
+            project_id: Project identifier
+            flow_name: Workflow name
+        """
+        return cls._schemas.get(_workflow_key(project_id, flow_name))
+    
+    @classmethod
+    def register(cls, project_id: str, flow_name: str, declaration: Any) -> InputSchema:
+        """
+        Register (or replace) one workflow's schema.
+        
+        Args:
+            project_id: Project identifier
+            flow_name: Workflow name
+            declaration: Rule list or Pydantic model class
+        
+        Returns:
+            Compiled schema
+        """
+        schema = InputSchema(declaration)
+        with cls._lock:
+            cls._schemas = {**cls._schemas, _workflow_key(project_id, flow_name): schema}
+        return schema
+    
+    @classmethod
+    def modules(cls) -> Dict[Tuple[str, str], ModuleType]:
+        """Workflow modules imported by load(), keyed by (project, flow) package names."""
+        return dict(cls._modules)
+    
+    @classmethod
+    def loaded(cls) -> bool:
+        """Whether load() has run in this process."""
+        return cls._loaded
@@ -1,47 +1,68 @@
 """
 API key validation using Google Cloud Secret Manager.
 """
-from google.cloud import secretmanager
+from typing import Optional
+from configs.secrets import SecretCache, SecretError, SecretKey, SecretNotFoundError, secret_key
+from utils.deadline import Deadline, DeadlineExceededError
+from utils.constants import SECRET_RECHECK_SECONDS
 import os
 
 
 def get_secret_manager_client():
-    """Get Secret Manager client."""
-    return secretmanager.SecretManagerServiceClient()
+    """Get the shared Secret Manager client."""
+    return SecretCache.client()
 
 
-def validate_api_key(api_key: str) -> None:
+def api_key_secret() -> SecretKey:
     """
-    Validate API key against Secret Manager.
+    Secret holding the gateway API key for this deployment.
     
-    Args:
-        api_key: API key to validate
+    Returns:
+        Secret key (see configs/secrets.py)
     
     Raises:
-        ValueError: If API key is invalid
+        ValueError: If the GCP project is not allowed for API key validation
     """
     project_id = os.getenv("GOOGLE_CLOUD_PROJECT", "stan-baas")
     # Valid projects
     if project_id not in ["pipuli-dev", "pipuli-prod"]:
         raise ValueError(f"Project '{project_id}' is not allowed for API key validation.")
-    secret_id = "api-key"
+    return secret_key("api-key", project_id)
+
+
+def validate_api_key(api_key: str, deadline: Optional[Deadline] = None) -> None:
+    """
+    Validate API key against Secret Manager.
+    
+    The stored key is cached (see configs/secrets.py). A rejected key
+    triggers one re-read if the cached value is older than
+    SECRET_RECHECK_SECONDS, so a rotated key is picked up quickly.
+    
+    Args:
+        api_key: API key to validate
+        deadline: Optional request deadline (bounds the wait for Secret Manager)
+    
+    Raises:
+        ValueError: If API key is invalid
+        DeadlineExceededError: If the deadline ran out during validation
+    """
+    key = api_key_secret()
     
     try:
-        client = get_secret_manager_client()
-        secret_name = f"projects/{project_id}/secrets/{secret_id}/versions/latest"
+        stored_api_key = SecretCache.get(key, deadline)
         
-        # Access secret version
-        response = client.access_secret_version(request={"name": secret_name})
-        stored_api_key = response.payload.data.decode("UTF-8").strip()
-        
-        # Compare API keys
         if api_key != stored_api_key:
-            raise ValueError("Invalid API key")
+            age = SecretCache.age(key)
+            if age is None or age < SECRET_RECHECK_SECONDS:
+                raise ValueError("Invalid API key")
+            # Possibly rotated since it was cached: re-read once
+            SecretCache.invalidate(key)
+            if api_key != SecretCache.get(key, deadline):
+                raise ValueError("Invalid API key")
             
-    except Exception as e:
-        # If secret doesn't exist or other error, raise validation error
-        error_msg = str(e)
-        if "not found" in error_msg.lower():
-            raise ValueError("API key secret not configured.")
-        raise ValueError(f"API key validation failed: {error_msg}")
-
+    except (DeadlineExceededError, ValueError):
+        raise
+    except SecretNotFoundError:
+        raise ValueError("API key secret not configured.")
+    except SecretError as e:
+        raise ValueError(f"API key validation failed: {e.reason}")
@@ -0,0 +1,186 @@
+"""
+Instance warm-up, run by the lifespan hook in main.py.
+
+Without it the first request on a new instance pays for importing the
+workflow, reading the config file, building clients and fetching secrets.
+Warm-up moves that work to startup in two phases:
+
+1. preload(): import every workflow (compiling input schemas) and parse the
+   config file. No network calls, so it can also run before forking workers.
+2. warm(): build the shared clients (Secret Manager, Firestore, Firebase
+   Auth, Cloud Logging), read the gateway API key, resolve each project's
+   config secrets and run the workflows' optional warm-up calls:
+
+       # workflows/pipuli/get_summary.py
+       def warmup(config, logger):
+           DatabaseService(config, logger).list("assets", limit=1)
+
+/ready answers 200 once warm() has finished; /health stays a cheap liveness
+check. A failed step is logged and listed by /ready but does not keep the
+instance out of service: the first request that needs it retries the work.
+"""
+import threading
+import time
+from typing import Dict, Any, Optional, List, Callable
+from configs.loader import load_config, preload_configs
+from configs.secrets import SecretCache
+from gateway.schemas import SchemaRegistry
+from gateway.validator import api_key_secret
+from services.auth import AuthService
+from services.database import DatabaseService
+from utils.deadline import Deadline
+from utils.logger import Logger
+from utils.constants import DEADLINE_KEY, WARMUP_CALL_TIMEOUT, WORKFLOW_WARMUP_ATTRIBUTE
+
+WARMUP_PENDING = "pending"
+WARMUP_RUNNING = "warming_up"
+WARMUP_READY = "ready"
+
+
+class Warmup:
+    """
+    Process-wide warm-up state, reported by /ready.
+    """
+    
+    _state = WARMUP_PENDING
+    _steps: List[Dict[str, Any]] = []
+    _started_at: Optional[float] = None
+    _finished_at: Optional[float] = None
+    _lock = threading.Lock()
+    
+    @classmethod
+    def preload(cls, logger: Optional[Logger] = None) -> int:
+        """
+        Import every workflow and parse the config file (no network calls).
+        
+        Workflows already loaded in this process (e.g. by serve.py before
+        forking workers) are not imported again.
+        
+        Args:
+            logger: Optional logger
+        
+        Returns:
+            Number of workflow modules imported
+        
+        Raises:
+            ValueError: If a workflow declares an invalid input schema
+        """
+        if not SchemaRegistry.loaded():
+            SchemaRegistry.load(logger=logger)
+        preload_configs()
+        return len(SchemaRegistry.modules())
+    
+    @classmethod
+    def _run_step(cls, name: str, fn: Callable[[], Any], logger: Logger):
+        """Run one warm-up step, recording its duration and any error."""
+        started = time.perf_counter()
+        step: Dict[str, Any] = {"step": name}
+        try:
+            fn()
+        except Exception as e:
+            step["error"] = str(e) or type(e).__name__
+        step["ms"] = round((time.perf_counter() - started) * 1000, 1)
+        
+        with cls._lock:
+            cls._steps.append(step)
+        if "error" in step:
+            logger.warning(f"Warm-up step '{name}' failed", step, module="warmup")
+        else:
+            logger.info(f"Warm-up step '{name}' done", step, module="warmup")
+    
+    @classmethod
+    def warm(cls, logger: Optional[Logger] = None):
+        """
+        Build shared clients, read secrets and run workflow warm-up calls.
+        
+        Runs preload() first if it has not run in this process. Never
+        raises: failures are recorded per step (see status()).
+        
+        Args:
+            logger: Optional logger (a "warmup" logger is created and saved
+                to Cloud Logging if omitted)
+        """
+        own_logger = logger is None
+        logger = logger or Logger(project_id="system", flow_name="warmup")
+        with cls._lock:
+            cls._state = WARMUP_RUNNING
+            cls._steps = []
+            cls._started_at = time.monotonic()
+            cls._finished_at = None
+        
+        try:
+            cls._warm_steps(logger)
+        except Exception as e:
+            # Steps record their own errors; this only catches bugs between them,
+            # which must not leave /ready stuck at 503
+            with cls._lock:
+                cls._steps.append({"step": "warm_up", "error": str(e) or type(e).__name__})
+            logger.error("Warm-up aborted", error=e, module="warmup")
+        
+        with cls._lock:
+            cls._state = WARMUP_READY
+            cls._finished_at = time.monotonic()
+        logger.info("Warm-up complete", cls.status(), module="warmup")
+        
+        if own_logger:
+            # Also creates the shared Cloud Logging client
+            cls._run_step("cloud_logging", logger.save, logger)
+    
+    @classmethod
+    def _warm_steps(cls, logger: Logger):
+        """Run the warm-up steps in order (see warm())."""
+        if not SchemaRegistry.loaded():
+            cls._run_step("preload", lambda: cls.preload(logger), logger)
+        
+        modules = SchemaRegistry.modules()
+        projects = sorted({project for project, _ in modules})
+        configs: Dict[str, Dict[str, Any]] = {}
+        
+        cls._run_step("secret_manager", SecretCache.client, logger)
+        cls._run_step("api_key", lambda: SecretCache.get(api_key_secret(), Deadline(WARMUP_CALL_TIMEOUT)), logger)
+        
+        for project in projects:
+            def load(project=project):
+                configs[project] = load_config(project, Deadline(WARMUP_CALL_TIMEOUT))
+            cls._run_step(f"config:{project}", load, logger)
+            if project not in configs:
+                continue
+            cls._run_step(f"database:{project}", lambda config=configs[project]: DatabaseService(config, logger), logger)
+            cls._run_step(f"auth:{project}", lambda config=configs[project]: AuthService(config, logger).preload(), logger)
+        
+        for (project, flow), module in sorted(modules.items()):
+            warmup_call = getattr(module, WORKFLOW_WARMUP_ATTRIBUTE, None)
+            if not callable(warmup_call) or project not in configs:
+                continue
+            
+            def call(warmup_call=warmup_call, project=project):
+                config = {**configs[project], DEADLINE_KEY: Deadline(WARMUP_CALL_TIMEOUT)}
+                warmup_call(config, logger)
+            cls._run_step(f"workflow:{project}/{flow}", call, logger)
+    
+    @classmethod
+    def ready(cls) -> bool:
+        """Whether warm() has finished in this process."""
+        return cls._state == WARMUP_READY
+    
+    @classmethod
+    def status(cls) -> Dict[str, Any]:
+        """State, duration and per-step timings of the warm-up."""
+        with cls._lock:
+            status: Dict[str, Any] = {"status": cls._state, "steps": [dict(step) for step in cls._steps]}
+            if cls._started_at is not None:
+                finished_at = cls._finished_at if cls._finished_at is not None else time.monotonic()
+                status["duration_ms"] = round((finished_at - cls._started_at) * 1000, 1)
+        failed = [step["step"] for step in status["steps"] if "error" in step]
+        if failed:
+            status["failed_steps"] = failed
+        return status
+    
+    @classmethod
+    def reset(cls):
+        """Forget warm-up state (e.g. in a worker process after fork, before warming it)."""
+        with cls._lock:
+            cls._state = WARMUP_PENDING
+            cls._steps = []
+            cls._started_at = None
+            cls._finished_at = None
@@ -1,11 +1,17 @@
 """
 Main FastAPI application entry point.
 """
+import asyncio
 import os
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from gateway.router import router
+from gateway.warmup import Warmup
+from services.tasks import TaskQueue
+from utils.constants import TASK_DRAIN_TIMEOUT
 from pathlib import Path
 
 # Load environment variables
@@ -13,15 +19,42 @@ load_dotenv()
 
 # Read version
 try:
-    with open("VERSION", "r") as f:
-        VERSION = f.read().strip()
+    VERSION = (Path(__file__).parent / "VERSION").read_text().strip()
 except FileNotFoundError:
     VERSION = "0.0.0"
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Warm the instance up before it takes traffic; drain tasks on shutdown.
+    
+    Workflows are imported (and their input schemas compiled) before the
+    server accepts connections, so no request skips schema checks. Clients,
+    secrets and workflow warm-up calls follow in the background; /ready
+    reports when they are done. Background tasks enqueued by workflows run
+    on the task queue's threads; on shutdown the due ones get
+    TASK_DRAIN_TIMEOUT seconds, the rest stay queued for the next start.
+    """
+    Warmup.preload()
+    TaskQueue.start()
+    # Keep a reference: the event loop only holds tasks weakly
+    app.state.warmup_task = asyncio.create_task(asyncio.to_thread(Warmup.warm))
+    yield
+    app.state.warmup_task.cancel()
+    try:
+        await app.state.warmup_task
+    except asyncio.CancelledError:
+        # The warm-up thread itself cannot be interrupted and finishes on its own
+        pass
+    await asyncio.to_thread(TaskQueue.drain, TASK_DRAIN_TIMEOUT)
+
+
 app = FastAPI(
     title="Pipuli API",
     description="Generic backend for processing API calls from multiple frontend projects",
-    version=VERSION
+    version=VERSION,
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -45,10 +78,16 @@ async def root():
 
 @app.get("/health")
 async def health():
-    """Health check endpoint for monitoring."""
+    """Liveness check: the process is up (see /ready for warm-up)."""
     return {"status": "healthy"}
 
 
+@app.get("/ready")
+async def ready():
+    """Readiness check: 200 once warm-up has finished, 503 before."""
+    return JSONResponse(status_code=200 if Warmup.ready() else 503, content=Warmup.status())
+
+
 @app.get("/version")
 async def version():
     """Get application version."""
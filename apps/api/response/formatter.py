@@ -1,7 +1,7 @@
 """
 Response formatter for standardizing API responses.
 """
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List
 
 
 def success_response(
@@ -65,3 +65,60 @@ def error_response(
     
     return response
 
+
+
+def pick_fields(document: Dict[str, Any], fields: List[str]) -> Dict[str, Any]:
+    """
+    Trim a document to a set of fields. "id" is always kept.
+    
+    Args:
+        document: Document dictionary
+        fields: Field paths to keep (dotted paths select nested fields)
+    
+    Returns:
+        New dictionary containing only the requested fields
+    """
+    result = {"id": document["id"]} if "id" in document else {}
+    for path in fields:
+        parts = path.split(".")
+        source = document
+        for part in parts:
+            if not isinstance(source, dict) or part not in source:
+                break
+            source = source[part]
+        else:
+            target = result
+            for part in parts[:-1]:
+                target = target.setdefault(part, {})
+            target[parts[-1]] = source
+    return result
+
+
+def select_fields(data: Any, fields: Optional[List[str]]) -> Any:
+    """
+    Trim response data to a sparse fieldset.
+    
+    Applies to a document (dict with "id"), a list of documents, or a dict
+    whose values are documents / lists of documents (e.g. {"items": [...]}).
+    Anything else is returned unchanged.
+    
+    Args:
+        data: Response data
+        fields: Field paths to keep (None keeps everything)
+    
+    Returns:
+        Trimmed data
+    """
+    if not fields:
+        return data
+    
+    def trim(value):
+        if isinstance(value, dict) and "id" in value:
+            return pick_fields(value, fields)
+        if isinstance(value, list):
+            return [pick_fields(v, fields) if isinstance(v, dict) and "id" in v else v for v in value]
+        return value
+    
+    if isinstance(data, dict) and "id" not in data:
+        return {key: trim(value) for key, value in data.items()}
+    return trim(data)
@@ -0,0 +1,134 @@
+"""
+Production server: the app under gunicorn with one uvicorn worker per CPU.
+
+A single uvicorn process uses one core for JSON encoding, validation and
+token verification. serve.py runs several worker processes:
+
+- The app, every workflow (input schemas compiled) and the parsed config
+  file are loaded once in the master and shared with the workers
+  copy-on-write. Preloading makes no network calls, so no gRPC channel
+  exists before the fork.
+- After fork each worker drops the process-wide clients it inherited
+  (Secret Manager, Firestore, Cloud Logging) and warms up its own (see
+  gateway/warmup.py).
+- Workers are recycled gracefully after --max-requests requests (plus up to
+  --max-requests-jitter), which bounds memory growth.
+
+Usage:
+    python serve.py                                   # port $PORT, one worker per CPU
+    python serve.py --workers 2 --max-requests 5000
+    WEB_CONCURRENCY=4 MAX_REQUESTS=0 python serve.py  # no recycling
+
+For local development `uvicorn main:app --reload` still works.
+"""
+import argparse
+import gc
+import os
+from typing import Dict, Any
+from gunicorn.app.base import BaseApplication
+from utils.constants import (
+    DEFAULT_WORKER_MAX_REQUESTS,
+    DEFAULT_WORKER_MAX_REQUESTS_JITTER,
+    DEFAULT_WORKER_GRACEFUL_TIMEOUT,
+    DEFAULT_WORKER_TIMEOUT,
+)
+
+
+def available_cpus() -> int:
+    """CPUs this process may run on (respects affinity, unlike os.cpu_count())."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def post_fork(server, worker):
+    """
+    Drop clients inherited from the master.
+    
+    gRPC channels, listener threads and SQLite connections (including the
+    task queue's) must not be shared across a fork; each worker creates its
+    own on warm-up.
+    """
+    from configs.secrets import SecretCache
+    from gateway.warmup import Warmup
+    from services.database import DatabaseService
+    from services.tasks import TaskQueue
+    from utils.logger import Logger
+    
+    SecretCache.reset()
+    Logger.reset_clients()
+    DatabaseService.reset_clients()
+    TaskQueue.reset()
+    Warmup.reset()
+
+
+class Server(BaseApplication):
+    """
+    Gunicorn application serving an already imported ASGI app.
+    """
+    
+    def __init__(self, app, options: Dict[str, Any]):
+        """
+        Initialize server.
+        
+        Args:
+            app: ASGI application (imported before fork)
+            options: Gunicorn settings
+        """
+        self.application = app
+        self.options = options
+        super().__init__()
+    
+    def load_config(self):
+        """Apply the settings to gunicorn's config."""
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+    
+    def load(self):
+        """Return the preloaded app (called once, in the master)."""
+        return self.application
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Run the API with several uvicorn workers")
+    parser.add_argument("--host", default="0.0.0.0", help="Bind address")
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8080")), help="Port (default: $PORT or 8080)")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", "0")) or available_cpus(),
+                        help="Worker processes (default: $WEB_CONCURRENCY or available CPUs)")
+    parser.add_argument("--max-requests", type=int, default=int(os.getenv("MAX_REQUESTS", DEFAULT_WORKER_MAX_REQUESTS)),
+                        help="Requests before a worker is recycled; 0 disables (default: $MAX_REQUESTS)")
+    parser.add_argument("--max-requests-jitter", type=int,
+                        default=int(os.getenv("MAX_REQUESTS_JITTER", DEFAULT_WORKER_MAX_REQUESTS_JITTER)),
+                        help="Random extra requests per worker, so they are not recycled together")
+    parser.add_argument("--graceful-timeout", type=int, default=DEFAULT_WORKER_GRACEFUL_TIMEOUT,
+                        help="Seconds a stopping worker gets to finish in-flight requests")
+    parser.add_argument("--timeout", type=int, default=DEFAULT_WORKER_TIMEOUT,
+                        help="Seconds a worker may be unresponsive before it is restarted")
+    args = parser.parse_args()
+    
+    # Preload before fork: workers share the imported code, workflow registry and configs
+    from main import app
+    from gateway.warmup import Warmup
+    Warmup.preload()
+    # Keep the preloaded objects out of garbage collection, so collections
+    # in the workers do not touch (and copy) the shared pages
+    gc.freeze()
+    
+    Server(app, {
+        "bind": f"{args.host}:{args.port}",
+        "workers": args.workers,
+        "worker_class": "uvicorn.workers.UvicornWorker",
+        "preload_app": True,
+        "max_requests": args.max_requests,
+        "max_requests_jitter": args.max_requests_jitter if args.max_requests else 0,
+        "graceful_timeout": args.graceful_timeout,
+        "timeout": args.timeout,
+        "post_fork": post_fork,
+        "accesslog": "-",
+    }).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,18 @@
 """
 Authentication service for validating Firebase ID Tokens.
 """
-import firebase_admin
-from firebase_admin import auth
-from typing import Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Dict, Any, Optional, TYPE_CHECKING
 from utils.logger import Logger
+from utils.deadline import get_deadline, DeadlineExceededError
+
+if TYPE_CHECKING:
+    import firebase_admin
+
+# Token verification may fetch Google's public keys over HTTP, which the
+# Admin SDK does not bound per call; running it here lets the request
+# give up when its deadline passes
+_verify_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="auth-verify")
 
 
 class AuthService:
@@ -25,8 +33,9 @@ class AuthService:
         self.config = config
         self.logger = logger.for_module("auth")
         self.auth_project_id = config.get("auth_project_id")
+        self.deadline = get_deadline(config)
 
-    def _get_app(self, project_id: str) -> firebase_admin.App:
+    def _get_app(self, project_id: str) -> "firebase_admin.App":
         """
         Get or initialize Firebase App for a specific project.
         
@@ -39,6 +48,9 @@ class AuthService:
         if project_id in self._apps:
             return self._apps[project_id]
         
+        # Imported on first use: the Admin SDK is slow to import and not every project uses auth
+        import firebase_admin
+        
         try:
             # Check if already initialized globally
             return firebase_admin.get_app(name=project_id)
@@ -72,6 +84,19 @@ class AuthService:
             self._apps[project_id] = app
             return app
 
+    def preload(self) -> bool:
+        """
+        Initialize the Firebase App of the configured auth project ahead of
+        the first token check (see gateway/warmup.py).
+        
+        Returns:
+            True if auth is configured and the app is ready
+        """
+        if not self.auth_project_id:
+            return False
+        self._get_app(self.auth_project_id)
+        return True
+
     def validate_token(self, token: str) -> Dict[str, Any]:
         """
         Validate Firebase ID Token.
@@ -84,6 +109,7 @@ class AuthService:
             
         Raises:
             ValueError: If token is invalid or auth is not configured
+            DeadlineExceededError: If the request deadline ran out during validation
         """
         if not self.auth_project_id:
             self.logger.warning("No auth_project_id configured, skipping token validation")
@@ -91,14 +117,25 @@ class AuthService:
 
         try:
             app = self._get_app(self.auth_project_id)
+            from firebase_admin import auth
             
             # Verify token
             # This validates the signature, expiration, and 'aud' (project_id)
-            decoded_token = auth.verify_id_token(token, app=app)
+            if self.deadline:
+                future = _verify_executor.submit(auth.verify_id_token, token, app=app)
+                decoded_token = future.result(timeout=self.deadline.timeout(operation="token validation"))
+            else:
+                decoded_token = auth.verify_id_token(token, app=app)
             
             self.logger.info("Token validated successfully", {"uid": decoded_token.get("uid")})
             return decoded_token
             
+        except DeadlineExceededError:
+            self.logger.error("Token validation skipped: request deadline exceeded")
+            raise
+        except FutureTimeoutError as e:
+            self.logger.error("Token validation timed out", data={"timeout": self.deadline.seconds})
+            raise DeadlineExceededError("Timed out validating authentication token") from e
         except Exception as e:
             self.logger.error(f"Token validation failed for project {self.auth_project_id}", error=e)
             raise ValueError(f"Invalid authentication token: {str(e)}")
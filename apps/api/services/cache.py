@@ -0,0 +1,176 @@
+"""
+In-process LRU cache for Firestore documents.
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+# Returned by DocumentCache.get when a "not found" result is cached
+NOT_FOUND = object()
+
+
+class DocumentCache:
+    """
+    Memory-bounded LRU cache of documents keyed by (collection, document_id).
+    
+    Entries expire after a per-collection TTL. Missing documents can be
+    cached for a shorter negative TTL. All operations are thread-safe.
+    """
+    
+    def __init__(
+        self,
+        max_entries: int = 10000,
+        ttl_seconds: float = 30.0,
+        negative_ttl_seconds: float = 5.0,
+        collection_ttls: Optional[Dict[str, float]] = None
+    ):
+        """
+        Initialize cache.
+        
+        Args:
+            max_entries: Maximum number of cached documents (LRU eviction beyond)
+            ttl_seconds: Default TTL for documents
+            negative_ttl_seconds: TTL for "not found" results (0 disables negative caching)
+            collection_ttls: Optional per-collection TTL overrides
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.collection_ttls = collection_ttls or {}
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {
+            "hits": 0,
+            "negative_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "invalidations": 0
+        }
+    
+    @classmethod
+    def from_config(cls, cache_config: Dict[str, Any]) -> "DocumentCache":
+        """
+        Build a cache from the `database.cache` config section.
+        
+        Args:
+            cache_config: Cache configuration
+        
+        Returns:
+            DocumentCache instance
+        """
+        return cls(
+            max_entries=cache_config.get("max_entries", 10000),
+            ttl_seconds=cache_config.get("ttl_seconds", 30.0),
+            negative_ttl_seconds=cache_config.get("negative_ttl_seconds", 5.0),
+            collection_ttls=cache_config.get("collection_ttls")
+        )
+    
+    def get(self, collection: str, document_id: str) -> Optional[Any]:
+        """
+        Look up a document.
+        
+        Args:
+            collection: Collection name
+            document_id: Document ID
+        
+        Returns:
+            A copy of the cached document, NOT_FOUND for a cached miss,
+            or None if nothing usable is cached
+        """
+        key = (collection, document_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self._stats["expirations"] += 1
+                self._stats["misses"] += 1
+                return None
+            
+            self._entries.move_to_end(key)
+            if value is NOT_FOUND:
+                self._stats["negative_hits"] += 1
+                return NOT_FOUND
+            self._stats["hits"] += 1
+        
+        return copy.deepcopy(value)
+    
+    def set(self, collection: str, document_id: str, document: Dict[str, Any]):
+        """
+        Cache a document.
+        
+        Args:
+            collection: Collection name
+            document_id: Document ID
+            document: Document data
+        """
+        ttl = self.collection_ttls.get(collection, self.ttl_seconds)
+        if ttl <= 0:
+            return
+        self._store((collection, document_id), ttl, copy.deepcopy(document))
+    
+    def set_not_found(self, collection: str, document_id: str):
+        """
+        Cache a "not found" result.
+        
+        Args:
+            collection: Collection name
+            document_id: Document ID
+        """
+        if self.negative_ttl_seconds <= 0:
+            return
+        self._store((collection, document_id), self.negative_ttl_seconds, NOT_FOUND)
+    
+    def invalidate(self, collection: str, document_id: str):
+        """
+        Drop a cached document (after a write from this process).
+        
+        Args:
+            collection: Collection name
+            document_id: Document ID
+        """
+        with self._lock:
+            if self._entries.pop((collection, document_id), None) is not None:
+                self._stats["invalidations"] += 1
+    
+    def clear(self):
+        """Drop every cached entry."""
+        with self._lock:
+            self._entries.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+        
+        Returns:
+            Counters plus current size and hit ratio
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["size"] = len(self._entries)
+        lookups = stats["hits"] + stats["negative_hits"] + stats["misses"]
+        stats["hit_ratio"] = (stats["hits"] + stats["negative_hits"]) / lookups if lookups else 0.0
+        return stats
+    
+    def _store(self, key: Tuple[str, str], ttl: float, value: Any):
+        """
+        Insert an entry and evict least recently used entries beyond capacity.
+        
+        Args:
+            key: (collection, document_id)
+            ttl: Time to live in seconds
+            value: Document or NOT_FOUND
+        """
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
@@ -0,0 +1,161 @@
+"""
+Sharded counters for hot aggregate values.
+
+A counter is spread over N shard documents in `counters/{name}/shards`.
+Increments go to a random shard, so sustained write throughput scales with
+N instead of being capped by the single-document write limit; reads sum
+all shards.
+"""
+import random
+import threading
+import time
+from typing import Dict, Any, Optional, Tuple, TYPE_CHECKING
+from services.storage.base import Increment, DocumentNotFoundError
+from utils.constants import (
+    COLLECTION_COUNTERS,
+    COUNTER_SHARDS_SUBCOLLECTION,
+    COUNTER_VALUE_FIELD,
+    DEFAULT_COUNTER_SHARDS,
+    MAX_COUNTER_SHARDS,
+)
+
+if TYPE_CHECKING:
+    from services.database import DatabaseService, TransactionView
+
+
+class ShardedCounter:
+    """
+    Counter distributed over N shard documents.
+    
+    Usage:
+        counter = db.counter("user_totals_u1")
+        counter.increment(150.0)
+        total = counter.value()
+    """
+    
+    # Cached totals shared by all instances: (scope, name) -> (expires_at, value)
+    _values: Dict[Tuple[Any, str], Tuple[float, float]] = {}
+    _values_lock = threading.Lock()
+    
+    def __init__(
+        self,
+        db: "DatabaseService",
+        name: str,
+        num_shards: int = DEFAULT_COUNTER_SHARDS,
+        cache_ttl_seconds: float = 0.0
+    ):
+        """
+        Initialize counter.
+        
+        Args:
+            db: Database service
+            name: Counter name (document ID in the counters collection)
+            num_shards: Number of shards increments are spread over
+            cache_ttl_seconds: How long value() may serve a cached total (0 disables)
+        
+        Raises:
+            ValueError: If num_shards is out of range
+        """
+        if not 1 <= num_shards <= MAX_COUNTER_SHARDS:
+            raise ValueError(f"num_shards must be between 1 and {MAX_COUNTER_SHARDS}")
+        self.db = db
+        self.name = name
+        self.num_shards = num_shards
+        self.cache_ttl_seconds = cache_ttl_seconds
+        self.collection = f"{COLLECTION_COUNTERS}/{name}/{COUNTER_SHARDS_SUBCOLLECTION}"
+        self._cache_key = (db.cache_scope, name)
+    
+    def _shard_id(self, index: int) -> str:
+        """Document ID of a shard."""
+        return str(index)
+    
+    def initialize(self):
+        """
+        Create missing shard documents with a zero count.
+        
+        Existing shards are left untouched, so this is safe to call on a
+        live counter (e.g. after raising num_shards).
+        """
+        def create_missing(txn: "TransactionView"):
+            shard_ids = [self._shard_id(i) for i in range(self.num_shards)]
+            missing = [shard_id for shard_id in shard_ids if txn.get(self.collection, shard_id) is None]
+            for shard_id in missing:
+                txn.set(self.collection, shard_id, {COUNTER_VALUE_FIELD: 0})
+            return len(missing)
+        
+        return self.db.run_transaction(create_missing)
+    
+    def increment(self, amount: float = 1):
+        """
+        Add an amount to a random shard.
+        
+        Shards are created on first use. The write is a server-side
+        increment, so concurrent increments never contend on a read.
+        
+        Args:
+            amount: Value to add (negative to subtract)
+        """
+        shard_id = self._shard_id(random.randrange(self.num_shards))
+        try:
+            self.db.backend.update(self.collection, shard_id, {COUNTER_VALUE_FIELD: Increment(amount)})
+        except DocumentNotFoundError:
+            self.initialize()
+            self.db.backend.update(self.collection, shard_id, {COUNTER_VALUE_FIELD: Increment(amount)})
+        
+        with self._values_lock:
+            cached = self._values.get(self._cache_key)
+            if cached:
+                self._values[self._cache_key] = (cached[0], cached[1] + amount)
+    
+    def value(self, use_cache: bool = True) -> float:
+        """
+        Read the counter total (sum of all shards).
+        
+        All shard documents are summed, including shards beyond num_shards,
+        so lowering the shard count never loses counts.
+        
+        Args:
+            use_cache: Serve a cached total if younger than cache_ttl_seconds
+        
+        Returns:
+            Counter total (0 if the counter does not exist)
+        """
+        now = time.monotonic()
+        if use_cache and self.cache_ttl_seconds > 0:
+            with self._values_lock:
+                cached = self._values.get(self._cache_key)
+            if cached and cached[0] > now:
+                return cached[1]
+        
+        total = sum(
+            doc.data.get(COUNTER_VALUE_FIELD, 0)
+            for doc in self.db.backend.stream(self.collection, [], fields=[COUNTER_VALUE_FIELD])
+        )
+        
+        if self.cache_ttl_seconds > 0:
+            with self._values_lock:
+                self._values[self._cache_key] = (now + self.cache_ttl_seconds, total)
+        return total
+    
+    def reset(self):
+        """
+        Set every shard back to zero.
+        
+        Shards 0..num_shards-1 are zeroed; shard documents beyond them (left
+        by a larger num_shards) are deleted, since value() sums them too.
+        """
+        shard_ids = {self._shard_id(i) for i in range(self.num_shards)}
+        extra_ids = [
+            doc.id for doc in self.db.backend.stream(self.collection, [], fields=[COUNTER_VALUE_FIELD])
+            if doc.id not in shard_ids
+        ]
+        
+        def zero(txn: "TransactionView"):
+            for shard_id in sorted(shard_ids):
+                txn.set(self.collection, shard_id, {COUNTER_VALUE_FIELD: 0})
+            for shard_id in extra_ids:
+                txn.delete(self.collection, shard_id)
+        
+        self.db.run_transaction(zero)
+        with self._values_lock:
+            self._values.pop(self._cache_key, None)
@@ -1,26 +1,260 @@
 """
 Database service for Firestore operations.
+
+Storage is delegated to a backend (services/storage): Firestore in
+production, in-memory or SQLite for tests, CI and benchmarks.
 """
+import asyncio
+import base64
+import json
+import random
+import threading
+import time
 import uuid
-from typing import Dict, Any, Optional, List
-from google.cloud import firestore
+from datetime import datetime
+from typing import Dict, Any, Optional, List, Iterator, Tuple, Callable
 from services.base import BaseService
+from services.storage.base import (
+    StorageBackend,
+    DocumentNotFoundError,
+    DocumentConflictError,
+    SERVER_TIMESTAMP,
+    DELETE_FIELD,
+    is_delete_sentinel,
+    StoredDocument,
+    BackendTransaction,
+    TransactionContentionError,
+)
+from services.storage.memory import get_path, aggregate_documents, implicit_order_field
+from services.cache import DocumentCache, NOT_FOUND
+from services.counters import ShardedCounter
+from services.query_stats import QueryRecorder, query_shape
+from services.mirror import CollectionMirror
+from response.formatter import pick_fields
 from utils.logger import Logger
+from utils.deadline import get_deadline, DeadlineExceededError
+from utils.constants import (
+    WRITE_RETURN_DOCUMENT,
+    WRITE_RETURN_MERGED,
+    WRITE_RETURN_RESULT,
+    VALID_WRITE_RETURN_MODES,
+    UPDATE_TIME_FIELD,
+    DEFAULT_PAGE_SIZE,
+    DEFAULT_ITER_CHUNK_SIZE,
+    DELETED_AT_FIELD,
+    SOFT_DELETE_FIELD,
+    SOFT_DELETE_FILTER_SERVER,
+    SOFT_DELETE_FILTER_CLIENT,
+    DEFAULT_SOFT_DELETE_FILTER,
+    AGGREGATION_COUNT,
+    AGGREGATION_SUM,
+    AGGREGATION_AVG,
+    VALID_AGGREGATIONS,
+    STORAGE_BACKEND_FIRESTORE,
+    STORAGE_BACKEND_MEMORY,
+    STORAGE_BACKEND_SQLITE,
+    VALID_STORAGE_BACKENDS,
+    DEFAULT_SQLITE_PATH,
+    DEFAULT_TRANSACTION_ATTEMPTS,
+    DEFAULT_TRANSACTION_BACKOFF,
+    MAX_TRANSACTION_BACKOFF,
+    DEFAULT_COUNTER_SHARDS,
+    DEFAULT_MIRROR_MAX_DOCUMENTS,
+    DEFAULT_MIRROR_RESTART_SECONDS,
+)
 import os
 
 
+def _encode_cursor(values: List[Any]) -> str:
+    """
+    Encode cursor values into an opaque, URL-safe token.
+    
+    Args:
+        values: Order-by field values followed by the document ID
+    
+    Returns:
+        Cursor token
+    """
+    encoded = []
+    for value in values:
+        if isinstance(value, datetime):
+            encoded.append({"$dt": value.isoformat()})
+        elif value is None or isinstance(value, (str, int, float, bool)):
+            encoded.append(value)
+        else:
+            raise ValueError(f"Cannot paginate on values of type {type(value).__name__}")
+    raw = json.dumps(encoded, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(token: str) -> List[Any]:
+    """
+    Decode a cursor token produced by _encode_cursor.
+    
+    Args:
+        token: Cursor token
+    
+    Returns:
+        Order-by field values followed by the document ID
+    
+    Raises:
+        ValueError: If the token is malformed
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except Exception:
+        raise ValueError("Invalid pagination cursor")
+    if not isinstance(values, list) or not values:
+        raise ValueError("Invalid pagination cursor")
+    return [
+        datetime.fromisoformat(v["$dt"]) if isinstance(v, dict) and "$dt" in v else v
+        for v in values
+    ]
+
+
+class TransactionView:
+    """
+    Transaction-bound view of DatabaseService get/create/update/delete.
+    
+    Reads must happen before writes. Writes are applied atomically when the
+    transaction function returns, and only if nothing it read has changed.
+    """
+    
+    def __init__(self, service: "DatabaseService", transaction: BackendTransaction):
+        """
+        Initialize view.
+        
+        Args:
+            service: Owning database service
+            transaction: Backend transaction for this attempt
+        """
+        self.service = service
+        self.transaction = transaction
+        self.written: List[Tuple[str, str]] = []
+    
+    def get(self, collection: str, document_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Read a document inside the transaction (never served from cache).
+        
+        Args:
+            collection: Collection name
+            document_id: Document ID
+        
+        Returns:
+            Document data or None if not found
+        """
+        doc = self.transaction.get(collection, document_id)
+        return {"id": doc.id, **doc.data} if doc else None
+    
+    def create(self, collection: str, data: Dict[str, Any], document_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Create a document on commit.
+        
+        Args:
+            collection: Collection name
+            data: Document data
+            document_id: Optional document ID (generated if not provided)
+        
+        Returns:
+            Document as it will be written
+        """
+        doc_id = document_id or uuid.uuid4().hex[:12]
+        data = self.service._with_soft_delete_flag(data, default=False)
+        self.transaction.set(collection, doc_id, data)
+        self.written.append((collection, doc_id))
+        return {"id": doc_id, **data}
+    
+    def set(self, collection: str, document_id: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Create or overwrite a document on commit, written as given.
+        
+        Unlike create(), no isDeleted flag is added: for collections outside
+        soft delete (e.g. counter shards).
+        
+        Args:
+            collection: Collection name
+            document_id: Document ID
+            data: Document data
+        
+        Returns:
+            Document as it will be written
+        """
+        self.transaction.set(collection, document_id, data)
+        self.written.append((collection, document_id))
+        return {"id": document_id, **data}
+    
+    def update(self, collection: str, document_id: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Update a document on commit (the commit fails if it does not exist).
+        
+        Args:
+            collection: Collection name
+            document_id: Document ID
+            data: Data to update
+        
+        Returns:
+            Locally merged view of the written fields
+        """
+        data = self.service._with_soft_delete_flag(data)
+        self.transaction.update(collection, document_id, data)
+        self.written.append((collection, document_id))
+        return {"id": document_id, **data}
+    
+    def delete(self, collection: str, document_id: str):
+        """
+        Delete a document on commit.
+        
+        Args:
+            collection: Collection name
+            document_id: Document ID
+        """
+        self.transaction.delete(collection, document_id)
+        self.written.append((collection, document_id))
+
+
 class DatabaseService(BaseService):
     """
     Service for Firestore database operations.
     """
+    # Document caches shared by every instance in the process,
+    # keyed by (backend, gcp_project_id, database location)
+    _caches = {}
+    # Query shape recorders shared by all instances, keyed like _caches
+    _query_recorders = {}
+    # Listener-backed collection mirrors, keyed by (cache scope, collection)
+    _mirrors = {}
+    _mirrors_lock = threading.Lock()
+    # Local (memory/sqlite) backends shared by every instance in the process,
+    # keyed by (backend, location)
+    _backends = {}
+    # Firestore clients shared by every instance in the process,
+    # keyed by (gcp_project_id, database_id, credentials_path, credentials_secret_name)
+    _clients = {}
+    _clients_lock = threading.Lock()
+    # Transaction counters for the process (see transaction_stats)
+    _transaction_stats = {
+        "transactions": 0,
+        "committed": 0,
+        "failed": 0,
+        "attempts": 0,
+        "retries": 0,
+        "retry_wait_ms": 0.0
+    }
+    _transaction_stats_lock = threading.Lock()
     
     def __init__(self, config: Dict[str, Any], logger: Optional[Logger] = None):
         """
         Initialize database service.
         
         Args:
-            config: Database configuration (must include database.database_id)
+            config: Database configuration (must include database.database_id).
+                database.backend selects the storage backend: "firestore"
+                (default), "memory" or "sqlite" (file at database.sqlite_path).
             logger: Logger instance
+        
+        Raises:
+            ValueError: If the backend is not supported
         """
         super().__init__(config, logger)
         # Always use Google Cloud project for Firestore client
@@ -32,6 +266,100 @@ class DatabaseService(BaseService):
         # Get database_id from config (defaults to "(default)" if not specified)
         db_config = config.get("database", {})
         database_id = db_config.get("database_id", "(default)")
+        # Where soft-deleted documents are excluded: "client" (default) drops
+        # deletedAt documents after reading; "server" filters on the indexed
+        # isDeleted field, which hides documents without it, so enable it only
+        # after migrate_soft_delete.py has backfilled the environment
+        self.soft_delete_filter = db_config.get("soft_delete_filter", DEFAULT_SOFT_DELETE_FILTER)
+        # Collections already backfilled: filtered on isDeleted even in "client" mode
+        self.soft_delete_migrated = set(db_config.get("soft_delete_migrated", []))
+        # Request deadline set by the gateway (None outside requests)
+        self.deadline = get_deadline(config)
+        
+        # Priority: Config 'database.backend' > Env 'DATABASE_BACKEND' > Firestore
+        self.backend_name = db_config.get("backend", os.getenv("DATABASE_BACKEND", STORAGE_BACKEND_FIRESTORE))
+        if self.backend_name not in VALID_STORAGE_BACKENDS:
+            raise ValueError(f"Invalid database backend '{self.backend_name}'. Use one of: {', '.join(VALID_STORAGE_BACKENDS)}")
+        
+        # Firestore client (None for local backends)
+        self.db = None
+        if self.backend_name == STORAGE_BACKEND_FIRESTORE:
+            from services.storage.firestore import FirestoreBackend
+            self.db = self._get_client(config, database_id)
+            self.backend: StorageBackend = FirestoreBackend(self.db, deadline=self.deadline)
+        else:
+            self.backend = self._get_local_backend(self.backend_name, db_config)
+        
+        # Identifies the database for process-wide caches
+        self.cache_scope = (self.backend_name, self.gcp_project_id, self._backend_location(db_config))
+        
+        # Optional read-through document cache ("database.cache" config)
+        cache_config = db_config.get("cache", {})
+        self.cache = None
+        if cache_config.get("enabled"):
+            if self.cache_scope not in self._caches:
+                self._caches[self.cache_scope] = DocumentCache.from_config(cache_config)
+            self.cache = self._caches[self.cache_scope]
+        
+        # Query shape recording and slow-query log ("database.query_stats" config)
+        stats_config = db_config.get("query_stats", {})
+        self.query_recorder = None
+        if stats_config.get("enabled", True):
+            if self.cache_scope not in self._query_recorders:
+                self._query_recorders[self.cache_scope] = QueryRecorder.from_config(stats_config)
+            self.query_recorder = self._query_recorders[self.cache_scope]
+        
+        # Collections mirrored in memory by realtime listeners ("database.mirrors" config)
+        self.mirrors: Dict[str, CollectionMirror] = {}
+        for collection, mirror_config in db_config.get("mirrors", {}).items():
+            self.mirrors[collection] = self._get_mirror(collection, mirror_config)
+        
+        # Sharded counter settings ("database.counters" config)
+        self.counters_config = db_config.get("counters", {})
+        
+        self._log("info", "Database service initialized", {
+            "gcp_project": self.gcp_project_id,
+            "database_id": database_id,
+            "project_id": self.project_id,
+            "backend": self.backend_name,
+            "using_credentials": bool(config.get("credentials_path")),
+            "soft_delete_filter": self.soft_delete_filter,
+            "soft_delete_migrated": sorted(self.soft_delete_migrated),
+            "cache_enabled": self.cache is not None
+        })
+    
+    def _get_client(self, config: Dict[str, Any], database_id: str):
+        """
+        Get (creating on first use) the process-wide Firestore client of a database.
+        
+        Args:
+            config: Project configuration
+            database_id: Firestore database ID
+        
+        Returns:
+            Firestore client
+        """
+        key = (self.gcp_project_id, database_id, config.get("credentials_path"), config.get("credentials_secret_name"))
+        client = self._clients.get(key)
+        if client is None:
+            with self._clients_lock:
+                client = self._clients.get(key)
+                if client is None:
+                    client = self._clients[key] = self._create_client(config, database_id)
+        return client
+    
+    def _create_client(self, config: Dict[str, Any], database_id: str):
+        """
+        Create the Firestore client, resolving credentials.
+        
+        Args:
+            config: Project configuration
+            database_id: Firestore database ID
+        
+        Returns:
+            Firestore client
+        """
+        from google.cloud import firestore
         
         # Check for external credentials
         credentials_path = config.get("credentials_path")
@@ -48,9 +376,9 @@ class DatabaseService(BaseService):
                 creds = service_account.Credentials.from_service_account_file(credentials_path)
                 
                 if database_id == "(default)":
-                    self.db = firestore.Client(credentials=creds, project=self.gcp_project_id)
+                    return firestore.Client(credentials=creds, project=self.gcp_project_id)
                 else:
-                    self.db = firestore.Client(credentials=creds, project=self.gcp_project_id, database=database_id)
+                    return firestore.Client(credentials=creds, project=self.gcp_project_id, database=database_id)
             else:
                 self._log("warning", f"Credentials file not found at {credentials_path}. Checking Secret Manager.")
                 
@@ -61,9 +389,8 @@ class DatabaseService(BaseService):
                     self._log("info", f"Attempting to load credentials from secret: {secret_name}")
                     try:
                         from configs.loader import get_secret
-                        import json
                         
-                        secret_content = get_secret(secret_name)
+                        secret_content = get_secret(secret_name, deadline=self.deadline)
                         if secret_content:
                             cred_dict = json.loads(secret_content)
                             from google.oauth2 import service_account
@@ -71,36 +398,260 @@ class DatabaseService(BaseService):
                             self._log("info", "Successfully loaded credentials from Secret Manager")
                         else:
                             self._log("warning", "Secret content was empty")
+                    except DeadlineExceededError:
+                        raise
                     except Exception as e:
                         self._log("error", "Failed to load credentials from Secret Manager", error=e)
 
                 if creds:
                     if database_id == "(default)":
-                        self.db = firestore.Client(credentials=creds, project=self.gcp_project_id)
+                        return firestore.Client(credentials=creds, project=self.gcp_project_id)
                     else:
-                        self.db = firestore.Client(credentials=creds, project=self.gcp_project_id, database=database_id)
+                        return firestore.Client(credentials=creds, project=self.gcp_project_id, database=database_id)
                 else:
                     self._log("warning", "Falling back to default credentials.")
                     # Initialize Firestore client with specific database using default credentials
                     # If database_id is "(default)", use default database
                     if database_id == "(default)":
-                        self.db = firestore.Client(project=self.gcp_project_id)
+                        return firestore.Client(project=self.gcp_project_id)
                     else:
-                        self.db = firestore.Client(project=self.gcp_project_id, database=database_id)
+                        return firestore.Client(project=self.gcp_project_id, database=database_id)
         else:
             # Initialize Firestore client with specific database using default credentials
             # If database_id is "(default)", use default database
             if database_id == "(default)":
-                self.db = firestore.Client(project=self.gcp_project_id)
+                return firestore.Client(project=self.gcp_project_id)
             else:
-                self.db = firestore.Client(project=self.gcp_project_id, database=database_id)
+                return firestore.Client(project=self.gcp_project_id, database=database_id)
         
-        self._log("info", "Database service initialized", {
-            "gcp_project": self.gcp_project_id,
-            "database_id": database_id,
-            "project_id": self.project_id,
-            "using_credentials": bool(credentials_path)
-        })
+    
+    @classmethod
+    def reset_clients(cls):
+        """
+        Drop process-wide Firestore clients, mirrors and SQLite connections.
+        
+        Needed in child processes after fork: gRPC channels, listener
+        threads and SQLite connections must not be shared across a fork.
+        Memory backends are kept.
+        """
+        with cls._clients_lock:
+            cls._clients = {}
+        with cls._mirrors_lock:
+            cls._mirrors = {}
+        cls._backends = {key: backend for key, backend in cls._backends.items() if key[0] != STORAGE_BACKEND_SQLITE}
+    
+    @staticmethod
+    def _backend_location(db_config: Dict[str, Any], backend_name: Optional[str] = None) -> str:
+        """
+        Identify the database a backend points at.
+        
+        Args:
+            db_config: Database configuration
+            backend_name: Backend name (defaults to the configured one)
+        
+        Returns:
+            SQLite file path for the sqlite backend, database ID otherwise
+        """
+        backend_name = backend_name or db_config.get("backend", os.getenv("DATABASE_BACKEND", STORAGE_BACKEND_FIRESTORE))
+        if backend_name == STORAGE_BACKEND_SQLITE:
+            return db_config.get("sqlite_path", os.getenv("DATABASE_SQLITE_PATH", DEFAULT_SQLITE_PATH))
+        return db_config.get("database_id", "(default)")
+    
+    @classmethod
+    def _get_local_backend(cls, backend_name: str, db_config: Dict[str, Any]) -> StorageBackend:
+        """
+        Get (or create) a process-wide memory or SQLite backend.
+        
+        Args:
+            backend_name: "memory" or "sqlite"
+            db_config: Database configuration
+        
+        Returns:
+            Storage backend
+        """
+        location = cls._backend_location(db_config, backend_name)
+        key = (backend_name, location)
+        if key not in cls._backends:
+            if backend_name == STORAGE_BACKEND_SQLITE:
+                from services.storage.sqlite import SqliteBackend
+                cls._backends[key] = SqliteBackend(location)
+            else:
+                from services.storage.memory import MemoryBackend
+                cls._backends[key] = MemoryBackend()
+        return cls._backends[key]
+    
+    def _invalidate(self, collection: str, document_id: str):
+        """
+        Drop a document from the cache after writing it.
+        
+        Args:
+            collection: Collection name
+            document_id: Document ID
+        """
+        if self.cache:
+            self.cache.invalidate(collection, document_id)
+        mirror = self.mirrors.get(collection)
+        if mirror:
+            mirror.mark_stale(document_id)
+    
+    def _get_mirror(self, collection: str, mirror_config: Dict[str, Any]) -> CollectionMirror:
+        """
+        Get (starting on first use) the process-wide mirror of a collection.
+        
+        Args:
+            collection: Collection name
+            mirror_config: Mirror configuration (filters, max_documents, restart_seconds)
+        
+        Returns:
+            CollectionMirror instance
+        """
+        key = (self.cache_scope, collection)
+        with self._mirrors_lock:
+            mirror = self._mirrors.get(key)
+            if mirror is None:
+                if self.db is not None:
+                    # Listeners outlive the request: no deadline on their backend
+                    from services.storage.firestore import FirestoreBackend
+                    backend = FirestoreBackend(self.db)
+                else:
+                    backend = self.backend
+                mirror = CollectionMirror(
+                    backend,
+                    collection,
+                    filters=mirror_config.get("filters"),
+                    max_documents=mirror_config.get("max_documents", DEFAULT_MIRROR_MAX_DOCUMENTS),
+                    restart_seconds=mirror_config.get("restart_seconds", DEFAULT_MIRROR_RESTART_SECONDS)
+                )
+                self._mirrors[key] = mirror
+                mirror.start()
+                self._log("info", f"Mirror started for collection '{collection}'", {"state": mirror.state})
+        return mirror
+    
+    def _live_mirror(self, collection: str) -> Optional[CollectionMirror]:
+        """
+        Get the mirror of a collection, restarting its listener if it died.
+        
+        Args:
+            collection: Collection name
+        
+        Returns:
+            Mirror (check healthy before serving reads), or None if not mirrored
+        """
+        mirror = self.mirrors.get(collection)
+        if mirror is None:
+            return None
+        was_live = mirror.healthy
+        if not was_live and mirror.ensure_running():
+            self._log("warning", f"Mirror listener for '{collection}' restarted", mirror.stats())
+        return mirror
+    
+    def mirror_stats(self) -> List[Dict[str, Any]]:
+        """
+        Get health and usage of the collection mirrors.
+        
+        Returns:
+            One entry per mirrored collection (state, documents, hits, fallbacks...)
+        """
+        return [mirror.stats() for mirror in self.mirrors.values()]
+    
+    @staticmethod
+    def _from_cached(cached: Dict[str, Any], with_update_time: bool, fields: Optional[List[str]]) -> Dict[str, Any]:
+        """
+        Shape a cached document like a fresh read.
+        
+        Args:
+            cached: Cached document (includes "_updateTime")
+            with_update_time: Keep "_updateTime"
+            fields: Optional field paths to keep
+        
+        Returns:
+            Document data
+        """
+        result = pick_fields(cached, fields) if fields else cached
+        if with_update_time:
+            result[UPDATE_TIME_FIELD] = cached.get(UPDATE_TIME_FIELD)
+        else:
+            result.pop(UPDATE_TIME_FIELD, None)
+        return result
+    
+    def cache_stats(self) -> Optional[Dict[str, Any]]:
+        """
+        Get document cache statistics.
+        
+        Returns:
+            Hit/miss/eviction counters, or None if caching is disabled
+        """
+        return self.cache.stats() if self.cache else None
+    
+    def query_stats(self) -> List[Dict[str, Any]]:
+        """
+        Get recorded query shapes with latency and read/returned counts.
+        
+        Returns:
+            Per-shape aggregates, most total time first (empty if disabled)
+        """
+        return self.query_recorder.stats() if self.query_recorder else []
+    
+    def _record_query(
+        self,
+        collection: str,
+        filters: List[tuple],
+        order_by: Optional[str],
+        descending: bool,
+        started: float,
+        read: int,
+        returned: int,
+        error: Optional[Exception] = None
+    ):
+        """
+        Record an executed query shape and log it if slow.
+        
+        Args:
+            collection: Collection name
+            filters: Filters sent to the backend
+            order_by: Field sorted by
+            descending: Sort direction
+            started: time.perf_counter() before the query
+            read: Documents read from the backend
+            returned: Documents returned to the caller
+            error: Exception raised by the query, if any
+        """
+        if not self.query_recorder:
+            return
+        duration_ms = (time.perf_counter() - started) * 1000
+        shape = query_shape(collection, filters, order_by, descending)
+        slow = self.query_recorder.record(
+            shape, duration_ms, read, returned, type(error).__name__ if error else None
+        )
+        if slow:
+            self._log("warning", "Slow query", {
+                "shape": shape["key"],
+                "duration_ms": round(duration_ms, 1),
+                "read": read,
+                "returned": returned
+            })
+    
+    @staticmethod
+    def _with_soft_delete_flag(data: Dict[str, Any], default: Optional[bool] = None) -> Dict[str, Any]:
+        """
+        Keep the indexed isDeleted flag in sync with deletedAt.
+        
+        Args:
+            data: Document data being written
+            default: Value to use when data does not touch deletedAt (None to leave unset)
+        
+        Returns:
+            Data including isDeleted when it can be derived
+        """
+        if SOFT_DELETE_FIELD in data:
+            return data
+        if DELETED_AT_FIELD in data:
+            deleted_at = data[DELETED_AT_FIELD]
+            is_deleted = deleted_at is not None and not is_delete_sentinel(deleted_at)
+            return {**data, SOFT_DELETE_FIELD: is_deleted}
+        if default is not None:
+            return {**data, SOFT_DELETE_FIELD: default}
+        return data
     
     def create(
         self,
@@ -121,17 +672,20 @@ class DatabaseService(BaseService):
         """
         self._log("info", f"Creating document in collection '{collection}'", {"data_keys": list(data.keys())})
         
+        data = self._with_soft_delete_flag(data, default=False)
+        
         try:
-            col_ref = self.db.collection(collection)
-            
             # Generate document ID: UUID if not provided
             if not document_id:
                 doc_id = uuid.uuid4().hex[:12]
             else:
                 doc_id = document_id
             
-            doc_ref = col_ref.document(doc_id)
-            doc_ref.set(data)
+            try:
+                self.backend.set(collection, doc_id, data)
+            finally:
+                # Also drops a cached "not found"
+                self._invalidate(collection, doc_id)
             
             result = {"id": doc_id, **data}
             self._log("info", f"Document created successfully", {
@@ -149,7 +703,10 @@ class DatabaseService(BaseService):
     def get(
         self,
         collection: str,
-        document_id: str
+        document_id: str,
+        with_update_time: bool = False,
+        fields: Optional[List[str]] = None,
+        use_cache: bool = True
     ) -> Optional[Dict[str, Any]]:
         """
         Get a document by ID.
@@ -157,21 +714,52 @@ class DatabaseService(BaseService):
         Args:
             collection: Collection name (project_id)
             document_id: Document ID
+            with_update_time: If True, include the document update time under
+                "_updateTime" (pass it back to update() as if_update_time)
+            fields: Optional field paths to read (Firestore projection)
+            use_cache: If False, bypass the document cache (when enabled)
         
         Returns:
             Document data or None if not found
         """
         self._log("info", f"Getting document '{document_id}' from collection '{collection}'")
         
+        mirror = self._live_mirror(collection)
+        if mirror is not None and use_cache:
+            served, doc = mirror.get(document_id, fields)
+            if served:
+                self._log("debug", f"Document served from mirror", {"document_id": document_id})
+                if doc is None:
+                    return None
+                result = {"id": doc.id, **doc.data}
+                if with_update_time:
+                    result[UPDATE_TIME_FIELD] = doc.update_time
+                return result
+        
+        if self.cache and use_cache:
+            cached = self.cache.get(collection, document_id)
+            if cached is NOT_FOUND:
+                self._log("debug", f"Document not found (cached)", {"document_id": document_id})
+                return None
+            if cached is not None:
+                self._log("debug", f"Document served from cache", {"document_id": document_id})
+                return self._from_cached(cached, with_update_time, fields)
+        
         try:
-            doc_ref = self.db.collection(collection).document(document_id)
-            doc = doc_ref.get()
+            doc = self.backend.get(collection, document_id, fields)
             
-            if doc.exists:
-                result = {"id": doc.id, **doc.to_dict()}
+            if doc is not None:
+                result = {"id": doc.id, **doc.data}
+                if self.cache and not fields:
+                    # Only full documents are cached; projections are served from them
+                    self.cache.set(collection, document_id, {**result, UPDATE_TIME_FIELD: doc.update_time})
+                if with_update_time:
+                    result[UPDATE_TIME_FIELD] = doc.update_time
                 self._log("info", f"Document retrieved successfully", {"document_id": document_id})
                 return result
             else:
+                if self.cache:
+                    self.cache.set_not_found(collection, document_id)
                 self._log("warning", f"Document not found", data={"document_id": document_id})
                 return None
                 
@@ -183,32 +771,68 @@ class DatabaseService(BaseService):
         self,
         collection: str,
         document_id: str,
-        data: Dict[str, Any]
+        data: Dict[str, Any],
+        return_mode: str = WRITE_RETURN_MERGED,
+        if_update_time: Optional[datetime] = None
     ) -> Dict[str, Any]:
         """
         Update a document.
         
+        The update is a single RPC: the backend rejects updates to missing
+        documents, so no read is needed to detect them.
+        
         Args:
             collection: Collection name (project_id)
             document_id: Document ID
             data: Data to update
+            return_mode: What to return after writing:
+                - "merged" (default): {"id", **data, "_updateTime"} without re-reading
+                - "result": only {"id", "_updateTime"}
+                - "document": re-read the full document (previous behavior, extra RPC)
+            if_update_time: Optional update time previously read with
+                get(with_update_time=True). The write only succeeds if the
+                document has not changed since (optimistic concurrency).
         
         Returns:
-            Updated document
+            Updated document (shape depends on return_mode)
+        
+        Raises:
+            ValueError: If return_mode is not supported
+            DocumentNotFoundError: If the document does not exist
+            DocumentConflictError: If if_update_time no longer matches
         """
-        self._log("info", f"Updating document '{document_id}' in collection '{collection}'", {"update_keys": list(data.keys())})
+        if return_mode not in VALID_WRITE_RETURN_MODES:
+            raise ValueError(f"Invalid return_mode '{return_mode}'. Use one of: {', '.join(VALID_WRITE_RETURN_MODES)}")
+        
+        self._log("info", f"Updating document '{document_id}' in collection '{collection}'", {
+            "update_keys": list(data.keys()),
+            "return_mode": return_mode,
+            "conditional": if_update_time is not None
+        })
+        
+        data = self._with_soft_delete_flag(data)
         
         try:
-            doc_ref = self.db.collection(collection).document(document_id)
-            doc_ref.update(data)
+            try:
+                update_time = self.backend.update(collection, document_id, data, if_update_time)
+            finally:
+                self._invalidate(collection, document_id)
             
-            # Get updated document
-            doc = doc_ref.get()
-            result = {"id": doc.id, **doc.to_dict()}
+            if return_mode == WRITE_RETURN_DOCUMENT:
+                # Get updated document
+                doc = self.backend.get(collection, document_id)
+                result = {"id": doc.id, **doc.data, UPDATE_TIME_FIELD: doc.update_time}
+            elif return_mode == WRITE_RETURN_RESULT:
+                result = {"id": document_id, UPDATE_TIME_FIELD: update_time}
+            else:
+                result = {"id": document_id, **data, UPDATE_TIME_FIELD: update_time}
             
             self._log("info", f"Document updated successfully", {"document_id": document_id})
             return result
             
+        except DocumentConflictError:
+            self._log("warning", f"Document changed since it was read", data={"document_id": document_id})
+            raise
         except Exception as e:
             self._log("error", f"Error updating document", error=e, data={"document_id": document_id})
             raise
@@ -216,101 +840,384 @@ class DatabaseService(BaseService):
     def delete(
         self,
         collection: str,
-        document_id: str
+        document_id: str,
+        precheck: bool = False,
+        if_update_time: Optional[datetime] = None
     ) -> bool:
         """
         Delete a document.
         
+        By default the delete carries an exists=True precondition, so a
+        missing document is detected in the same RPC.
+        
         Args:
             collection: Collection name (project_id)
             document_id: Document ID
+            precheck: If True, read the document before deleting (previous behavior, extra RPC)
+            if_update_time: Optional update time; only delete if the document
+                has not changed since it was read (optimistic concurrency)
         
         Returns:
             True if deleted, False if not found
+        
+        Raises:
+            DocumentConflictError: If if_update_time no longer matches
         """
-        self._log("info", f"Deleting document '{document_id}' from collection '{collection}'")
+        self._log("info", f"Deleting document '{document_id}' from collection '{collection}'", {
+            "precheck": precheck,
+            "conditional": if_update_time is not None
+        })
         
         try:
-            doc_ref = self.db.collection(collection).document(document_id)
-            doc = doc_ref.get()
+            if precheck and self.backend.get(collection, document_id) is None:
+                self._log("warning", f"Document not found for deletion", data={"document_id": document_id})
+                return False
             
-            if doc.exists:
-                doc_ref.delete()
-                self._log("info", f"Document deleted successfully", {"document_id": document_id})
-                return True
-            else:
+            try:
+                deleted = self.backend.delete(collection, document_id, if_update_time)
+            finally:
+                self._invalidate(collection, document_id)
+            
+            if not deleted:
                 self._log("warning", f"Document not found for deletion", data={"document_id": document_id})
                 return False
-                
+            
+            self._log("info", f"Document deleted successfully", {"document_id": document_id})
+            return True
+            
+        except DocumentConflictError:
+            self._log("warning", f"Document changed since it was read", data={"document_id": document_id})
+            raise
         except Exception as e:
             self._log("error", f"Error deleting document", error=e, data={"document_id": document_id})
             raise
     
-    def list(
+    def get_many(
         self,
         collection: str,
-        limit: int = 100,
-        exclude_deleted: bool = True
-    ) -> List[Dict[str, Any]]:
+        document_ids: List[str],
+        fields: Optional[List[str]] = None,
+        use_cache: bool = True
+    ) -> Dict[str, Optional[Dict[str, Any]]]:
         """
-        List documents in a collection.
+        Get several documents by ID in one batched read.
         
         Args:
-            collection: Collection name (project_id)
-            limit: Maximum number of documents to return
-            exclude_deleted: If True, exclude documents with deletedAt field (soft delete)
+            collection: Collection name
+            document_ids: Document IDs
+            fields: Optional field paths to read (Firestore projection)
+            use_cache: If False, bypass the document cache (when enabled)
         
         Returns:
-            List of documents
+            Document ID -> document data (None if not found), in request order
         """
-        self._log("info", f"Listing documents from collection '{collection}'", {
-            "limit": limit,
-            "exclude_deleted": exclude_deleted
-        })
+        unique_ids = list(dict.fromkeys(document_ids))
+        self._log("info", f"Getting {len(unique_ids)} documents from collection '{collection}'")
+        
+        results = {doc_id: None for doc_id in unique_ids}
+        missing = []
+        mirror = self._live_mirror(collection) if use_cache else None
+        for doc_id in unique_ids:
+            if mirror is not None:
+                served, doc = mirror.get(doc_id, fields)
+                if served:
+                    results[doc_id] = {"id": doc.id, **doc.data} if doc else None
+                    continue
+            cached = self.cache.get(collection, doc_id) if self.cache and use_cache else None
+            if cached is NOT_FOUND:
+                continue
+            if cached is not None:
+                results[doc_id] = self._from_cached(cached, False, fields)
+            else:
+                missing.append(doc_id)
+        
+        if not missing:
+            return results
         
         try:
-            docs = self.db.collection(collection).limit(limit).stream()
-            results = [{"id": doc.id, **doc.to_dict()} for doc in docs]
+            documents = self.backend.get_all(collection, missing, fields)
             
-            # Filter out soft-deleted documents if requested
-            if exclude_deleted:
-                initial_count = len(results)
-                results = [r for r in results if not r.get("deletedAt")]
-                filtered_count = initial_count - len(results)
-                if filtered_count > 0:
-                    self._log("debug", f"Filtered {filtered_count} soft-deleted documents")
+            for doc_id, doc in documents.items():
+                if doc is None:
+                    if self.cache:
+                        self.cache.set_not_found(collection, doc_id)
+                    continue
+                result = {"id": doc.id, **doc.data}
+                if self.cache and not fields:
+                    self.cache.set(collection, doc.id, {**result, UPDATE_TIME_FIELD: doc.update_time})
+                results[doc.id] = result
             
-            self._log("info", f"Retrieved {len(results)} documents", {
-                "collection": collection,
-                "count": len(results)
+            self._log("info", f"Retrieved documents", {
+                "requested": len(unique_ids),
+                "read": len(missing),
+                "found": sum(1 for r in results.values() if r is not None)
             })
             return results
             
         except Exception as e:
-            self._log("error", f"Error listing documents", error=e, data={"collection": collection})
+            self._log("error", f"Error getting documents", error=e, data={"collection": collection})
             raise
-
-    def query(
+    
+    def soft_delete(
         self,
         collection: str,
-        filters: List[tuple] = [],
-        order_by: Optional[str] = None,
-        descending: bool = False,
-        limit: int = 100,
-        exclude_deleted: bool = True
-    ) -> List[Dict[str, Any]]:
+        document_id: str
+    ) -> bool:
         """
-        Query documents in a collection with filters and sorting.
+        Soft delete a document by setting deletedAt and isDeleted.
         
         Args:
             collection: Collection name
-            filters: List of tuples (field, operator, value) e.g. [("age", ">", 18)]
-            order_by: Field to sort by
-            descending: Sort direction
-            limit: Max results
-            exclude_deleted: If True, exclude documents with deletedAt field (soft delete)
-            
-        Returns:
+            document_id: Document ID
+        
+        Returns:
+            True if marked as deleted, False if not found
+        """
+        try:
+            self.update(
+                collection, document_id,
+                {DELETED_AT_FIELD: SERVER_TIMESTAMP},
+                return_mode=WRITE_RETURN_RESULT
+            )
+            return True
+        except DocumentNotFoundError:
+            self._log("warning", f"Document not found for soft delete", data={"document_id": document_id})
+            return False
+    
+    def restore(
+        self,
+        collection: str,
+        document_id: str
+    ) -> bool:
+        """
+        Restore a soft-deleted document.
+        
+        Args:
+            collection: Collection name
+            document_id: Document ID
+        
+        Returns:
+            True if restored, False if not found
+        """
+        try:
+            self.update(
+                collection, document_id,
+                {DELETED_AT_FIELD: DELETE_FIELD},
+                return_mode=WRITE_RETURN_RESULT
+            )
+            return True
+        except DocumentNotFoundError:
+            self._log("warning", f"Document not found for restore", data={"document_id": document_id})
+            return False
+    
+    def _soft_delete_filters(
+        self,
+        collection: str,
+        filters: List[tuple],
+        exclude_deleted: bool
+    ) -> Tuple[List[tuple], bool]:
+        """
+        Add the server-side soft-delete filter when enabled.
+        
+        Enabled for every collection in "server" mode, and for the
+        collections listed in database.soft_delete_migrated otherwise.
+        
+        Args:
+            collection: Collection name
+            filters: List of tuples (field, operator, value)
+            exclude_deleted: If True, soft-deleted documents must be excluded
+        
+        Returns:
+            (filters, server_filter) - server_filter is True if the filter was added
+        """
+        server_filter = exclude_deleted and (
+            self.soft_delete_filter == SOFT_DELETE_FILTER_SERVER or collection in self.soft_delete_migrated
+        )
+        if server_filter:
+            filters = [(SOFT_DELETE_FIELD, "==", False)] + list(filters)
+        return filters, server_filter
+    
+    def _fetch_page(
+        self,
+        collection: str,
+        filters: List[tuple],
+        order_by: Optional[str],
+        descending: bool,
+        limit: int,
+        exclude_deleted: bool,
+        start_after: Optional[str],
+        paginate: bool,
+        fields: Optional[List[str]] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Fetch one page of documents.
+        
+        Args:
+            collection: Collection name
+            filters: List of tuples (field, operator, value)
+            order_by: Field to sort by
+            descending: Sort direction
+            limit: Max documents to read
+            exclude_deleted: If True, exclude soft-deleted documents
+            start_after: Optional cursor token from a previous page
+            paginate: If True, compute the cursor of the next page
+            fields: Optional field paths to read (Firestore projection)
+        
+        Returns:
+            (documents, next_cursor) - next_cursor is None on the last page
+        """
+        filters, server_filter = self._soft_delete_filters(collection, filters, exclude_deleted)
+        # Firestore orders by the inequality field when no order_by is given:
+        # order by it explicitly, so cursors carry (value, id) to resume from
+        order_by = order_by or implicit_order_field(filters)
+        
+        cursor_values = None
+        if start_after:
+            cursor_values = _decode_cursor(start_after)
+            if len(cursor_values) != (2 if order_by else 1):
+                raise ValueError("Pagination cursor does not match the query ordering")
+        
+        select_paths = None
+        if fields:
+            # The projection also needs whatever we read back internally
+            select_paths = list(fields)
+            if order_by and order_by not in select_paths:
+                select_paths.append(order_by)
+            if exclude_deleted and not server_filter and DELETED_AT_FIELD not in select_paths:
+                select_paths.append(DELETED_AT_FIELD)
+        
+        started = time.perf_counter()
+        mirror = self._live_mirror(collection)
+        if mirror is not None and mirror.can_query(filters):
+            documents = mirror.stream(filters, order_by, descending, limit or None, cursor_values, select_paths)
+        else:
+            documents = self.backend.stream(
+                collection, filters, order_by, descending, limit or None,
+                start_after=cursor_values, fields=select_paths, order_by_id=paginate
+            )
+        
+        results = []
+        last_doc = None
+        read_count = 0
+        try:
+            for doc in documents:
+                read_count += 1
+                last_doc = doc
+                results.append({"id": doc.id, **doc.data})
+        except Exception as e:
+            # Missing composite indexes surface here (FailedPrecondition)
+            self._record_query(collection, filters, order_by, descending, started, read_count, 0, error=e)
+            raise
+        
+        # Client-side fallback for collections not yet migrated to isDeleted
+        if exclude_deleted and not server_filter:
+            results = [r for r in results if not r.get("deletedAt")]
+            filtered_count = read_count - len(results)
+            if filtered_count > 0:
+                self._log("debug", f"Filtered {filtered_count} soft-deleted documents")
+        
+        next_cursor = None
+        if paginate and last_doc is not None and limit and read_count == limit:
+            values = [get_path(last_doc.data, order_by)] if order_by else []
+            next_cursor = _encode_cursor(values + [last_doc.id])
+        
+        if fields:
+            results = [pick_fields(r, fields) for r in results]
+        
+        self._record_query(collection, filters, order_by, descending, started, read_count, len(results))
+        return results, next_cursor
+    
+    def list(
+        self,
+        collection: str,
+        limit: int = 100,
+        exclude_deleted: bool = True,
+        start_after: Optional[str] = None,
+        fields: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        List documents in a collection.
+        
+        Args:
+            collection: Collection name (project_id)
+            limit: Maximum number of documents to return
+            exclude_deleted: If True, exclude soft-deleted documents (isDeleted == True)
+            start_after: Optional cursor token returned by list_page()
+            fields: Optional field paths to read (Firestore projection)
+        
+        Returns:
+            List of documents
+        """
+        return self.list_page(collection, limit, exclude_deleted, start_after, fields)["items"]
+    
+    def list_page(
+        self,
+        collection: str,
+        limit: int = DEFAULT_PAGE_SIZE,
+        exclude_deleted: bool = True,
+        start_after: Optional[str] = None,
+        fields: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        List one page of documents in a collection, ordered by document ID.
+        
+        Args:
+            collection: Collection name (project_id)
+            limit: Page size
+            exclude_deleted: If True, exclude soft-deleted documents (isDeleted == True)
+            start_after: Optional cursor token from a previous page
+            fields: Optional field paths to read (Firestore projection)
+        
+        Returns:
+            {"items": [...], "next_cursor": token or None}
+        """
+        self._log("info", f"Listing documents from collection '{collection}'", {
+            "limit": limit,
+            "exclude_deleted": exclude_deleted,
+            "paginated": bool(start_after)
+        })
+        
+        try:
+            results, next_cursor = self._fetch_page(
+                collection, [], None, False, limit, exclude_deleted, start_after, paginate=True, fields=fields
+            )
+            
+            self._log("info", f"Retrieved {len(results)} documents", {
+                "collection": collection,
+                "count": len(results),
+                "has_more": bool(next_cursor)
+            })
+            return {"items": results, "next_cursor": next_cursor}
+            
+        except Exception as e:
+            self._log("error", f"Error listing documents", error=e, data={"collection": collection})
+            raise
+
+    def query(
+        self,
+        collection: str,
+        filters: List[tuple] = [],
+        order_by: Optional[str] = None,
+        descending: bool = False,
+        limit: int = 100,
+        exclude_deleted: bool = True,
+        start_after: Optional[str] = None,
+        fields: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Query documents in a collection with filters and sorting.
+        
+        Args:
+            collection: Collection name
+            filters: List of tuples (field, operator, value) e.g. [("age", ">", 18)]
+            order_by: Field to sort by
+            descending: Sort direction
+            limit: Max results
+            exclude_deleted: If True, exclude soft-deleted documents (isDeleted == True)
+            start_after: Optional cursor token returned by query_page()
+            fields: Optional field paths to read (Firestore projection)
+            
+        Returns:
             List of matching documents
         """
         self._log("info", f"Querying collection '{collection}'", {
@@ -321,28 +1228,9 @@ class DatabaseService(BaseService):
         })
         
         try:
-            ref = self.db.collection(collection)
-            
-            for field, op, value in filters:
-                ref = ref.where(filter=firestore.FieldFilter(field, op, value))
-                
-            if order_by:
-                direction = firestore.Query.DESCENDING if descending else firestore.Query.ASCENDING
-                ref = ref.order_by(order_by, direction=direction)
-                
-            if limit:
-                ref = ref.limit(limit)
-                
-            docs = ref.stream()
-            results = [{"id": doc.id, **doc.to_dict()} for doc in docs]
-            
-            # Filter out soft-deleted documents if requested
-            if exclude_deleted:
-                initial_count = len(results)
-                results = [r for r in results if not r.get("deletedAt")]
-                filtered_count = initial_count - len(results)
-                if filtered_count > 0:
-                    self._log("debug", f"Filtered {filtered_count} soft-deleted documents")
+            results, _ = self._fetch_page(
+                collection, filters, order_by, descending, limit, exclude_deleted, start_after, paginate=False, fields=fields
+            )
             
             self._log("info", f"Query returned {len(results)} documents")
             return results
@@ -350,4 +1238,506 @@ class DatabaseService(BaseService):
         except Exception as e:
             self._log("error", f"Error querying documents", error=e, data={"collection": collection})
             raise
-
+    
+    def query_page(
+        self,
+        collection: str,
+        filters: List[tuple] = [],
+        order_by: Optional[str] = None,
+        descending: bool = False,
+        limit: int = DEFAULT_PAGE_SIZE,
+        exclude_deleted: bool = True,
+        start_after: Optional[str] = None,
+        fields: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Query one page of documents with filters and sorting.
+        
+        Results are ordered by order_by (if given) and then by document ID.
+        When filtering with an inequality operator, order_by must be set to
+        that same field.
+        
+        Args:
+            collection: Collection name
+            filters: List of tuples (field, operator, value)
+            order_by: Field to sort by
+            descending: Sort direction
+            limit: Page size
+            exclude_deleted: If True, exclude soft-deleted documents (isDeleted == True)
+            start_after: Optional cursor token from a previous page
+            fields: Optional field paths to read (Firestore projection)
+        
+        Returns:
+            {"items": [...], "next_cursor": token or None}
+        """
+        self._log("info", f"Querying page of collection '{collection}'", {
+            "filters": str(filters),
+            "order_by": order_by,
+            "descending": descending,
+            "limit": limit,
+            "paginated": bool(start_after)
+        })
+        
+        try:
+            results, next_cursor = self._fetch_page(
+                collection, filters, order_by, descending, limit, exclude_deleted, start_after, paginate=True, fields=fields
+            )
+            
+            self._log("info", f"Query page returned {len(results)} documents", {"has_more": bool(next_cursor)})
+            return {"items": results, "next_cursor": next_cursor}
+            
+        except Exception as e:
+            self._log("error", f"Error querying documents", error=e, data={"collection": collection})
+            raise
+    
+    def iter_list(
+        self,
+        collection: str,
+        chunk_size: int = DEFAULT_ITER_CHUNK_SIZE,
+        exclude_deleted: bool = True,
+        fields: Optional[List[str]] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over every document in a collection, one page at a time.
+        
+        Only one page is held in memory, so this is suitable for exports.
+        
+        Args:
+            collection: Collection name
+            chunk_size: Documents read per page
+            exclude_deleted: If True, skip soft-deleted documents
+            fields: Optional field paths to read (Firestore projection)
+        
+        Yields:
+            Documents
+        """
+        yield from self.iter_query(collection, chunk_size=chunk_size, exclude_deleted=exclude_deleted, fields=fields)
+    
+    def iter_query(
+        self,
+        collection: str,
+        filters: List[tuple] = [],
+        order_by: Optional[str] = None,
+        descending: bool = False,
+        chunk_size: int = DEFAULT_ITER_CHUNK_SIZE,
+        exclude_deleted: bool = True,
+        fields: Optional[List[str]] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over every document matching a query, one page at a time.
+        
+        Args:
+            collection: Collection name
+            filters: List of tuples (field, operator, value)
+            order_by: Field to sort by
+            descending: Sort direction
+            chunk_size: Documents read per page
+            exclude_deleted: If True, skip soft-deleted documents
+            fields: Optional field paths to read (Firestore projection)
+        
+        Yields:
+            Documents
+        """
+        self._log("info", f"Iterating collection '{collection}'", {
+            "filters": str(filters),
+            "order_by": order_by,
+            "chunk_size": chunk_size
+        })
+        
+        cursor = None
+        pages = 0
+        while True:
+            results, cursor = self._fetch_page(
+                collection, filters, order_by, descending, chunk_size, exclude_deleted, cursor, paginate=True, fields=fields
+            )
+            pages += 1
+            yield from results
+            if not cursor:
+                break
+        
+        self._log("info", f"Iteration finished", {"collection": collection, "pages": pages})
+    
+    def aggregate(
+        self,
+        collection: str,
+        aggregations: Dict[str, Tuple[str, Optional[str]]],
+        filters: List[tuple] = [],
+        exclude_deleted: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Run several aggregations over a query in a single Firestore request.
+        
+        Billed as one aggregation read per batch of up to 1000 index entries
+        instead of one read per document. Excluding soft-deleted documents
+        needs the isDeleted filter ("server" mode, or the collection listed in
+        database.soft_delete_migrated); otherwise every matching document is
+        read and aggregated in Python.
+        
+        Args:
+            collection: Collection name
+            aggregations: Alias -> (kind, field), kind is "count", "sum" or "avg"
+                e.g. {"total_in": ("sum", "contribution"), "n": ("count", None)}
+            filters: List of tuples (field, operator, value), same as query()
+            exclude_deleted: If True, exclude soft-deleted documents
+        
+        Returns:
+            Alias -> value (sum of no documents is 0, avg is None)
+        
+        Raises:
+            ValueError: If no aggregation is given or a kind is not supported
+        """
+        if not aggregations:
+            raise ValueError("at least one aggregation is required")
+        for alias, (kind, field) in aggregations.items():
+            if kind not in VALID_AGGREGATIONS:
+                raise ValueError(f"Invalid aggregation '{kind}'. Use one of: {', '.join(VALID_AGGREGATIONS)}")
+            if kind != AGGREGATION_COUNT and not field:
+                raise ValueError(f"Aggregation '{alias}' requires a field")
+        
+        self._log("info", f"Aggregating collection '{collection}'", {
+            "aggregations": {alias: list(spec) for alias, spec in aggregations.items()},
+            "filters": str(filters)
+        })
+        
+        try:
+            filters, server_filter = self._soft_delete_filters(collection, filters, exclude_deleted)
+            if exclude_deleted and not server_filter:
+                # deletedAt cannot be excluded inside an aggregation; compute locally
+                self._log("warning", "Aggregation falls back to a full scan", {
+                    "collection": collection,
+                    "hint": "list the collection in database.soft_delete_migrated once migrate_soft_delete.py has run"
+                })
+                return self._aggregate_locally(collection, aggregations, filters)
+            
+            results = self.backend.aggregate(collection, filters, aggregations)
+            
+            self._log("info", f"Aggregation completed", {"results": results})
+            return results
+            
+        except Exception as e:
+            self._log("error", f"Error aggregating documents", error=e, data={"collection": collection})
+            raise
+    
+    def _aggregate_locally(
+        self,
+        collection: str,
+        aggregations: Dict[str, Tuple[str, Optional[str]]],
+        filters: List[tuple]
+    ) -> Dict[str, Any]:
+        """
+        Compute aggregations by streaming documents (client soft-delete mode only).
+        
+        Args:
+            collection: Collection name
+            aggregations: Alias -> (kind, field)
+            filters: List of tuples (field, operator, value)
+        
+        Returns:
+            Alias -> value
+        """
+        fields = sorted({field for _, field in aggregations.values() if field})
+        documents = (
+            StoredDocument(doc["id"], doc, None)
+            for doc in self.iter_query(collection, filters, exclude_deleted=True, fields=fields or None)
+        )
+        return aggregate_documents(documents, aggregations)
+    
+    def count(
+        self,
+        collection: str,
+        filters: List[tuple] = [],
+        exclude_deleted: bool = True
+    ) -> int:
+        """
+        Count documents matching a query with a Firestore aggregation.
+        
+        Reads every matching document when soft-deleted documents cannot be
+        filtered server-side (see aggregate()).
+        
+        Args:
+            collection: Collection name
+            filters: List of tuples (field, operator, value)
+            exclude_deleted: If True, exclude soft-deleted documents
+        
+        Returns:
+            Number of matching documents
+        """
+        return self.aggregate(collection, {"count": (AGGREGATION_COUNT, None)}, filters, exclude_deleted)["count"]
+    
+    def sum(
+        self,
+        collection: str,
+        field: str,
+        filters: List[tuple] = [],
+        exclude_deleted: bool = True
+    ) -> float:
+        """
+        Sum a numeric field over documents matching a query.
+        
+        Reads every matching document when soft-deleted documents cannot be
+        filtered server-side (see aggregate()).
+        
+        Args:
+            collection: Collection name
+            field: Numeric field to sum (non-numeric values are ignored)
+            filters: List of tuples (field, operator, value)
+            exclude_deleted: If True, exclude soft-deleted documents
+        
+        Returns:
+            Sum (0 if no documents match)
+        """
+        return self.aggregate(collection, {"sum": (AGGREGATION_SUM, field)}, filters, exclude_deleted)["sum"]
+    
+    def avg(
+        self,
+        collection: str,
+        field: str,
+        filters: List[tuple] = [],
+        exclude_deleted: bool = True
+    ) -> Optional[float]:
+        """
+        Average a numeric field over documents matching a query.
+        
+        Reads every matching document when soft-deleted documents cannot be
+        filtered server-side (see aggregate()).
+        
+        Args:
+            collection: Collection name
+            field: Numeric field to average (non-numeric values are ignored)
+            filters: List of tuples (field, operator, value)
+            exclude_deleted: If True, exclude soft-deleted documents
+        
+        Returns:
+            Average, or None if no documents have a numeric value
+        """
+        return self.aggregate(collection, {"avg": (AGGREGATION_AVG, field)}, filters, exclude_deleted)["avg"]
+    
+    def counter(self, name: str, num_shards: Optional[int] = None) -> ShardedCounter:
+        """
+        Get a sharded counter.
+        
+        Shard count priority: argument > database.counters.shards[name] >
+        database.counters.default_shards > DEFAULT_COUNTER_SHARDS. Totals are
+        cached for database.counters.cache_ttl_seconds (default 0, disabled).
+        
+        Args:
+            name: Counter name
+            num_shards: Optional shard count override
+        
+        Returns:
+            ShardedCounter instance
+        """
+        if num_shards is None:
+            num_shards = self.counters_config.get("shards", {}).get(
+                name, self.counters_config.get("default_shards", DEFAULT_COUNTER_SHARDS)
+            )
+        return ShardedCounter(
+            self,
+            name,
+            num_shards=num_shards,
+            cache_ttl_seconds=self.counters_config.get("cache_ttl_seconds", 0.0)
+        )
+    
+    @staticmethod
+    def _backoff_delay(attempt: int, backoff: float, max_backoff: float) -> float:
+        """
+        Jittered exponential backoff ("full jitter").
+        
+        Args:
+            attempt: Attempt number that just failed (1-based)
+            backoff: Base delay in seconds
+            max_backoff: Delay cap in seconds
+        
+        Returns:
+            Seconds to wait before the next attempt
+        """
+        return random.uniform(0, min(max_backoff, backoff * (2 ** (attempt - 1))))
+    
+    def _transaction_attempt(self, fn: Callable[[TransactionView], Any]) -> Any:
+        """
+        Run one transaction attempt and invalidate cached documents it wrote.
+        
+        Args:
+            fn: Transaction function
+        
+        Returns:
+            Function result
+        """
+        views = []
+        
+        def run(transaction: BackendTransaction):
+            view = TransactionView(self, transaction)
+            views.append(view)
+            return fn(view)
+        
+        result = self.backend.run_in_transaction(run)
+        for view in views:
+            for collection, document_id in view.written:
+                self._invalidate(collection, document_id)
+        return result
+    
+    def _record_transaction(self, attempts: int, retry_wait: float, started: float, committed: bool):
+        """
+        Update process-wide transaction counters and log the outcome.
+        
+        Args:
+            attempts: Attempts made
+            retry_wait: Seconds spent in backoff
+            started: time.monotonic() at start
+            committed: Whether the transaction committed
+        """
+        with self._transaction_stats_lock:
+            stats = self._transaction_stats
+            stats["transactions"] += 1
+            stats["committed" if committed else "failed"] += 1
+            stats["attempts"] += attempts
+            stats["retries"] += attempts - 1
+            stats["retry_wait_ms"] += retry_wait * 1000
+        
+        data = {
+            "attempts": attempts,
+            "retry_wait_ms": round(retry_wait * 1000, 1),
+            "duration_ms": round((time.monotonic() - started) * 1000, 1)
+        }
+        if committed:
+            self._log("info", "Transaction committed", data)
+        else:
+            self._log("error", "Transaction failed after retries", data=data)
+    
+    def run_transaction(
+        self,
+        fn: Callable[[TransactionView], Any],
+        max_attempts: int = DEFAULT_TRANSACTION_ATTEMPTS,
+        backoff: float = DEFAULT_TRANSACTION_BACKOFF,
+        max_backoff: float = MAX_TRANSACTION_BACKOFF
+    ) -> Any:
+        """
+        Run fn in a transaction, retrying on contention with jittered backoff.
+        
+        fn may run several times, so it must not have side effects outside
+        the transaction view.
+        
+        Args:
+            fn: Function receiving a TransactionView; its return value is returned
+            max_attempts: Maximum attempts before giving up
+            backoff: Base backoff delay in seconds (doubled per retry, jittered)
+            max_backoff: Backoff delay cap in seconds
+        
+        Returns:
+            Result of fn from the committed attempt
+        
+        Raises:
+            TransactionContentionError: If every attempt aborted due to contention
+            DeadlineExceededError: If the request deadline leaves no budget to retry
+            ValueError: If max_attempts is less than 1
+        
+        Example:
+            def record(txn):
+                asset = txn.get("assets", asset_id)
+                txn.update("assets", asset_id, {"balance": asset["balance"] + amount})
+                return txn.create("movements", movement)
+            
+            db.run_transaction(record)
+        """
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
+        started = time.monotonic()
+        retry_wait = 0.0
+        
+        for attempt in range(1, max_attempts + 1):
+            try:
+                result = self._transaction_attempt(fn)
+            except TransactionContentionError as e:
+                if attempt == max_attempts:
+                    self._record_transaction(attempt, retry_wait, started, committed=False)
+                    raise
+                delay = self._backoff_delay(attempt, backoff, max_backoff)
+                if self.deadline and not self.deadline.allows_retry(delay):
+                    # Retrying would outlive the request
+                    self._record_transaction(attempt, retry_wait, started, committed=False)
+                    raise DeadlineExceededError(f"Deadline exceeded after {attempt} transaction attempts") from e
+                self._log("warning", "Transaction contention, retrying", {
+                    "attempt": attempt,
+                    "delay_ms": round(delay * 1000, 1),
+                    "reason": str(e)
+                })
+                time.sleep(delay)
+                retry_wait += delay
+                continue
+            except Exception:
+                self._record_transaction(attempt, retry_wait, started, committed=False)
+                raise
+            
+            self._record_transaction(attempt, retry_wait, started, committed=True)
+            return result
+    
+    async def run_transaction_async(
+        self,
+        fn: Callable[[TransactionView], Any],
+        max_attempts: int = DEFAULT_TRANSACTION_ATTEMPTS,
+        backoff: float = DEFAULT_TRANSACTION_BACKOFF,
+        max_backoff: float = MAX_TRANSACTION_BACKOFF
+    ) -> Any:
+        """
+        Async variant of run_transaction.
+        
+        Each attempt runs in a worker thread (the storage clients are
+        blocking) and backoff waits with asyncio.sleep, so the event loop
+        keeps serving other requests while a hot document is contended.
+        
+        Args:
+            fn: Function receiving a TransactionView; its return value is returned
+            max_attempts: Maximum attempts before giving up
+            backoff: Base backoff delay in seconds (doubled per retry, jittered)
+            max_backoff: Backoff delay cap in seconds
+        
+        Returns:
+            Result of fn from the committed attempt
+        
+        Raises:
+            TransactionContentionError: If every attempt aborted due to contention
+            DeadlineExceededError: If the request deadline leaves no budget to retry
+            ValueError: If max_attempts is less than 1
+        """
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
+        started = time.monotonic()
+        retry_wait = 0.0
+        
+        for attempt in range(1, max_attempts + 1):
+            try:
+                result = await asyncio.to_thread(self._transaction_attempt, fn)
+            except TransactionContentionError as e:
+                if attempt == max_attempts:
+                    self._record_transaction(attempt, retry_wait, started, committed=False)
+                    raise
+                delay = self._backoff_delay(attempt, backoff, max_backoff)
+                if self.deadline and not self.deadline.allows_retry(delay):
+                    # Retrying would outlive the request
+                    self._record_transaction(attempt, retry_wait, started, committed=False)
+                    raise DeadlineExceededError(f"Deadline exceeded after {attempt} transaction attempts") from e
+                self._log("warning", "Transaction contention, retrying", {
+                    "attempt": attempt,
+                    "delay_ms": round(delay * 1000, 1),
+                    "reason": str(e)
+                })
+                await asyncio.sleep(delay)
+                retry_wait += delay
+                continue
+            except Exception:
+                self._record_transaction(attempt, retry_wait, started, committed=False)
+                raise
+            
+            self._record_transaction(attempt, retry_wait, started, committed=True)
+            return result
+    
+    @classmethod
+    def transaction_stats(cls) -> Dict[str, Any]:
+        """
+        Get process-wide transaction statistics.
+        
+        Returns:
+            Counters: transactions, committed, failed, attempts, retries, retry_wait_ms
+        """
+        with cls._transaction_stats_lock:
+            return dict(cls._transaction_stats)
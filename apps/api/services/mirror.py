@@ -0,0 +1,302 @@
+"""
+In-memory mirrors of small collections kept current by realtime listeners.
+"""
+import copy
+import threading
+import time
+from typing import Dict, Any, Optional, List, Iterator, Tuple
+from services.storage.base import StorageBackend, StoredDocument, ListenerHandle
+from services.storage.memory import run_query
+from response.formatter import pick_fields
+from utils.constants import (
+    DEFAULT_MIRROR_MAX_DOCUMENTS,
+    DEFAULT_MIRROR_RESTART_SECONDS,
+    MIRROR_STALE_SECONDS,
+    MIRROR_STARTING,
+    MIRROR_LIVE,
+    MIRROR_FAILED,
+    MIRROR_OVER_CAPACITY,
+    MIRROR_STOPPED,
+)
+
+
+class CollectionMirror:
+    """
+    Mirror of a collection (or of the documents matching filters).
+    
+    A backend listener pushes every change, so reads served from the mirror
+    need no TTL. Reads fall back to the backend while the mirror is not
+    live: before the first snapshot, after the listener dies (it is
+    restarted at most every restart_seconds), once the mirror outgrows
+    max_documents (it then stays off), and for documents written by this
+    process until the listener echoes the write.
+    """
+    
+    def __init__(
+        self,
+        backend: StorageBackend,
+        collection: str,
+        filters: Optional[List[tuple]] = None,
+        max_documents: int = DEFAULT_MIRROR_MAX_DOCUMENTS,
+        restart_seconds: float = DEFAULT_MIRROR_RESTART_SECONDS
+    ):
+        """
+        Initialize mirror (call start() to begin listening).
+        
+        Args:
+            backend: Backend to listen on (without a request deadline)
+            collection: Collection name
+            filters: Optional filters restricting the mirrored documents
+            max_documents: Memory cap; the mirror turns itself off beyond it
+            restart_seconds: Minimum delay between listener restarts
+        """
+        self.backend = backend
+        self.collection = collection
+        self.filters = [tuple(f) for f in (filters or [])]
+        self.max_documents = max_documents
+        self.restart_seconds = restart_seconds
+        self.state = MIRROR_STOPPED
+        self._documents: Dict[str, StoredDocument] = {}
+        self._stale: Dict[str, float] = {}
+        self._handle: Optional[ListenerHandle] = None
+        self._lock = threading.Lock()
+        self._last_start = 0.0
+        self._stats = {
+            "starts": 0,
+            "events": 0,
+            "hits": 0,
+            "fallbacks": 0,
+            "last_event_at": None,
+            "last_error": None
+        }
+    
+    def start(self):
+        """
+        Start (or restart) the listener.
+        
+        Backend errors (including backends without listeners) leave the
+        mirror in the failed state; reads then go to the backend.
+        """
+        self._close_handle()
+        with self._lock:
+            self.state = MIRROR_STARTING
+            self._documents = {}
+            self._stale = {}
+            self._last_start = time.monotonic()
+            self._stats["starts"] += 1
+        try:
+            handle = self.backend.listen(self.collection, self.filters, self._on_change)
+        except Exception as e:
+            with self._lock:
+                self.state = MIRROR_FAILED
+                self._stats["last_error"] = f"{type(e).__name__}: {e}"
+            return
+        
+        with self._lock:
+            if self.state == MIRROR_OVER_CAPACITY:
+                over_capacity = True
+            else:
+                over_capacity = False
+                self._handle = handle
+        if over_capacity:
+            handle.close()
+    
+    def stop(self):
+        """Stop listening and drop the mirrored documents."""
+        self._close_handle()
+        with self._lock:
+            self.state = MIRROR_STOPPED
+            self._documents = {}
+    
+    def _close_handle(self):
+        """Close the current listener, if any."""
+        with self._lock:
+            handle, self._handle = self._handle, None
+        if handle is not None:
+            try:
+                handle.close()
+            except Exception:
+                pass
+    
+    def _on_change(self, changes: List[Tuple[str, Optional[StoredDocument]]], initial: bool):
+        """
+        Apply a batch of changes pushed by the listener.
+        
+        Args:
+            changes: (document_id, document or None if removed)
+            initial: Whether this is the initial snapshot
+        """
+        with self._lock:
+            if self.state in (MIRROR_STOPPED, MIRROR_OVER_CAPACITY):
+                return
+            if initial:
+                self._documents = {}
+            for document_id, doc in changes:
+                if doc is None:
+                    self._documents.pop(document_id, None)
+                else:
+                    self._documents[document_id] = doc
+                self._stale.pop(document_id, None)
+            self._stats["events"] += 1
+            self._stats["last_event_at"] = time.time()
+            
+            if len(self._documents) > self.max_documents:
+                self.state = MIRROR_OVER_CAPACITY
+                self._documents = {}
+                self._stats["last_error"] = f"More than {self.max_documents} documents"
+                handle, self._handle = self._handle, None
+            else:
+                handle = None
+                if self.state == MIRROR_STARTING:
+                    self.state = MIRROR_LIVE
+        if handle is not None:
+            handle.close()
+    
+    @property
+    def healthy(self) -> bool:
+        """Whether reads can be served from the mirror."""
+        if self.state != MIRROR_LIVE:
+            return False
+        handle = self._handle
+        return handle is None or handle.is_active
+    
+    def ensure_running(self) -> bool:
+        """
+        Restart a dead listener if the restart delay has passed.
+        
+        Returns:
+            True if a restart was attempted
+        """
+        if self.healthy or self.state in (MIRROR_STOPPED, MIRROR_OVER_CAPACITY, MIRROR_STARTING):
+            return False
+        if time.monotonic() - self._last_start < self.restart_seconds:
+            return False
+        if self.state == MIRROR_LIVE:
+            # The listener died under a live mirror
+            with self._lock:
+                self.state = MIRROR_FAILED
+                self._stats["last_error"] = "Listener disconnected"
+        self.start()
+        return True
+    
+    def mark_stale(self, document_id: str):
+        """
+        Serve a document from the backend until the listener echoes a local write.
+        
+        Args:
+            document_id: Document ID written by this process
+        """
+        handle = self._handle
+        if handle is not None and handle.synchronous:
+            # The write has already been applied to the mirror
+            return
+        with self._lock:
+            self._stale[document_id] = time.monotonic() + MIRROR_STALE_SECONDS
+    
+    def _is_stale(self, document_id: Optional[str] = None) -> bool:
+        """Whether a document (or, without an ID, any document) awaits a listener echo."""
+        now = time.monotonic()
+        with self._lock:
+            for doc_id in [d for d, until in self._stale.items() if until <= now]:
+                del self._stale[doc_id]
+            if document_id is None:
+                return bool(self._stale)
+            return document_id in self._stale
+    
+    def covers(self, filters: List[tuple]) -> bool:
+        """
+        Whether a query over the mirror returns the same documents as the backend.
+        
+        Args:
+            filters: Query filters
+        
+        Returns:
+            True if every mirror filter is part of the query
+        """
+        requested = {tuple(f) for f in filters}
+        return all(f in requested for f in self.filters)
+    
+    def _fallback(self) -> None:
+        with self._lock:
+            self._stats["fallbacks"] += 1
+    
+    def get(self, document_id: str, fields: Optional[List[str]] = None) -> Tuple[bool, Optional[StoredDocument]]:
+        """
+        Read a document from the mirror.
+        
+        Args:
+            document_id: Document ID
+            fields: Optional field paths to read
+        
+        Returns:
+            (served, document) - served is False when the caller must read the backend
+        """
+        if not self.healthy or self._is_stale(document_id):
+            self._fallback()
+            return False, None
+        with self._lock:
+            doc = self._documents.get(document_id)
+        if doc is None and self.filters:
+            # Not matching the mirrored query does not mean it does not exist
+            self._fallback()
+            return False, None
+        with self._lock:
+            self._stats["hits"] += 1
+        if doc is None:
+            return True, None
+        data = pick_fields(doc.data, fields) if fields else doc.data
+        return True, StoredDocument(doc.id, copy.deepcopy(data), doc.update_time)
+    
+    def can_query(self, filters: List[tuple]) -> bool:
+        """
+        Whether a query can be served from the mirror right now.
+        
+        Args:
+            filters: Query filters
+        
+        Returns:
+            True if the mirror is live, covers the query and has no pending local writes
+        """
+        if self.healthy and self.covers(filters) and not self._is_stale():
+            return True
+        self._fallback()
+        return False
+    
+    def stream(
+        self,
+        filters: List[tuple],
+        order_by: Optional[str] = None,
+        descending: bool = False,
+        limit: Optional[int] = None,
+        start_after: Optional[List[Any]] = None,
+        fields: Optional[List[str]] = None
+    ) -> Iterator[StoredDocument]:
+        """
+        Run a query over the mirror (check can_query() first).
+        
+        Same arguments and semantics as StorageBackend.stream().
+        
+        Yields:
+            Stored documents
+        """
+        with self._lock:
+            self._stats["hits"] += 1
+            documents = list(self._documents.values())
+        for doc in run_query(documents, filters, order_by, descending, limit, start_after, fields):
+            yield StoredDocument(doc.id, copy.deepcopy(doc.data), doc.update_time)
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Mirror health and usage.
+        
+        Returns:
+            collection, state, healthy, documents, starts, events, hits,
+            fallbacks, last_event_at, last_error
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["documents"] = len(self._documents)
+        stats["collection"] = self.collection
+        stats["state"] = self.state
+        stats["healthy"] = self.healthy
+        return stats
@@ -0,0 +1,262 @@
+"""
+Query shape recording for DatabaseService.
+
+A query shape is a query with its values stripped: collection, which
+fields are filtered by equality, array membership or range, and the
+ordering. Shapes map one-to-one to the composite index a query needs, so
+recording them (with latency and read/returned counts) lets
+utils/scripts/index_advisor.py suggest firestore.indexes.json.
+"""
+import json
+import random
+import threading
+import time
+from typing import Dict, Any, Optional, List
+from utils.constants import (
+    DEFAULT_SLOW_QUERY_MS,
+    MAX_QUERY_SHAPES,
+    EQUALITY_OPERATORS,
+    ARRAY_OPERATORS,
+)
+
+
+def query_shape(
+    collection: str,
+    filters: List[tuple],
+    order_by: Optional[str] = None,
+    descending: bool = False
+) -> Dict[str, Any]:
+    """
+    Normalize a query into its shape.
+    
+    Args:
+        collection: Collection name
+        filters: List of tuples (field, operator, value)
+        order_by: Field to sort by
+        descending: Sort direction
+    
+    Returns:
+        Shape: collection, equality, array, range (sorted field lists),
+        order_by ([field, "ASCENDING"|"DESCENDING"] or None) and key
+    """
+    equality, array, range_fields = set(), set(), set()
+    for field, op, _ in filters:
+        if op in EQUALITY_OPERATORS:
+            equality.add(field)
+        elif op in ARRAY_OPERATORS:
+            array.add(field)
+        else:
+            range_fields.add(field)
+    
+    shape = {
+        "collection": collection,
+        "equality": sorted(equality),
+        "array": sorted(array),
+        "range": sorted(range_fields),
+        "order_by": [order_by, "DESCENDING" if descending else "ASCENDING"] if order_by else None
+    }
+    shape["key"] = shape_key(shape)
+    return shape
+
+
+def shape_key(shape: Dict[str, Any]) -> str:
+    """
+    Stable string key of a shape (e.g. "assets eq=isDeleted,uid order=balance DESCENDING").
+    
+    Args:
+        shape: Query shape
+    
+    Returns:
+        Shape key
+    """
+    parts = [shape["collection"]]
+    for name, label in (("equality", "eq"), ("array", "array"), ("range", "range")):
+        if shape[name]:
+            parts.append(f"{label}={','.join(shape[name])}")
+    if shape.get("order_by"):
+        parts.append(f"order={' '.join(shape['order_by'])}")
+    return " ".join(parts)
+
+
+def required_index(shape: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Composite index a query shape needs in Firestore, if any.
+    
+    Single-field indexes serve equality-only queries (by index merging) and
+    queries whose only range filter and ordering are on the same field.
+    Anything combining equality/array filters with a range filter or an
+    ordering on another field, or range/order on different fields, needs a
+    composite index: equality fields, then array fields, then the range
+    field, then the ordering.
+    
+    Args:
+        shape: Query shape
+    
+    Returns:
+        Index definition in firestore.indexes.json format, or None
+    """
+    order_field = shape["order_by"][0] if shape.get("order_by") else None
+    order_direction = shape["order_by"][1] if shape.get("order_by") else "ASCENDING"
+    sort_fields = list(shape["range"])
+    if order_field and order_field not in sort_fields:
+        sort_fields.append(order_field)
+    
+    filtered = len(shape["equality"]) + len(shape["array"])
+    if not sort_fields or (filtered == 0 and len(sort_fields) == 1):
+        return None
+    
+    fields = [{"fieldPath": field, "order": "ASCENDING"} for field in shape["equality"]]
+    fields += [{"fieldPath": field, "arrayConfig": "CONTAINS"} for field in shape["array"]]
+    for field in sort_fields:
+        fields.append({
+            "fieldPath": field,
+            "order": order_direction if field == order_field else "ASCENDING"
+        })
+    
+    return {
+        "collectionGroup": shape["collection"].rsplit("/", 1)[-1],
+        "queryScope": "COLLECTION",
+        "fields": fields
+    }
+
+
+class QueryRecorder:
+    """
+    Process-wide recorder of query shapes.
+    
+    Keeps per-shape aggregates in memory (bounded to MAX_QUERY_SHAPES) and
+    optionally appends one JSON line per sampled query to a log file for
+    the index advisor.
+    """
+    
+    def __init__(
+        self,
+        slow_query_ms: float = DEFAULT_SLOW_QUERY_MS,
+        log_path: Optional[str] = None,
+        sample_rate: float = 1.0
+    ):
+        """
+        Initialize recorder.
+        
+        Args:
+            slow_query_ms: Latency above which a query is reported as slow
+            log_path: Optional JSONL file receiving sampled query records
+            sample_rate: Fraction of queries written to log_path
+        """
+        self.slow_query_ms = slow_query_ms
+        self.log_path = log_path
+        self.sample_rate = sample_rate
+        self._shapes: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def from_config(cls, stats_config: Dict[str, Any]) -> "QueryRecorder":
+        """
+        Build a recorder from the `database.query_stats` config section.
+        
+        Args:
+            stats_config: Query stats configuration
+        
+        Returns:
+            QueryRecorder instance
+        """
+        return cls(
+            slow_query_ms=stats_config.get("slow_query_ms", DEFAULT_SLOW_QUERY_MS),
+            log_path=stats_config.get("log_path"),
+            sample_rate=stats_config.get("sample_rate", 1.0)
+        )
+    
+    def record(
+        self,
+        shape: Dict[str, Any],
+        duration_ms: float,
+        read: int,
+        returned: int,
+        error: Optional[str] = None
+    ) -> bool:
+        """
+        Record one executed query.
+        
+        Args:
+            shape: Query shape
+            duration_ms: Latency in milliseconds
+            read: Documents read from the backend
+            returned: Documents returned to the caller
+            error: Exception type name if the query failed
+        
+        Returns:
+            True if the query was slow
+        """
+        slow = duration_ms >= self.slow_query_ms
+        key = shape["key"]
+        
+        with self._lock:
+            stats = self._shapes.get(key)
+            if stats is None:
+                if len(self._shapes) < MAX_QUERY_SHAPES:
+                    stats = self._shapes[key] = {
+                        "shape": shape,
+                        "count": 0,
+                        "errors": 0,
+                        "slow": 0,
+                        "total_ms": 0.0,
+                        "max_ms": 0.0,
+                        "read": 0,
+                        "returned": 0,
+                        "last_error": None
+                    }
+            if stats is not None:
+                stats["count"] += 1
+                stats["total_ms"] += duration_ms
+                stats["max_ms"] = max(stats["max_ms"], duration_ms)
+                stats["read"] += read
+                stats["returned"] += returned
+                if slow:
+                    stats["slow"] += 1
+                if error:
+                    stats["errors"] += 1
+                    stats["last_error"] = error
+        
+        if self.log_path and (self.sample_rate >= 1.0 or random.random() < self.sample_rate):
+            self._append({
+                "ts": time.time(),
+                "shape": shape,
+                "duration_ms": round(duration_ms, 3),
+                "read": read,
+                "returned": returned,
+                "error": error
+            })
+        return slow
+    
+    def _append(self, record: Dict[str, Any]):
+        """Append a record to the JSONL log (best effort)."""
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        try:
+            with self._lock:
+                with open(self.log_path, "a") as f:
+                    f.write(line)
+        except OSError:
+            pass
+    
+    def stats(self) -> List[Dict[str, Any]]:
+        """
+        Per-shape aggregates, most total time first.
+        
+        Returns:
+            List of {key, shape, count, errors, slow, avg_ms, max_ms, read, returned, last_error}
+        """
+        with self._lock:
+            snapshot = [dict(stats) for stats in self._shapes.values()]
+        
+        results = []
+        for stats in snapshot:
+            stats["key"] = stats["shape"]["key"]
+            stats["avg_ms"] = round(stats["total_ms"] / stats["count"], 3) if stats["count"] else 0.0
+            results.append(stats)
+        return sorted(results, key=lambda s: s["total_ms"], reverse=True)
+    
+    def reset(self):
+        """Clear all recorded shapes."""
+        with self._lock:
+            self._shapes.clear()
+    
\ No newline at end of file
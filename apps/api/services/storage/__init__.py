@@ -0,0 +1,14 @@
+"""Storage backends for DatabaseService (Firestore, in-memory, SQLite)."""
+from services.storage.base import (
+    StorageBackend,
+    StoredDocument,
+    DocumentNotFoundError,
+    DocumentConflictError,
+    TransactionContentionError,
+    BackendTransaction,
+    ListenerHandle,
+    SERVER_TIMESTAMP,
+    DELETE_FIELD,
+    Increment,
+    is_delete_sentinel,
+)
@@ -0,0 +1,328 @@
+"""
+Storage backend interface used by DatabaseService.
+"""
+import sys
+from datetime import datetime
+from typing import Dict, Any, Optional, List, Iterator, Tuple, NamedTuple, Callable
+
+
+class DocumentNotFoundError(Exception):
+    """
+    Raised when updating a document that does not exist.
+    """
+
+
+class DocumentConflictError(Exception):
+    """
+    Raised when an optimistic-concurrency precondition fails
+    (the document changed since the caller read it).
+    """
+
+
+class TransactionContentionError(Exception):
+    """
+    Raised when a transaction attempt aborts because documents it read
+    were modified concurrently. Safe to retry.
+    """
+
+
+class _Sentinel:
+    """Backend-neutral write sentinel."""
+    
+    def __init__(self, name: str):
+        self.name = name
+    
+    def __repr__(self):
+        return self.name
+
+
+# Write sentinels understood by every backend
+SERVER_TIMESTAMP = _Sentinel("SERVER_TIMESTAMP")
+DELETE_FIELD = _Sentinel("DELETE_FIELD")
+
+
+class Increment:
+    """
+    Backend-neutral numeric increment transform.
+    
+    Example:
+        db.update("counters", "c1", {"value": Increment(1)})
+    """
+    
+    def __init__(self, value: float):
+        self.value = value
+    
+    def __repr__(self):
+        return f"Increment({self.value})"
+
+
+class StoredDocument(NamedTuple):
+    """A document as returned by a backend."""
+    id: str
+    data: Dict[str, Any]
+    update_time: datetime
+
+
+class BackendTransaction:
+    """
+    One transaction attempt. Reads must happen before writes; writes are
+    buffered and applied atomically on commit.
+    """
+    
+    def get(self, collection: str, document_id: str) -> Optional[StoredDocument]:
+        """
+        Read a document inside the transaction.
+        
+        Args:
+            collection: Collection name
+            document_id: Document ID
+        
+        Returns:
+            Stored document or None if not found
+        """
+        raise NotImplementedError
+    
+    def set(self, collection: str, document_id: str, data: Dict[str, Any]):
+        """Buffer a create/overwrite."""
+        raise NotImplementedError
+    
+    def update(self, collection: str, document_id: str, data: Dict[str, Any]):
+        """Buffer a field-path update (fails on commit if the document is missing)."""
+        raise NotImplementedError
+    
+    def delete(self, collection: str, document_id: str):
+        """Buffer a delete."""
+        raise NotImplementedError
+
+
+# Listener callback: (changes, initial) where changes are (document_id, document)
+# pairs and document is None when it left the result set
+ChangeCallback = Callable[[List[Tuple[str, Optional["StoredDocument"]]], bool], None]
+
+
+class ListenerHandle:
+    """
+    Handle of a realtime listener registered with StorageBackend.listen().
+    """
+    # True if changes are delivered before the write call returns
+    synchronous = False
+    
+    @property
+    def is_active(self) -> bool:
+        """Whether the listener is still receiving changes."""
+        raise NotImplementedError
+    
+    def close(self):
+        """Stop listening."""
+        raise NotImplementedError
+
+
+class StorageBackend:
+    """
+    Base class for DatabaseService storage backends.
+    
+    Semantics follow Firestore: update() only applies to existing documents,
+    keys passed to update() are field paths ("a.b"), documents missing a
+    filtered or ordered field never match, and results are ordered by
+    document ID after any order_by field.
+    """
+    name = "base"
+    
+    def get(
+        self,
+        collection: str,
+        document_id: str,
+        fields: Optional[List[str]] = None
+    ) -> Optional[StoredDocument]:
+        """
+        Read a document.
+        
+        Args:
+            collection: Collection name
+            document_id: Document ID
+            fields: Optional field paths to read
+        
+        Returns:
+            Stored document or None if not found
+        """
+        raise NotImplementedError
+    
+    def get_all(
+        self,
+        collection: str,
+        document_ids: List[str],
+        fields: Optional[List[str]] = None
+    ) -> Dict[str, Optional[StoredDocument]]:
+        """
+        Read several documents.
+        
+        Args:
+            collection: Collection name
+            document_ids: Document IDs
+            fields: Optional field paths to read
+        
+        Returns:
+            Document ID -> stored document (None if not found)
+        """
+        return {doc_id: self.get(collection, doc_id, fields) for doc_id in document_ids}
+    
+    def set(self, collection: str, document_id: str, data: Dict[str, Any]) -> datetime:
+        """
+        Create or overwrite a document.
+        
+        Args:
+            collection: Collection name
+            document_id: Document ID
+            data: Document data
+        
+        Returns:
+            Update time
+        """
+        raise NotImplementedError
+    
+    def update(
+        self,
+        collection: str,
+        document_id: str,
+        data: Dict[str, Any],
+        if_update_time: Optional[datetime] = None
+    ) -> datetime:
+        """
+        Update fields of an existing document.
+        
+        Args:
+            collection: Collection name
+            document_id: Document ID
+            data: Field paths -> values
+            if_update_time: Only apply if the document still has this update time
+        
+        Returns:
+            Update time
+        
+        Raises:
+            DocumentNotFoundError: If the document does not exist
+            DocumentConflictError: If if_update_time no longer matches
+        """
+        raise NotImplementedError
+    
+    def delete(
+        self,
+        collection: str,
+        document_id: str,
+        if_update_time: Optional[datetime] = None
+    ) -> bool:
+        """
+        Delete a document.
+        
+        Args:
+            collection: Collection name
+            document_id: Document ID
+            if_update_time: Only delete if the document still has this update time
+        
+        Returns:
+            True if deleted, False if not found
+        
+        Raises:
+            DocumentConflictError: If if_update_time no longer matches
+        """
+        raise NotImplementedError
+    
+    def stream(
+        self,
+        collection: str,
+        filters: List[tuple],
+        order_by: Optional[str] = None,
+        descending: bool = False,
+        limit: Optional[int] = None,
+        start_after: Optional[List[Any]] = None,
+        fields: Optional[List[str]] = None,
+        order_by_id: bool = False
+    ) -> Iterator[StoredDocument]:
+        """
+        Stream documents matching a query.
+        
+        Args:
+            collection: Collection name
+            filters: List of tuples (field, operator, value)
+            order_by: Field to sort by
+            descending: Sort direction
+            limit: Max documents
+            start_after: Cursor values (order_by value if ordered, then document ID)
+            fields: Optional field paths to read
+            order_by_id: Explicitly order by document ID after order_by (for cursors)
+        
+        Yields:
+            Stored documents
+        """
+        raise NotImplementedError
+    
+    def aggregate(
+        self,
+        collection: str,
+        filters: List[tuple],
+        aggregations: Dict[str, Tuple[str, Optional[str]]]
+    ) -> Dict[str, Any]:
+        """
+        Run count/sum/avg aggregations over a query.
+        
+        Args:
+            collection: Collection name
+            filters: List of tuples (field, operator, value)
+            aggregations: Alias -> (kind, field)
+        
+        Returns:
+            Alias -> value
+        """
+        raise NotImplementedError
+    
+    def listen(self, collection: str, filters: List[tuple], on_change: ChangeCallback) -> ListenerHandle:
+        """
+        Listen to the documents matching a query.
+        
+        on_change is first called with every matching document and
+        initial=True, then with each batch of changes.
+        
+        Args:
+            collection: Collection name
+            filters: List of tuples (field, operator, value)
+            on_change: Change callback
+        
+        Returns:
+            Listener handle
+        
+        Raises:
+            NotImplementedError: If the backend has no realtime updates
+        """
+        raise NotImplementedError(f"The {self.name} backend does not support listeners")
+    
+    def run_in_transaction(self, fn: Callable[[BackendTransaction], Any]) -> Any:
+        """
+        Run one transaction attempt (no retries).
+        
+        Args:
+            fn: Callback receiving the transaction; its return value is returned
+        
+        Returns:
+            Callback result
+        
+        Raises:
+            TransactionContentionError: If the attempt aborted due to contention
+            DocumentNotFoundError: If a buffered update targets a missing document
+        """
+        raise NotImplementedError
+
+
+def is_delete_sentinel(value: Any) -> bool:
+    """
+    Check for a delete-field sentinel (backend-neutral or native Firestore).
+    
+    Args:
+        value: Value being written
+    
+    Returns:
+        True if the value deletes the field
+    """
+    if value is DELETE_FIELD:
+        return True
+    firestore = sys.modules.get("google.cloud.firestore")
+    return firestore is not None and value is getattr(firestore, "DELETE_FIELD", None)
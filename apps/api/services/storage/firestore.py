@@ -0,0 +1,366 @@
+"""
+Google Cloud Firestore storage backend.
+"""
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Any, Optional, List, Iterator, Tuple, Callable
+from google.api_core import exceptions as gcp_exceptions
+from google.cloud import firestore
+from services.storage.base import (
+    StorageBackend,
+    StoredDocument,
+    DocumentNotFoundError,
+    DocumentConflictError,
+    TransactionContentionError,
+    BackendTransaction,
+    SERVER_TIMESTAMP,
+    DELETE_FIELD,
+    Increment,
+    ListenerHandle,
+    ChangeCallback,
+)
+from utils.constants import AGGREGATION_COUNT, AGGREGATION_SUM
+from utils.deadline import Deadline, DeadlineExceededError, rpc_kwargs, is_timeout_error
+
+
+def _to_native(value: Any) -> Any:
+    """
+    Translate backend-neutral sentinels into Firestore ones.
+    
+    Args:
+        value: Value being written
+    
+    Returns:
+        Firestore-compatible value
+    """
+    if value is SERVER_TIMESTAMP:
+        return firestore.SERVER_TIMESTAMP
+    if value is DELETE_FIELD:
+        return firestore.DELETE_FIELD
+    if isinstance(value, Increment):
+        return firestore.Increment(value.value)
+    if isinstance(value, dict):
+        return {k: _to_native(v) for k, v in value.items()}
+    return value
+
+
+@contextmanager
+def _deadline_errors(deadline: Optional[Deadline], operation: str):
+    """
+    Translate RPC timeouts into DeadlineExceededError when a deadline is set.
+    
+    Args:
+        deadline: Request deadline (None leaves errors untouched)
+        operation: Operation name for the error message
+    """
+    try:
+        yield
+    except DeadlineExceededError:
+        raise
+    except Exception as e:
+        if deadline and is_timeout_error(e):
+            raise DeadlineExceededError(f"Deadline exceeded during Firestore {operation}") from e
+        raise
+
+
+class FirestoreTransaction(BackendTransaction):
+    """
+    Transaction view over a native Firestore transaction.
+    """
+    
+    def __init__(self, client: firestore.Client, transaction, deadline: Optional[Deadline] = None):
+        """
+        Initialize view.
+        
+        Args:
+            client: Firestore client
+            transaction: Native Firestore transaction
+            deadline: Optional request deadline for reads
+        """
+        self.client = client
+        self.transaction = transaction
+        self.deadline = deadline
+    
+    def _ref(self, collection: str, document_id: str):
+        return self.client.collection(collection).document(document_id)
+    
+    def get(self, collection: str, document_id: str) -> Optional[StoredDocument]:
+        with _deadline_errors(self.deadline, "transaction read"):
+            doc = self._ref(collection, document_id).get(
+                transaction=self.transaction,
+                **rpc_kwargs(self.deadline, "transaction read")
+            )
+        if not doc.exists:
+            return None
+        return StoredDocument(doc.id, doc.to_dict() or {}, doc.update_time)
+    
+    def set(self, collection: str, document_id: str, data: Dict[str, Any]):
+        self.transaction.set(self._ref(collection, document_id), _to_native(data))
+    
+    def update(self, collection: str, document_id: str, data: Dict[str, Any]):
+        self.transaction.update(self._ref(collection, document_id), _to_native(data))
+    
+    def delete(self, collection: str, document_id: str):
+        self.transaction.delete(self._ref(collection, document_id))
+
+
+class FirestoreListener(ListenerHandle):
+    """
+    Handle of a Firestore on_snapshot watch.
+    """
+    
+    def __init__(self, watch):
+        """
+        Initialize handle.
+        
+        Args:
+            watch: Watch returned by Query.on_snapshot
+        """
+        self.watch = watch
+    
+    @property
+    def is_active(self) -> bool:
+        # The watch closes itself (sets _closed) when its stream fails for good
+        return not getattr(self.watch, "_closed", False)
+    
+    def close(self):
+        self.watch.unsubscribe()
+
+
+class FirestoreBackend(StorageBackend):
+    """
+    Storage backend for a live Firestore database.
+    """
+    name = "firestore"
+    
+    def __init__(self, client: firestore.Client, deadline: Optional[Deadline] = None):
+        """
+        Initialize backend.
+        
+        Args:
+            client: Firestore client
+            deadline: Optional request deadline; every RPC gets the remaining
+                budget as timeout and only retries while budget remains
+        """
+        self.client = client
+        self.deadline = deadline
+    
+    def _rpc(self, operation: str) -> Dict[str, Any]:
+        """timeout/retry kwargs for an RPC (empty without a deadline)."""
+        return rpc_kwargs(self.deadline, operation)
+    
+    def get(
+        self,
+        collection: str,
+        document_id: str,
+        fields: Optional[List[str]] = None
+    ) -> Optional[StoredDocument]:
+        doc_ref = self.client.collection(collection).document(document_id)
+        with _deadline_errors(self.deadline, "get"):
+            doc = doc_ref.get(field_paths=fields, **self._rpc("get")) if fields else doc_ref.get(**self._rpc("get"))
+        if not doc.exists:
+            return None
+        return StoredDocument(doc.id, doc.to_dict() or {}, doc.update_time)
+    
+    def get_all(
+        self,
+        collection: str,
+        document_ids: List[str],
+        fields: Optional[List[str]] = None
+    ) -> Dict[str, Optional[StoredDocument]]:
+        col_ref = self.client.collection(collection)
+        refs = [col_ref.document(doc_id) for doc_id in document_ids]
+        results = {doc_id: None for doc_id in document_ids}
+        with _deadline_errors(self.deadline, "get_all"):
+            if fields:
+                snapshots = self.client.get_all(refs, field_paths=fields, **self._rpc("get_all"))
+            else:
+                snapshots = self.client.get_all(refs, **self._rpc("get_all"))
+            for doc in snapshots:
+                if doc.exists:
+                    results[doc.id] = StoredDocument(doc.id, doc.to_dict() or {}, doc.update_time)
+        return results
+    
+    def set(self, collection: str, document_id: str, data: Dict[str, Any]) -> datetime:
+        doc_ref = self.client.collection(collection).document(document_id)
+        with _deadline_errors(self.deadline, "set"):
+            return doc_ref.set(_to_native(data), **self._rpc("set")).update_time
+    
+    def update(
+        self,
+        collection: str,
+        document_id: str,
+        data: Dict[str, Any],
+        if_update_time: Optional[datetime] = None
+    ) -> datetime:
+        doc_ref = self.client.collection(collection).document(document_id)
+        try:
+            with _deadline_errors(self.deadline, "update"):
+                # update() carries an implicit exists=True precondition
+                if if_update_time is not None:
+                    option = self.client.write_option(last_update_time=if_update_time)
+                    write_result = doc_ref.update(_to_native(data), option=option, **self._rpc("update"))
+                else:
+                    write_result = doc_ref.update(_to_native(data), **self._rpc("update"))
+        except gcp_exceptions.NotFound as e:
+            raise DocumentNotFoundError(f"Document '{document_id}' not found") from e
+        except gcp_exceptions.FailedPrecondition as e:
+            raise DocumentConflictError(f"Document '{document_id}' was modified concurrently") from e
+        return write_result.update_time
+    
+    def delete(
+        self,
+        collection: str,
+        document_id: str,
+        if_update_time: Optional[datetime] = None
+    ) -> bool:
+        doc_ref = self.client.collection(collection).document(document_id)
+        if if_update_time is not None:
+            option = self.client.write_option(last_update_time=if_update_time)
+        else:
+            option = self.client.write_option(exists=True)
+        
+        try:
+            with _deadline_errors(self.deadline, "delete"):
+                doc_ref.delete(option=option, **self._rpc("delete"))
+        except gcp_exceptions.NotFound:
+            return False
+        except gcp_exceptions.FailedPrecondition as e:
+            if if_update_time is None:
+                # exists=True precondition failed: the document is missing
+                return False
+            raise DocumentConflictError(f"Document '{document_id}' was modified concurrently") from e
+        return True
+    
+    def _build_query(
+        self,
+        collection: str,
+        filters: List[tuple],
+        order_by: Optional[str],
+        descending: bool,
+        order_by_id: bool,
+        start_after: Optional[List[Any]]
+    ):
+        """
+        Build a Firestore query with filters, ordering and an optional cursor.
+        
+        Args:
+            collection: Collection name
+            filters: List of tuples (field, operator, value)
+            order_by: Field to sort by
+            descending: Sort direction
+            order_by_id: Add document ID as a tie-breaker ordering
+            start_after: Cursor values (order_by value if ordered, then document ID)
+        
+        Returns:
+            Firestore query
+        """
+        col_ref = self.client.collection(collection)
+        ref = col_ref
+        
+        for field, op, value in filters:
+            ref = ref.where(filter=firestore.FieldFilter(field, op, value))
+        
+        direction = firestore.Query.DESCENDING if descending else firestore.Query.ASCENDING
+        if order_by:
+            ref = ref.order_by(order_by, direction=direction)
+        
+        if order_by_id or start_after:
+            ref = ref.order_by(firestore.FieldPath.document_id(), direction=direction)
+        
+        if start_after:
+            cursor = {firestore.FieldPath.document_id(): col_ref.document(start_after[-1])}
+            if order_by:
+                cursor[order_by] = start_after[0]
+            ref = ref.start_after(cursor)
+        
+        return ref
+    
+    def stream(
+        self,
+        collection: str,
+        filters: List[tuple],
+        order_by: Optional[str] = None,
+        descending: bool = False,
+        limit: Optional[int] = None,
+        start_after: Optional[List[Any]] = None,
+        fields: Optional[List[str]] = None,
+        order_by_id: bool = False
+    ) -> Iterator[StoredDocument]:
+        ref = self._build_query(collection, filters, order_by, descending, order_by_id, start_after)
+        if fields:
+            ref = ref.select(fields)
+        if limit:
+            ref = ref.limit(limit)
+        
+        with _deadline_errors(self.deadline, "query"):
+            for doc in ref.stream(**self._rpc("query")):
+                yield StoredDocument(doc.id, doc.to_dict() or {}, doc.update_time)
+    
+    def aggregate(
+        self,
+        collection: str,
+        filters: List[tuple],
+        aggregations: Dict[str, Tuple[str, Optional[str]]]
+    ) -> Dict[str, Any]:
+        ref = self._build_query(collection, filters, None, False, False, None)
+        agg_query = None
+        for alias, (kind, field) in aggregations.items():
+            target = agg_query or ref
+            if kind == AGGREGATION_COUNT:
+                agg_query = target.count(alias=alias)
+            elif kind == AGGREGATION_SUM:
+                agg_query = target.sum(field, alias=alias)
+            else:
+                agg_query = target.avg(field, alias=alias)
+        
+        results = {alias: None for alias in aggregations}
+        with _deadline_errors(self.deadline, "aggregation"):
+            for row in agg_query.get(**self._rpc("aggregation")):
+                for result in row:
+                    results[result.alias] = result.value
+        return results
+    
+    def listen(self, collection: str, filters: List[tuple], on_change: ChangeCallback) -> ListenerHandle:
+        ref = self._build_query(collection, filters, None, False, False, None)
+        initial = [True]
+        
+        def on_snapshot(snapshot, changes, read_time):
+            # Runs on the watch thread; the first call carries the full result set
+            if initial[0]:
+                batch = [(doc.id, StoredDocument(doc.id, doc.to_dict() or {}, doc.update_time)) for doc in snapshot]
+            else:
+                batch = []
+                for change in changes:
+                    doc = change.document
+                    if change.type.name == "REMOVED":
+                        batch.append((doc.id, None))
+                    else:
+                        batch.append((doc.id, StoredDocument(doc.id, doc.to_dict() or {}, doc.update_time)))
+            on_change(batch, initial[0])
+            initial[0] = False
+        
+        return FirestoreListener(ref.on_snapshot(on_snapshot))
+    
+    def run_in_transaction(self, fn: Callable[[BackendTransaction], Any]) -> Any:
+        # Single attempt: retries and backoff are handled by DatabaseService
+        if self.deadline:
+            self.deadline.check("transaction")
+        transaction = self.client.transaction(max_attempts=1)
+        
+        @firestore.transactional
+        def attempt(native_transaction):
+            return fn(FirestoreTransaction(self.client, native_transaction, self.deadline))
+        
+        try:
+            with _deadline_errors(self.deadline, "transaction"):
+                return attempt(transaction)
+        except gcp_exceptions.Aborted as e:
+            raise TransactionContentionError(str(e)) from e
+        except gcp_exceptions.NotFound as e:
+            raise DocumentNotFoundError(str(e)) from e
+        except ValueError as e:
+            # Raised by the client when the only commit attempt was aborted
+            if "Failed to commit transaction" in str(e):
+                raise TransactionContentionError(str(e)) from e
+            raise
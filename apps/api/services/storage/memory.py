@@ -0,0 +1,689 @@
+"""
+In-memory storage backend and the query engine shared with SQLite.
+"""
+import copy
+import heapq
+import threading
+from datetime import datetime, timezone, timedelta
+from typing import Dict, Any, Optional, List, Iterator, Tuple, Iterable, Set, Callable
+from services.storage.base import (
+    StorageBackend,
+    StoredDocument,
+    DocumentNotFoundError,
+    DocumentConflictError,
+    TransactionContentionError,
+    BackendTransaction,
+    SERVER_TIMESTAMP,
+    DELETE_FIELD,
+    Increment,
+    ListenerHandle,
+    ChangeCallback,
+)
+from response.formatter import pick_fields
+from utils.constants import AGGREGATION_COUNT, AGGREGATION_SUM
+
+INEQUALITY_OPERATORS = ("<", "<=", ">", ">=", "!=", "not-in")
+
+_MISSING = object()
+
+
+def implicit_order_field(filters: List[tuple]) -> Optional[str]:
+    """
+    Field Firestore orders by when a query has no order_by: the first
+    inequality filter's field (None without inequality filters).
+    
+    Args:
+        filters: List of tuples (field, operator, value)
+    """
+    return next((f for f, op, _ in filters if op in INEQUALITY_OPERATORS), None)
+
+
+def get_path(data: Dict[str, Any], path: str) -> Any:
+    """
+    Read a dotted field path.
+    
+    Args:
+        data: Document data
+        path: Field path (e.g. "address.city")
+    
+    Returns:
+        Value, or _MISSING if the path does not exist
+    """
+    value = data
+    for part in path.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return _MISSING
+        value = value[part]
+    return value
+
+
+def _type_rank(value: Any) -> int:
+    """Firestore cross-type ordering: null < bool < number < timestamp < string < bytes < array < map."""
+    if value is None:
+        return 0
+    if isinstance(value, bool):
+        return 1
+    if isinstance(value, (int, float)):
+        return 2
+    if isinstance(value, datetime):
+        return 3
+    if isinstance(value, str):
+        return 4
+    if isinstance(value, bytes):
+        return 5
+    if isinstance(value, (list, tuple)):
+        return 6
+    return 7
+
+
+def sort_key(value: Any) -> Tuple[int, Any]:
+    """
+    Build a comparable key following Firestore value ordering.
+    
+    Args:
+        value: Field value
+    
+    Returns:
+        (type rank, comparable value)
+    """
+    rank = _type_rank(value)
+    if rank == 0:
+        return (0, 0)
+    if rank == 6:
+        return (rank, tuple(sort_key(v) for v in value))
+    if rank == 7:
+        return (rank, tuple(sorted((k, sort_key(v)) for k, v in value.items())))
+    return (rank, value)
+
+
+def matches(data: Dict[str, Any], filters: Iterable[tuple]) -> bool:
+    """
+    Evaluate Firestore filters against a document.
+    
+    Args:
+        data: Document data
+        filters: List of tuples (field, operator, value)
+    
+    Returns:
+        True if every filter matches
+    """
+    for field, op, expected in filters:
+        value = get_path(data, field)
+        if value is _MISSING:
+            return False
+        
+        if op == "==":
+            # Fast path for same-typed scalars
+            if type(value) is type(expected):
+                if value != expected:
+                    return False
+            elif sort_key(value) != sort_key(expected):
+                return False
+        elif op == "!=":
+            if value is None or sort_key(value) == sort_key(expected):
+                return False
+        elif op in ("<", "<=", ">", ">="):
+            left, right = sort_key(value), sort_key(expected)
+            if left[0] != right[0]:
+                return False
+            if op == "<" and not left < right:
+                return False
+            if op == "<=" and not left <= right:
+                return False
+            if op == ">" and not left > right:
+                return False
+            if op == ">=" and not left >= right:
+                return False
+        elif op == "in":
+            if sort_key(value) not in [sort_key(v) for v in expected]:
+                return False
+        elif op == "not-in":
+            if value is None or sort_key(value) in [sort_key(v) for v in expected]:
+                return False
+        elif op == "array-contains":
+            if not isinstance(value, list) or sort_key(expected) not in [sort_key(v) for v in value]:
+                return False
+        elif op == "array-contains-any":
+            if not isinstance(value, list):
+                return False
+            keys = [sort_key(v) for v in value]
+            if not any(sort_key(v) in keys for v in expected):
+                return False
+        else:
+            raise ValueError(f"Unsupported filter operator '{op}'")
+    return True
+
+
+def run_query(
+    documents: Iterable[StoredDocument],
+    filters: List[tuple],
+    order_by: Optional[str] = None,
+    descending: bool = False,
+    limit: Optional[int] = None,
+    start_after: Optional[List[Any]] = None,
+    fields: Optional[List[str]] = None
+) -> List[StoredDocument]:
+    """
+    Filter, order, page and project documents like a Firestore query.
+    
+    Args:
+        documents: Candidate documents of one collection
+        filters: List of tuples (field, operator, value)
+        order_by: Field to sort by
+        descending: Sort direction
+        limit: Max documents
+        start_after: Cursor values (sort value if ordered, explicitly or by
+            an inequality filter, then document ID)
+        fields: Optional field paths to keep
+    
+    Returns:
+        Matching documents
+    """
+    # Firestore implicitly orders by the inequality field when no order_by is given
+    sort_field = order_by or implicit_order_field(filters)
+    
+    matched = []
+    for doc in documents:
+        if not matches(doc.data, filters):
+            continue
+        if sort_field:
+            value = get_path(doc.data, sort_field)
+            if value is _MISSING:
+                continue
+            matched.append(((sort_key(value), doc.id), doc))
+        else:
+            matched.append(((doc.id,), doc))
+    
+    if start_after:
+        # Cursors carry the sort value whenever documents are sorted by one
+        if sort_field:
+            if len(start_after) < 2:
+                raise ValueError(f"Cursor must carry the value of '{sort_field}' and the document ID")
+            cursor = (sort_key(start_after[0]), start_after[-1])
+        else:
+            cursor = (start_after[-1],)
+        if descending:
+            matched = [item for item in matched if item[0] < cursor]
+        else:
+            matched = [item for item in matched if item[0] > cursor]
+    
+    # Partial sort when only the first page is needed
+    if limit and limit < len(matched):
+        select = heapq.nlargest if descending else heapq.nsmallest
+        matched = select(limit, matched, key=lambda item: item[0])
+    else:
+        matched.sort(key=lambda item: item[0], reverse=descending)
+    
+    if fields:
+        return [StoredDocument(doc.id, pick_fields(doc.data, fields), doc.update_time) for _, doc in matched]
+    return [doc for _, doc in matched]
+
+
+def aggregate_documents(
+    documents: Iterable[StoredDocument],
+    aggregations: Dict[str, Tuple[str, Optional[str]]]
+) -> Dict[str, Any]:
+    """
+    Compute count/sum/avg aggregations like Firestore (non-numeric values are ignored).
+    
+    Args:
+        documents: Matching documents
+        aggregations: Alias -> (kind, field)
+    
+    Returns:
+        Alias -> value
+    """
+    counts = {alias: 0 for alias in aggregations}
+    sums = {alias: 0 for alias in aggregations}
+    
+    for doc in documents:
+        for alias, (kind, field) in aggregations.items():
+            if kind == AGGREGATION_COUNT:
+                counts[alias] += 1
+                continue
+            value = get_path(doc.data, field)
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                counts[alias] += 1
+                sums[alias] += value
+    
+    results = {}
+    for alias, (kind, _) in aggregations.items():
+        if kind == AGGREGATION_COUNT:
+            results[alias] = counts[alias]
+        elif kind == AGGREGATION_SUM:
+            results[alias] = sums[alias]
+        else:
+            results[alias] = sums[alias] / counts[alias] if counts[alias] else None
+    return results
+
+
+def resolve_value(value: Any, now: datetime, current: Any = _MISSING) -> Any:
+    """
+    Resolve write sentinels into stored values.
+    
+    Args:
+        value: Value being written
+        now: Commit timestamp
+        current: Current stored value (for increments)
+    
+    Returns:
+        Value to store, or DELETE_FIELD
+    """
+    if value is SERVER_TIMESTAMP:
+        return now
+    if isinstance(value, Increment):
+        base = current if isinstance(current, (int, float)) and not isinstance(current, bool) else 0
+        return base + value.value
+    if isinstance(value, dict):
+        return {k: resolve_value(v, now) for k, v in value.items() if v is not DELETE_FIELD}
+    return copy.deepcopy(value)
+
+
+def apply_update(data: Dict[str, Any], updates: Dict[str, Any], now: datetime) -> Dict[str, Any]:
+    """
+    Apply field-path updates to a copy of a document.
+    
+    Args:
+        data: Current document data
+        updates: Field paths -> values (sentinels allowed)
+        now: Commit timestamp
+    
+    Returns:
+        Updated document data
+    """
+    result = copy.deepcopy(data)
+    for path, value in updates.items():
+        parts = path.split(".")
+        target = result
+        for part in parts[:-1]:
+            if not isinstance(target.get(part), dict):
+                if value is DELETE_FIELD:
+                    target = None
+                    break
+                target[part] = {}
+            target = target[part]
+        if target is None:
+            continue
+        
+        if value is DELETE_FIELD:
+            target.pop(parts[-1], None)
+        else:
+            target[parts[-1]] = resolve_value(value, now, target.get(parts[-1], _MISSING))
+    return result
+
+
+class CommitClock:
+    """Strictly increasing UTC commit timestamps."""
+    
+    def __init__(self):
+        self._last = datetime.min.replace(tzinfo=timezone.utc)
+        self._lock = threading.Lock()
+    
+    def now(self) -> datetime:
+        with self._lock:
+            now = datetime.now(timezone.utc)
+            if now <= self._last:
+                now = self._last + timedelta(microseconds=1)
+            self._last = now
+            return now
+
+
+class OptimisticTransaction(BackendTransaction):
+    """
+    Transaction for local backends: records the version of every document
+    read, buffers writes, and validates the versions on commit.
+    """
+    
+    def __init__(self, backend: StorageBackend):
+        """
+        Initialize transaction.
+        
+        Args:
+            backend: Local backend (must implement commit_transaction)
+        """
+        self.backend = backend
+        # (collection, document_id) -> update time read (None if missing)
+        self.reads: Dict[Tuple[str, str], Optional[datetime]] = {}
+        # (kind, collection, document_id, data)
+        self.writes: List[Tuple[str, str, str, Optional[Dict[str, Any]]]] = []
+    
+    def get(self, collection: str, document_id: str) -> Optional[StoredDocument]:
+        if self.writes:
+            raise ValueError("Transaction reads must happen before writes")
+        doc = self.backend.get(collection, document_id)
+        self.reads[(collection, document_id)] = doc.update_time if doc else None
+        return doc
+    
+    def set(self, collection: str, document_id: str, data: Dict[str, Any]):
+        self.writes.append(("set", collection, document_id, data))
+    
+    def update(self, collection: str, document_id: str, data: Dict[str, Any]):
+        self.writes.append(("update", collection, document_id, data))
+    
+    def delete(self, collection: str, document_id: str):
+        self.writes.append(("delete", collection, document_id, None))
+
+
+def stage_writes(
+    transaction: OptimisticTransaction,
+    read_current: Callable[[str, str], Optional[StoredDocument]],
+    now: datetime
+) -> Dict[Tuple[str, str], Optional[Dict[str, Any]]]:
+    """
+    Validate a transaction's reads and compute the resulting documents.
+    
+    Args:
+        transaction: Transaction to commit
+        read_current: Reads the committed version of a document
+        now: Commit timestamp
+    
+    Returns:
+        (collection, document_id) -> new data (None if deleted)
+    
+    Raises:
+        TransactionContentionError: If a document read has changed since
+        DocumentNotFoundError: If an update targets a missing document
+    """
+    for (collection, document_id), read_time in transaction.reads.items():
+        current = read_current(collection, document_id)
+        if (current.update_time if current else None) != read_time:
+            raise TransactionContentionError(f"Document '{document_id}' changed during the transaction")
+    
+    staged: Dict[Tuple[str, str], Optional[Dict[str, Any]]] = {}
+    for kind, collection, document_id, data in transaction.writes:
+        key = (collection, document_id)
+        if kind == "set":
+            staged[key] = resolve_value(data, now)
+        elif kind == "delete":
+            staged[key] = None
+        else:
+            if key in staged:
+                existing = staged[key]
+            else:
+                current = read_current(collection, document_id)
+                existing = current.data if current else None
+            if existing is None:
+                raise DocumentNotFoundError(f"Document '{document_id}' not found")
+            staged[key] = apply_update(existing, data, now)
+    return staged
+
+
+class MemoryListener(ListenerHandle):
+    """
+    Listener on a MemoryBackend query, notified synchronously on commit.
+    """
+    synchronous = True
+    
+    def __init__(self, backend: "MemoryBackend", collection: str, filters: List[tuple], on_change: ChangeCallback):
+        """
+        Initialize listener.
+        
+        Args:
+            backend: Backend notifying this listener
+            collection: Collection name
+            filters: List of tuples (field, operator, value)
+            on_change: Change callback
+        """
+        self.backend = backend
+        self.collection = collection
+        self.filters = filters
+        self.on_change = on_change
+        self.active = True
+    
+    @property
+    def is_active(self) -> bool:
+        return self.active
+    
+    def notify(self, document_id: str, old: Optional[Dict[str, Any]], new: Optional[StoredDocument]):
+        """
+        Deliver a write if it affects the query result set.
+        
+        Args:
+            document_id: Document ID
+            old: Previous document data (None if created)
+            new: Stored document (None if deleted)
+        """
+        if new is not None and matches(new.data, self.filters):
+            self.on_change([(document_id, StoredDocument(document_id, copy.deepcopy(new.data), new.update_time))], False)
+        elif old is not None and matches(old, self.filters):
+            self.on_change([(document_id, None)], False)
+    
+    def close(self):
+        self.active = False
+        self.backend._unlisten(self)
+
+
+class MemoryBackend(StorageBackend):
+    """
+    Storage backend holding documents in process memory.
+    
+    Intended for tests, local development and benchmarks. Data is lost
+    when the process exits. Fields used in equality filters get a hash
+    index on first use, maintained on every write.
+    """
+    name = "memory"
+    
+    def __init__(self):
+        """Initialize an empty store."""
+        self._collections: Dict[str, Dict[str, StoredDocument]] = {}
+        # collection -> field -> value key -> document IDs
+        self._indexes: Dict[str, Dict[str, Dict[Any, Set[str]]]] = {}
+        self._lock = threading.RLock()
+        self._clock = CommitClock()
+        # collection -> active listeners
+        self._listeners: Dict[str, List["MemoryListener"]] = {}
+    
+    def _documents(self, collection: str) -> Dict[str, StoredDocument]:
+        return self._collections.setdefault(collection, {})
+    
+    def _reindex(self, collection: str, document_id: str, old: Optional[Dict[str, Any]], new: Optional[Dict[str, Any]]):
+        """
+        Update equality indexes after a write.
+        
+        Args:
+            collection: Collection name
+            document_id: Document ID
+            old: Previous document data (None if created)
+            new: New document data (None if deleted)
+        """
+        for field, index in self._indexes.get(collection, {}).items():
+            if old is not None:
+                value = get_path(old, field)
+                if value is not _MISSING:
+                    index.get(sort_key(value), set()).discard(document_id)
+            if new is not None:
+                value = get_path(new, field)
+                if value is not _MISSING:
+                    index.setdefault(sort_key(value), set()).add(document_id)
+    
+    def _written(self, collection: str, document_id: str, old: Optional[Dict[str, Any]], new: Optional[StoredDocument]):
+        """
+        Maintain indexes and notify listeners after a write (lock held).
+        
+        Args:
+            collection: Collection name
+            document_id: Document ID
+            old: Previous document data (None if created)
+            new: Stored document (None if deleted)
+        """
+        self._reindex(collection, document_id, old, new.data if new else None)
+        for listener in self._listeners.get(collection, []):
+            listener.notify(document_id, old, new)
+    
+    def _index(self, collection: str, field: str) -> Dict[Any, Set[str]]:
+        """
+        Get (building on first use) the equality index of a field.
+        
+        Args:
+            collection: Collection name
+            field: Field path
+        
+        Returns:
+            Value key -> document IDs
+        """
+        indexes = self._indexes.setdefault(collection, {})
+        if field not in indexes:
+            index: Dict[Any, Set[str]] = {}
+            for doc in self._documents(collection).values():
+                value = get_path(doc.data, field)
+                if value is not _MISSING:
+                    index.setdefault(sort_key(value), set()).add(doc.id)
+            indexes[field] = index
+        return indexes[field]
+    
+    def _candidates(self, collection: str, filters: List[tuple]) -> List[StoredDocument]:
+        """
+        Narrow a collection down using the most selective equality filter.
+        
+        Args:
+            collection: Collection name
+            filters: List of tuples (field, operator, value)
+        
+        Returns:
+            Candidate documents (still to be matched)
+        """
+        with self._lock:
+            documents = self._documents(collection)
+            best = None
+            for field, op, value in filters:
+                if op != "==":
+                    continue
+                ids = self._index(collection, field).get(sort_key(value), set())
+                if best is None or len(ids) < len(best):
+                    best = ids
+            if best is None:
+                return list(documents.values())
+            return [documents[doc_id] for doc_id in best]
+    
+    def get(
+        self,
+        collection: str,
+        document_id: str,
+        fields: Optional[List[str]] = None
+    ) -> Optional[StoredDocument]:
+        with self._lock:
+            doc = self._documents(collection).get(document_id)
+        if doc is None:
+            return None
+        data = pick_fields(doc.data, fields) if fields else doc.data
+        return StoredDocument(doc.id, copy.deepcopy(data), doc.update_time)
+    
+    def set(self, collection: str, document_id: str, data: Dict[str, Any]) -> datetime:
+        with self._lock:
+            documents = self._documents(collection)
+            now = self._clock.now()
+            stored = resolve_value(data, now)
+            old = documents.get(document_id)
+            documents[document_id] = StoredDocument(document_id, stored, now)
+            self._written(collection, document_id, old.data if old else None, documents[document_id])
+            return now
+    
+    def update(
+        self,
+        collection: str,
+        document_id: str,
+        data: Dict[str, Any],
+        if_update_time: Optional[datetime] = None
+    ) -> datetime:
+        with self._lock:
+            documents = self._documents(collection)
+            doc = documents.get(document_id)
+            if doc is None:
+                raise DocumentNotFoundError(f"Document '{document_id}' not found")
+            if if_update_time is not None and doc.update_time != if_update_time:
+                raise DocumentConflictError(f"Document '{document_id}' was modified concurrently")
+            now = self._clock.now()
+            stored = apply_update(doc.data, data, now)
+            documents[document_id] = StoredDocument(document_id, stored, now)
+            self._written(collection, document_id, doc.data, documents[document_id])
+            return now
+    
+    def delete(
+        self,
+        collection: str,
+        document_id: str,
+        if_update_time: Optional[datetime] = None
+    ) -> bool:
+        with self._lock:
+            documents = self._documents(collection)
+            doc = documents.get(document_id)
+            if doc is None:
+                if if_update_time is not None:
+                    raise DocumentConflictError(f"Document '{document_id}' was modified concurrently")
+                return False
+            if if_update_time is not None and doc.update_time != if_update_time:
+                raise DocumentConflictError(f"Document '{document_id}' was modified concurrently")
+            del documents[document_id]
+            self._written(collection, document_id, doc.data, None)
+            return True
+    
+    def stream(
+        self,
+        collection: str,
+        filters: List[tuple],
+        order_by: Optional[str] = None,
+        descending: bool = False,
+        limit: Optional[int] = None,
+        start_after: Optional[List[Any]] = None,
+        fields: Optional[List[str]] = None,
+        order_by_id: bool = False
+    ) -> Iterator[StoredDocument]:
+        candidates = self._candidates(collection, filters)
+        for doc in run_query(candidates, filters, order_by, descending, limit, start_after, fields):
+            yield StoredDocument(doc.id, copy.deepcopy(doc.data), doc.update_time)
+    
+    def aggregate(
+        self,
+        collection: str,
+        filters: List[tuple],
+        aggregations: Dict[str, Tuple[str, Optional[str]]]
+    ) -> Dict[str, Any]:
+        candidates = self._candidates(collection, filters)
+        return aggregate_documents(run_query(candidates, filters), aggregations)
+    
+    def run_in_transaction(self, fn: Callable[[BackendTransaction], Any]) -> Any:
+        transaction = OptimisticTransaction(self)
+        result = fn(transaction)
+        if not transaction.writes:
+            return result
+        
+        with self._lock:
+            now = self._clock.now()
+            staged = stage_writes(transaction, lambda c, d: self._documents(c).get(d), now)
+            for (collection, document_id), data in staged.items():
+                documents = self._documents(collection)
+                old = documents.get(document_id)
+                if data is None:
+                    documents.pop(document_id, None)
+                else:
+                    documents[document_id] = StoredDocument(document_id, data, now)
+                self._written(collection, document_id, old.data if old else None, documents.get(document_id))
+        return result
+    
+    def listen(self, collection: str, filters: List[tuple], on_change: ChangeCallback) -> ListenerHandle:
+        with self._lock:
+            listener = MemoryListener(self, collection, filters, on_change)
+            initial = [
+                (doc.id, StoredDocument(doc.id, copy.deepcopy(doc.data), doc.update_time))
+                for doc in run_query(self._candidates(collection, filters), filters)
+            ]
+            on_change(initial, True)
+            self._listeners.setdefault(collection, []).append(listener)
+        return listener
+    
+    def _unlisten(self, listener: "MemoryListener"):
+        """Remove a listener."""
+        with self._lock:
+            listeners = self._listeners.get(listener.collection, [])
+            if listener in listeners:
+                listeners.remove(listener)
+    
+    def clear(self):
+        """Drop every document."""
+        with self._lock:
+            self._collections.clear()
+            self._indexes.clear()
+            for listeners in self._listeners.values():
+                for listener in listeners:
+                    listener.active = False
+            self._listeners.clear()
@@ -0,0 +1,318 @@
+"""
+SQLite-file storage backend.
+"""
+import json
+import re
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, Any, Optional, List, Iterator, Tuple, Callable
+from services.storage.base import (
+    StorageBackend,
+    StoredDocument,
+    DocumentNotFoundError,
+    DocumentConflictError,
+    BackendTransaction,
+)
+from services.storage.memory import (
+    CommitClock,
+    OptimisticTransaction,
+    stage_writes,
+    apply_update,
+    aggregate_documents,
+    resolve_value,
+    run_query,
+)
+from response.formatter import pick_fields
+
+# Only simple field paths are pushed down into SQL as json_extract prefilters
+SQL_FIELD_PATTERN = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z_][A-Za-z0-9_]*)*$")
+
+
+def _encode(value: Any) -> Any:
+    """JSON default hook: timestamps are stored as {"$dt": iso}."""
+    if isinstance(value, datetime):
+        return {"$dt": value.isoformat()}
+    raise TypeError(f"Cannot store values of type {type(value).__name__}")
+
+
+def _decode(obj: Dict[str, Any]) -> Any:
+    """JSON object hook reversing _encode."""
+    if len(obj) == 1 and "$dt" in obj:
+        return datetime.fromisoformat(obj["$dt"])
+    return obj
+
+
+def _sql_condition(field: str, op: str, value: Any) -> Optional[Tuple[str, List[Any]]]:
+    """
+    Translate a filter into an exact SQL condition on the JSON document.
+    
+    Args:
+        field: Field path
+        op: Operator
+        value: Filter value
+    
+    Returns:
+        (sql, params), or None if the filter must be evaluated in Python
+    """
+    if not SQL_FIELD_PATTERN.match(field):
+        return None
+    path = f"$.{field}"
+    
+    if op == "==":
+        values = [value]
+    elif op == "in" and isinstance(value, (list, tuple)) and value:
+        values = list(value)
+    else:
+        return None
+    
+    if all(v is None for v in values):
+        return "json_type(data, ?) = 'null'", [path]
+    if all(isinstance(v, bool) for v in values):
+        types = sorted({"true" if v else "false" for v in values})
+        return f"json_type(data, ?) IN ({','.join('?' for _ in types)})", [path, *types]
+    if all(isinstance(v, str) for v in values):
+        placeholders = ",".join("?" for _ in values)
+        return f"(json_type(data, ?) = 'text' AND json_extract(data, ?) IN ({placeholders}))", [path, path, *values]
+    if all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in values):
+        placeholders = ",".join("?" for _ in values)
+        return f"(json_type(data, ?) IN ('integer', 'real') AND json_extract(data, ?) IN ({placeholders}))", [path, path, *values]
+    return None
+
+
+class SqliteBackend(StorageBackend):
+    """
+    Storage backend persisting documents as JSON rows in a SQLite file.
+    
+    Equality and `in` filters on simple field paths are evaluated in SQL.
+    When every filter is pushed down and results are ordered by document ID,
+    cursor and limit are applied in SQL too; otherwise the remaining work is
+    done in Python with Firestore semantics.
+    """
+    name = "sqlite"
+    
+    def __init__(self, path: str):
+        """
+        Open (or create) the database file.
+        
+        Args:
+            path: SQLite file path (":memory:" for a private in-memory database)
+        """
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.RLock()
+        self._clock = CommitClock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS documents ("
+                " collection TEXT NOT NULL,"
+                " id TEXT NOT NULL,"
+                " data TEXT NOT NULL,"
+                " update_time TEXT NOT NULL,"
+                " PRIMARY KEY (collection, id))"
+            )
+    
+    def _row_to_document(self, row: Tuple[str, str, str]) -> StoredDocument:
+        doc_id, data, update_time = row
+        return StoredDocument(doc_id, json.loads(data, object_hook=_decode), datetime.fromisoformat(update_time))
+    
+    def _read(self, collection: str, document_id: str) -> Optional[StoredDocument]:
+        row = self._conn.execute(
+            "SELECT id, data, update_time FROM documents WHERE collection = ? AND id = ?",
+            (collection, document_id)
+        ).fetchone()
+        return self._row_to_document(row) if row else None
+    
+    def _write(self, collection: str, document_id: str, data: Dict[str, Any], now: datetime):
+        self._conn.execute(
+            "INSERT OR REPLACE INTO documents (collection, id, data, update_time) VALUES (?, ?, ?, ?)",
+            (collection, document_id, json.dumps(data, default=_encode), now.isoformat())
+        )
+    
+    def get(
+        self,
+        collection: str,
+        document_id: str,
+        fields: Optional[List[str]] = None
+    ) -> Optional[StoredDocument]:
+        with self._lock:
+            doc = self._read(collection, document_id)
+        if doc and fields:
+            return StoredDocument(doc.id, pick_fields(doc.data, fields), doc.update_time)
+        return doc
+    
+    def get_all(
+        self,
+        collection: str,
+        document_ids: List[str],
+        fields: Optional[List[str]] = None
+    ) -> Dict[str, Optional[StoredDocument]]:
+        results = {doc_id: None for doc_id in document_ids}
+        if not document_ids:
+            return results
+        placeholders = ",".join("?" for _ in document_ids)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT id, data, update_time FROM documents WHERE collection = ? AND id IN ({placeholders})",
+                (collection, *document_ids)
+            ).fetchall()
+        for row in rows:
+            doc = self._row_to_document(row)
+            if fields:
+                doc = StoredDocument(doc.id, pick_fields(doc.data, fields), doc.update_time)
+            results[doc.id] = doc
+        return results
+    
+    def set(self, collection: str, document_id: str, data: Dict[str, Any]) -> datetime:
+        with self._lock:
+            now = self._clock.now()
+            self._write(collection, document_id, resolve_value(data, now), now)
+            return now
+    
+    def update(
+        self,
+        collection: str,
+        document_id: str,
+        data: Dict[str, Any],
+        if_update_time: Optional[datetime] = None
+    ) -> datetime:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                doc = self._read(collection, document_id)
+                if doc is None:
+                    raise DocumentNotFoundError(f"Document '{document_id}' not found")
+                if if_update_time is not None and doc.update_time != if_update_time:
+                    raise DocumentConflictError(f"Document '{document_id}' was modified concurrently")
+                now = self._clock.now()
+                self._write(collection, document_id, apply_update(doc.data, data, now), now)
+                self._conn.execute("COMMIT")
+                return now
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+    
+    def delete(
+        self,
+        collection: str,
+        document_id: str,
+        if_update_time: Optional[datetime] = None
+    ) -> bool:
+        with self._lock:
+            if if_update_time is None:
+                cursor = self._conn.execute(
+                    "DELETE FROM documents WHERE collection = ? AND id = ?",
+                    (collection, document_id)
+                )
+                return cursor.rowcount > 0
+            
+            cursor = self._conn.execute(
+                "DELETE FROM documents WHERE collection = ? AND id = ? AND update_time = ?",
+                (collection, document_id, if_update_time.isoformat())
+            )
+            if cursor.rowcount == 0:
+                raise DocumentConflictError(f"Document '{document_id}' was modified concurrently")
+            return True
+    
+    def _candidates(
+        self,
+        collection: str,
+        filters: List[tuple],
+        order_by: Optional[str] = None,
+        descending: bool = False,
+        limit: Optional[int] = None,
+        start_after: Optional[List[Any]] = None
+    ) -> List[StoredDocument]:
+        """
+        Load documents of a collection, filtered in SQL where possible.
+        
+        Args:
+            collection: Collection name
+            filters: List of tuples (field, operator, value)
+            order_by: Field to sort by
+            descending: Sort direction
+            limit: Max documents
+            start_after: Cursor values
+        
+        Returns:
+            Candidate documents (still to be matched in Python)
+        """
+        sql = "SELECT id, data, update_time FROM documents WHERE collection = ?"
+        params: List[Any] = [collection]
+        exact = True
+        for field, op, value in filters:
+            condition = _sql_condition(field, op, value)
+            if condition is None:
+                exact = False
+                continue
+            sql += f" AND {condition[0]}"
+            params += condition[1]
+        
+        if exact and not order_by:
+            # Ordered by document ID only: the cursor and limit are exact in SQL
+            if start_after:
+                sql += " AND id < ?" if descending else " AND id > ?"
+                params.append(start_after[-1])
+            sql += " ORDER BY id DESC" if descending else " ORDER BY id"
+            if limit:
+                sql += " LIMIT ?"
+                params.append(limit)
+        
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [self._row_to_document(row) for row in rows]
+    
+    def stream(
+        self,
+        collection: str,
+        filters: List[tuple],
+        order_by: Optional[str] = None,
+        descending: bool = False,
+        limit: Optional[int] = None,
+        start_after: Optional[List[Any]] = None,
+        fields: Optional[List[str]] = None,
+        order_by_id: bool = False
+    ) -> Iterator[StoredDocument]:
+        candidates = self._candidates(collection, filters, order_by, descending, limit, start_after)
+        yield from run_query(candidates, filters, order_by, descending, limit, start_after, fields)
+    
+    def aggregate(
+        self,
+        collection: str,
+        filters: List[tuple],
+        aggregations: Dict[str, Tuple[str, Optional[str]]]
+    ) -> Dict[str, Any]:
+        candidates = self._candidates(collection, filters)
+        return aggregate_documents(run_query(candidates, filters), aggregations)
+    
+    def run_in_transaction(self, fn: Callable[[BackendTransaction], Any]) -> Any:
+        transaction = OptimisticTransaction(self)
+        result = fn(transaction)
+        if not transaction.writes:
+            return result
+        
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = self._clock.now()
+                staged = stage_writes(transaction, self._read, now)
+                for (collection, document_id), data in staged.items():
+                    if data is None:
+                        self._conn.execute(
+                            "DELETE FROM documents WHERE collection = ? AND id = ?",
+                            (collection, document_id)
+                        )
+                    else:
+                        self._write(collection, document_id, data, now)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return result
+    
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,380 @@
+"""
+Summary materializer: keeps per-asset/per-month rollups of movements
+in the summaries collection.
+"""
+from typing import Dict, Any, Optional, List, Tuple
+from services.base import BaseService
+from services.database import DatabaseService, TransactionView
+from services.storage.base import SERVER_TIMESTAMP, DocumentNotFoundError, is_delete_sentinel
+from services.tasks import TaskQueue
+from utils.logger import Logger
+from utils.constants import (
+    COLLECTION_MOVEMENTS,
+    COLLECTION_SUMMARIES,
+    DELETED_AT_FIELD,
+    SOFT_DELETE_FIELD,
+    MOVEMENT_ASSET_ID_FIELD,
+    MOVEMENT_MONTH_FIELD,
+    MOVEMENT_UID_FIELD,
+    SUMMARY_METRICS,
+    SUMMARY_COUNT_FIELD,
+    SUMMARY_TOLERANCE,
+    SUMMARY_REBUILD_DELAY,
+    TASK_REBUILD_SUMMARIES,
+)
+
+SummaryKey = Tuple[str, str]  # (asset_id, month)
+
+
+def summary_id(asset_id: str, month: str) -> str:
+    """
+    Build the summary document ID for an asset and month.
+    
+    Args:
+        asset_id: Asset ID
+        month: Month (e.g. "2024-01")
+    
+    Returns:
+        Summary document ID
+    """
+    return f"{asset_id}_{month}"
+
+
+def _number(value: Any) -> float:
+    """Numeric value of a movement metric (non-numbers count as 0)."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return value
+    return 0
+
+
+def _is_active(movement: Optional[Dict[str, Any]]) -> bool:
+    """Whether a movement contributes to summaries (exists and is not soft-deleted)."""
+    return bool(movement) and not movement.get(SOFT_DELETE_FIELD) and not movement.get(DELETED_AT_FIELD)
+
+
+def _merge_update(before: Dict[str, Any], data: Dict[str, Any]) -> Dict[str, Any]:
+    """Document as stored after an update: fields set to a delete sentinel are removed."""
+    return {field: value for field, value in {**before, **data}.items() if not is_delete_sentinel(value)}
+
+
+def _key(movement: Dict[str, Any]) -> Optional[SummaryKey]:
+    """Summary key of a movement, or None if it lacks asset or month."""
+    asset_id = movement.get(MOVEMENT_ASSET_ID_FIELD)
+    month = movement.get(MOVEMENT_MONTH_FIELD)
+    if not asset_id or not month:
+        return None
+    return (asset_id, str(month))
+
+
+def movement_deltas(
+    before: Optional[Dict[str, Any]],
+    after: Optional[Dict[str, Any]]
+) -> Dict[SummaryKey, Dict[str, float]]:
+    """
+    Compute summary deltas for a movement change.
+    
+    Args:
+        before: Movement before the change (None if created)
+        after: Movement after the change (None if deleted)
+    
+    Returns:
+        Summary key -> {summary field: delta}, empty deltas dropped
+    """
+    deltas: Dict[SummaryKey, Dict[str, float]] = {}
+    
+    for movement, sign in ((before, -1), (after, 1)):
+        if not _is_active(movement):
+            continue
+        key = _key(movement)
+        if key is None:
+            continue
+        delta = deltas.setdefault(key, {})
+        delta[SUMMARY_COUNT_FIELD] = delta.get(SUMMARY_COUNT_FIELD, 0) + sign
+        for source, target in SUMMARY_METRICS.items():
+            delta[target] = delta.get(target, 0) + sign * _number(movement.get(source))
+    
+    return {
+        key: delta for key, delta in deltas.items()
+        if any(abs(v) > SUMMARY_TOLERANCE for v in delta.values())
+    }
+
+
+class SummaryService(BaseService):
+    """
+    Service maintaining the summaries collection from movements.
+    
+    Movement writes made through this service update the movement and the
+    affected summaries in one transaction, so rollups never drift from the
+    ledger. rebuild() and check() repair and verify them.
+    """
+    
+    def __init__(self, config: Dict[str, Any], logger: Optional[Logger] = None, db: Optional[DatabaseService] = None):
+        """
+        Initialize summary service.
+        
+        Args:
+            config: Project configuration
+            logger: Logger instance
+            db: Optional database service (created from config if not provided)
+        """
+        super().__init__(config, logger)
+        self.db = db or DatabaseService(config, logger)
+    
+    def _apply_deltas(self, txn: TransactionView, deltas: Dict[SummaryKey, Dict[str, float]], uid: Optional[str]):
+        """
+        Read the affected summaries and buffer their new values.
+        
+        Must be called before any write in the transaction.
+        
+        Args:
+            txn: Transaction view
+            deltas: Summary key -> field deltas
+            uid: Owner of the movement
+        """
+        current = {key: txn.get(COLLECTION_SUMMARIES, summary_id(*key)) for key in deltas}
+        return lambda: self._write_summaries(txn, deltas, current, uid)
+    
+    def _write_summaries(
+        self,
+        txn: TransactionView,
+        deltas: Dict[SummaryKey, Dict[str, float]],
+        current: Dict[SummaryKey, Optional[Dict[str, Any]]],
+        uid: Optional[str]
+    ):
+        """
+        Buffer summary writes computed from current values and deltas.
+        
+        Args:
+            txn: Transaction view
+            deltas: Summary key -> field deltas
+            current: Summary key -> summary read in the transaction
+            uid: Owner of the movement
+        """
+        for key, delta in deltas.items():
+            asset_id, month = key
+            existing = current.get(key)
+            if existing:
+                values = {field: _number(existing.get(field)) + change for field, change in delta.items()}
+                values["updatedAt"] = SERVER_TIMESTAMP
+                txn.update(COLLECTION_SUMMARIES, summary_id(asset_id, month), values)
+            else:
+                summary = {
+                    MOVEMENT_ASSET_ID_FIELD: asset_id,
+                    MOVEMENT_MONTH_FIELD: month,
+                    SUMMARY_COUNT_FIELD: 0,
+                    **{target: 0 for target in SUMMARY_METRICS.values()},
+                    "updatedAt": SERVER_TIMESTAMP
+                }
+                if uid:
+                    summary[MOVEMENT_UID_FIELD] = uid
+                summary.update(delta)
+                txn.create(COLLECTION_SUMMARIES, summary, document_id=summary_id(asset_id, month))
+    
+    def create_movement(self, data: Dict[str, Any], document_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Create a movement and apply it to its summary.
+        
+        Writing to the ID of an existing movement replaces it: the old
+        movement's contribution is removed from its summary first.
+        
+        Args:
+            data: Movement data
+            document_id: Optional movement ID
+        
+        Returns:
+            Created movement with ID
+        """
+        def create(txn: TransactionView):
+            before = txn.get(COLLECTION_MOVEMENTS, document_id) if document_id else None
+            write_summaries = self._apply_deltas(txn, movement_deltas(before, data), data.get(MOVEMENT_UID_FIELD))
+            movement = txn.create(COLLECTION_MOVEMENTS, data, document_id=document_id)
+            write_summaries()
+            return movement
+        
+        return self.db.run_transaction(create)
+    
+    def update_movement(self, document_id: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Update a movement and move its contribution between summaries.
+        
+        Args:
+            document_id: Movement ID
+            data: Fields to update (top-level fields)
+        
+        Returns:
+            Locally merged movement
+        
+        Raises:
+            DocumentNotFoundError: If the movement does not exist
+        """
+        def update(txn: TransactionView):
+            before = txn.get(COLLECTION_MOVEMENTS, document_id)
+            if before is None:
+                raise DocumentNotFoundError(f"Movement '{document_id}' not found")
+            after = _merge_update(before, self.db._with_soft_delete_flag(data))
+            uid = after.get(MOVEMENT_UID_FIELD)
+            write_summaries = self._apply_deltas(txn, movement_deltas(before, after), uid)
+            txn.update(COLLECTION_MOVEMENTS, document_id, data)
+            write_summaries()
+            return after
+        
+        return self.db.run_transaction(update)
+    
+    def soft_delete_movement(self, document_id: str) -> bool:
+        """
+        Soft delete a movement and remove it from its summary.
+        
+        Args:
+            document_id: Movement ID
+        
+        Returns:
+            True if deleted, False if not found
+        """
+        try:
+            self.update_movement(document_id, {DELETED_AT_FIELD: SERVER_TIMESTAMP})
+            return True
+        except DocumentNotFoundError:
+            self._log("warning", "Movement not found for soft delete", {"document_id": document_id})
+            return False
+    
+    def recompute(self, asset_id: Optional[str] = None) -> Dict[SummaryKey, Dict[str, Any]]:
+        """
+        Recompute summaries from movements.
+        
+        Args:
+            asset_id: Optional asset to limit the recomputation to
+        
+        Returns:
+            Summary key -> summary values
+        """
+        filters = [(MOVEMENT_ASSET_ID_FIELD, "==", asset_id)] if asset_id else []
+        summaries: Dict[SummaryKey, Dict[str, Any]] = {}
+        
+        for movement in self.db.iter_query(COLLECTION_MOVEMENTS, filters):
+            for key, delta in movement_deltas(None, movement).items():
+                summary = summaries.setdefault(key, {
+                    MOVEMENT_ASSET_ID_FIELD: key[0],
+                    MOVEMENT_MONTH_FIELD: key[1],
+                    SUMMARY_COUNT_FIELD: 0,
+                    **{target: 0 for target in SUMMARY_METRICS.values()}
+                })
+                if movement.get(MOVEMENT_UID_FIELD):
+                    summary[MOVEMENT_UID_FIELD] = movement[MOVEMENT_UID_FIELD]
+                for field, change in delta.items():
+                    summary[field] += change
+        
+        return summaries
+    
+    def _materialized(self, asset_id: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Read materialized summaries.
+        
+        Args:
+            asset_id: Optional asset filter
+        
+        Returns:
+            Summary document ID -> summary
+        """
+        filters = [(MOVEMENT_ASSET_ID_FIELD, "==", asset_id)] if asset_id else []
+        return {doc["id"]: doc for doc in self.db.iter_query(COLLECTION_SUMMARIES, filters, exclude_deleted=False)}
+    
+    def rebuild(self, asset_id: Optional[str] = None) -> Dict[str, int]:
+        """
+        Rewrite summaries from a full recomputation (repair).
+        
+        Args:
+            asset_id: Optional asset to limit the rebuild to
+        
+        Returns:
+            Counts: written, deleted
+        """
+        self._log("info", "Rebuilding summaries", {"asset_id": asset_id})
+        
+        expected = self.recompute(asset_id)
+        existing = self._materialized(asset_id)
+        
+        written = 0
+        for (key_asset, month), summary in expected.items():
+            self.db.create(
+                COLLECTION_SUMMARIES,
+                {**summary, "updatedAt": SERVER_TIMESTAMP},
+                document_id=summary_id(key_asset, month)
+            )
+            written += 1
+        
+        expected_ids = {summary_id(*key) for key in expected}
+        deleted = 0
+        for doc_id in existing:
+            if doc_id not in expected_ids:
+                self.db.delete(COLLECTION_SUMMARIES, doc_id)
+                deleted += 1
+        
+        self._log("info", "Summaries rebuilt", {"written": written, "deleted": deleted})
+        return {"written": written, "deleted": deleted}
+    
+    def schedule_rebuild(self, asset_id: str, delay: float = SUMMARY_REBUILD_DELAY) -> int:
+        """
+        Rebuild an asset's summaries in the background, after the response.
+        
+        Requests for the same asset within `delay` seconds share one rebuild.
+        
+        Args:
+            asset_id: Asset whose summaries to rebuild
+            delay: Seconds to wait for more changes before rebuilding
+        
+        Returns:
+            Task ID
+        """
+        return TaskQueue.enqueue(TASK_REBUILD_SUMMARIES, {"assetId": asset_id}, self.config, key=asset_id, delay=delay)
+    
+    def check(self, asset_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Compare materialized summaries against a recomputation.
+        
+        Args:
+            asset_id: Optional asset to limit the check to
+        
+        Returns:
+            Report: checked, consistent (bool) and mismatches, each
+            {"id", "field", "materialized", "expected"}
+        """
+        expected = self.recompute(asset_id)
+        existing = self._materialized(asset_id)
+        mismatches: List[Dict[str, Any]] = []
+        
+        for key, summary in expected.items():
+            doc_id = summary_id(*key)
+            materialized = existing.get(doc_id)
+            if materialized is None:
+                mismatches.append({"id": doc_id, "field": None, "materialized": None, "expected": "present"})
+                continue
+            for field in [SUMMARY_COUNT_FIELD, *SUMMARY_METRICS.values()]:
+                actual = _number(materialized.get(field))
+                if abs(actual - summary[field]) > SUMMARY_TOLERANCE:
+                    mismatches.append({"id": doc_id, "field": field, "materialized": actual, "expected": summary[field]})
+        
+        expected_ids = {summary_id(*key) for key in expected}
+        for doc_id, materialized in existing.items():
+            stale = any(
+                abs(_number(materialized.get(field))) > SUMMARY_TOLERANCE
+                for field in [SUMMARY_COUNT_FIELD, *SUMMARY_METRICS.values()]
+            )
+            if doc_id not in expected_ids and stale:
+                mismatches.append({"id": doc_id, "field": None, "materialized": "present", "expected": None})
+        
+        report = {
+            "checked": len(expected_ids | set(existing)),
+            "consistent": not mismatches,
+            "mismatches": mismatches
+        }
+        self._log("info" if not mismatches else "warning", "Summary consistency check", {
+            "checked": report["checked"],
+            "mismatches": len(mismatches)
+        })
+        return report
+
+
+@TaskQueue.task(TASK_REBUILD_SUMMARIES)
+def rebuild_summaries(payload: Dict[str, Any], config: Dict[str, Any], logger: Logger):
+    """Background task scheduled by SummaryService.schedule_rebuild()."""
+    SummaryService(config, logger).rebuild(payload["assetId"])
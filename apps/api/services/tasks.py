@@ -0,0 +1,444 @@
+"""
+In-process background tasks: follow-up work that runs after the response.
+
+A workflow enqueues a task instead of doing secondary work (like rebuilding
+summaries) before it answers:
+
+    @TaskQueue.task("summaries.rebuild")
+    def rebuild_summaries(payload, config, logger):
+        SummaryService(config, logger).rebuild(payload["assetId"])
+
+    TaskQueue.enqueue("summaries.rebuild", {"assetId": asset_id}, config, key=asset_id, delay=2)
+
+Tasks are stored in a local SQLite file before enqueue() returns, and
+worker threads (TASK_QUEUE_WORKERS per process) run them:
+
+- Deduplication: while a task with the same name, project and key is still
+  pending, enqueue() updates its payload instead of adding another, so ten
+  movement writes within `delay` seconds trigger one rebuild.
+- Retries: a failed attempt is retried with exponential backoff up to
+  max_attempts times; then the task is kept with status "failed".
+- Durability: pending tasks survive restarts of the process. A task whose
+  process died while running it is retried once its lease expires.
+- Shutdown: drain() runs the tasks that are due, up to a timeout; the rest
+  stay pending for the next start.
+
+Handlers get the project config (loaded with load_config, with a deadline
+of TASK_TIMEOUT) and their own Logger, saved after each attempt.
+"""
+import importlib
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, Optional, List, Callable
+from configs.loader import load_config
+from utils.deadline import Deadline
+from utils.logger import Logger
+from utils.constants import (
+    DEADLINE_KEY,
+    DEFAULT_TASK_QUEUE_PATH,
+    TASK_QUEUE_WORKERS,
+    TASK_QUEUE_POLL_SECONDS,
+    TASK_TIMEOUT,
+    TASK_LEASE_SECONDS,
+    TASK_MAX_ATTEMPTS,
+    TASK_RETRY_BACKOFF,
+    TASK_MAX_RETRY_BACKOFF,
+    TASK_MODULES,
+)
+
+TASK_PENDING = "pending"
+TASK_RUNNING = "running"
+TASK_FAILED = "failed"
+
+# handler(payload, config, logger)
+TaskHandler = Callable[[Dict[str, Any], Dict[str, Any], Logger], Any]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    project_id TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    dedup_key TEXT,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    run_at REAL NOT NULL,
+    lease_until REAL,
+    last_error TEXT,
+    created_at REAL NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS tasks_pending_key
+    ON tasks (name, project_id, dedup_key) WHERE status = 'pending' AND dedup_key IS NOT NULL;
+CREATE INDEX IF NOT EXISTS tasks_due ON tasks (status, run_at);
+"""
+
+
+class TaskQueue:
+    """
+    Process-wide task queue backed by SQLite.
+    """
+    
+    _handlers: Dict[str, TaskHandler] = {}
+    _conn: Optional[sqlite3.Connection] = None
+    _path: Optional[str] = None
+    _lock = threading.RLock()
+    _workers: List[threading.Thread] = []
+    _wakeup = threading.Event()
+    _draining = threading.Event()
+    _stopping = threading.Event()
+    _stats = {"enqueued": 0, "deduplicated": 0, "succeeded": 0, "retried": 0, "failed": 0, "queue_errors": 0}
+    
+    @classmethod
+    def register(cls, name: str, handler: TaskHandler):
+        """
+        Register the handler of a task name (replaces an existing one).
+        
+        Args:
+            name: Task name stored with each task
+            handler: Called as handler(payload, config, logger)
+        """
+        cls._handlers[name] = handler
+    
+    @classmethod
+    def task(cls, name: Optional[str] = None):
+        """
+        Decorator registering a function as a task handler (named after the function by default).
+        
+        Args:
+            name: Task name
+        """
+        def decorator(fn: TaskHandler) -> TaskHandler:
+            cls.register(name or fn.__name__, fn)
+            return fn
+        return decorator
+    
+    @classmethod
+    def _connection(cls) -> sqlite3.Connection:
+        """Open the queue file on first use."""
+        if cls._conn is None:
+            with cls._lock:
+                if cls._conn is None:
+                    path = cls._path or os.getenv("TASK_QUEUE_PATH", DEFAULT_TASK_QUEUE_PATH)
+                    directory = os.path.dirname(path)
+                    if directory:
+                        os.makedirs(directory, exist_ok=True)
+                    # Autocommit; claims take BEGIN IMMEDIATE so processes sharing the file do not race
+                    conn = sqlite3.connect(path, timeout=5.0, check_same_thread=False, isolation_level=None)
+                    conn.row_factory = sqlite3.Row
+                    conn.execute("PRAGMA journal_mode=WAL")
+                    conn.executescript(_SCHEMA)
+                    cls._path = path
+                    cls._conn = conn
+        return cls._conn
+    
+    @classmethod
+    def configure(cls, path: str):
+        """
+        Use another queue file (before the first enqueue or start).
+        
+        Args:
+            path: SQLite file path
+        """
+        with cls._lock:
+            if cls._conn is not None:
+                cls._conn.close()
+                cls._conn = None
+            cls._path = path
+    
+    @classmethod
+    def enqueue(
+        cls,
+        name: str,
+        payload: Dict[str, Any],
+        config: Dict[str, Any],
+        key: Optional[str] = None,
+        delay: float = 0.0,
+        max_attempts: int = TASK_MAX_ATTEMPTS
+    ) -> int:
+        """
+        Store a task; a worker runs it once it is due.
+        
+        Args:
+            name: Registered task name
+            payload: JSON-serializable task input
+            config: Project configuration (only project_id is stored; the
+                worker reloads the config)
+            key: Deduplication key: replaces the payload of a pending task
+                with the same name, project and key instead of adding one
+            delay: Seconds before the task may run (lets duplicates coalesce)
+            max_attempts: Attempts before the task is marked failed
+        
+        Returns:
+            Task ID (the existing task's when deduplicated)
+        
+        Raises:
+            TypeError: If the payload is not JSON-serializable
+        """
+        project_id = config.get("project_id", "")
+        encoded = json.dumps(payload)
+        now = time.time()
+        
+        with cls._lock:
+            conn = cls._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                existing = None
+                if key is not None:
+                    existing = conn.execute(
+                        "SELECT id FROM tasks WHERE name = ? AND project_id = ? AND dedup_key = ? AND status = ?",
+                        (name, project_id, key, TASK_PENDING)
+                    ).fetchone()
+                if existing:
+                    task_id = existing["id"]
+                    conn.execute("UPDATE tasks SET payload = ? WHERE id = ?", (encoded, task_id))
+                    cls._stats["deduplicated"] += 1
+                else:
+                    task_id = conn.execute(
+                        "INSERT INTO tasks (name, project_id, payload, dedup_key, status, max_attempts, run_at, created_at)"
+                        " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        (name, project_id, encoded, key, TASK_PENDING, max_attempts, now + delay, now)
+                    ).lastrowid
+                    cls._stats["enqueued"] += 1
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        
+        if not delay:
+            cls._wakeup.set()
+        return task_id
+    
+    @classmethod
+    def _claim(cls) -> Optional[Dict[str, Any]]:
+        """Mark the next due task as running and return it (None if nothing is due)."""
+        now = time.time()
+        with cls._lock:
+            conn = cls._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Expired leases: the process running the task died. Drop those
+                # superseded by a pending duplicate, requeue the others
+                conn.execute(
+                    "DELETE FROM tasks WHERE status = ? AND lease_until < ? AND dedup_key IS NOT NULL AND EXISTS ("
+                    " SELECT 1 FROM tasks AS p WHERE p.status = ? AND p.name = tasks.name"
+                    " AND p.project_id = tasks.project_id AND p.dedup_key = tasks.dedup_key)",
+                    (TASK_RUNNING, now, TASK_PENDING)
+                )
+                conn.execute(
+                    "UPDATE tasks SET status = ?, lease_until = NULL WHERE status = ? AND lease_until < ?",
+                    (TASK_PENDING, TASK_RUNNING, now)
+                )
+                row = conn.execute(
+                    "SELECT * FROM tasks WHERE status = ? AND run_at <= ? ORDER BY run_at, id LIMIT 1",
+                    (TASK_PENDING, now)
+                ).fetchone()
+                if row:
+                    conn.execute(
+                        "UPDATE tasks SET status = ?, attempts = attempts + 1, lease_until = ? WHERE id = ?",
+                        (TASK_RUNNING, now + TASK_LEASE_SECONDS, row["id"])
+                    )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        
+        if row is None:
+            return None
+        task = dict(row)
+        task["attempts"] += 1
+        return task
+    
+    @staticmethod
+    def _retry_delay(attempt: int) -> float:
+        """Exponential backoff with jitter for the retry after `attempt` failed attempts."""
+        delay = min(TASK_MAX_RETRY_BACKOFF, TASK_RETRY_BACKOFF * (2 ** (attempt - 1)))
+        return random.uniform(delay / 2, delay)
+    
+    @classmethod
+    def _run(cls, task: Dict[str, Any]):
+        """Run one attempt of a claimed task and record the outcome."""
+        name = task["name"]
+        logger = Logger(task["project_id"] or "system", f"task:{name}")
+        task_logger = logger.for_module("tasks")
+        handler = cls._handlers.get(name)
+        started = time.perf_counter()
+        
+        try:
+            if handler is None:
+                raise LookupError(f"No handler registered for task '{name}'")
+            deadline = Deadline(TASK_TIMEOUT)
+            config = load_config(task["project_id"], deadline)
+            config[DEADLINE_KEY] = deadline
+            handler(json.loads(task["payload"]), config, logger)
+        except Exception as e:
+            final = handler is None or task["attempts"] >= task["max_attempts"]
+            task_logger.error(f"Task '{name}' failed", error=e, data={
+                "task_id": task["id"],
+                "attempt": task["attempts"],
+                "final": final
+            })
+            with cls._lock:
+                if final:
+                    cls._connection().execute(
+                        "UPDATE tasks SET status = ?, lease_until = NULL, last_error = ? WHERE id = ?",
+                        (TASK_FAILED, str(e) or type(e).__name__, task["id"])
+                    )
+                    cls._stats["failed"] += 1
+                else:
+                    cls._requeue(task, str(e) or type(e).__name__)
+                    cls._stats["retried"] += 1
+        else:
+            task_logger.info(f"Task '{name}' done", {
+                "task_id": task["id"],
+                "attempt": task["attempts"],
+                "duration_ms": round((time.perf_counter() - started) * 1000, 1)
+            })
+            with cls._lock:
+                cls._connection().execute("DELETE FROM tasks WHERE id = ?", (task["id"],))
+                cls._stats["succeeded"] += 1
+        finally:
+            try:
+                logger.save()
+            except Exception:
+                # Losing a task's log must not requeue or fail the task
+                pass
+    
+    @classmethod
+    def _requeue(cls, task: Dict[str, Any], error: str):
+        """Schedule the next attempt, merging into a pending duplicate if one was enqueued meanwhile."""
+        conn = cls._connection()
+        run_at = time.time() + cls._retry_delay(task["attempts"])
+        try:
+            conn.execute(
+                "UPDATE tasks SET status = ?, lease_until = NULL, last_error = ?, run_at = ? WHERE id = ?",
+                (TASK_PENDING, error, run_at, task["id"])
+            )
+        except sqlite3.IntegrityError:
+            # A newer pending task with the same key will do the work
+            conn.execute("DELETE FROM tasks WHERE id = ?", (task["id"],))
+    
+    @classmethod
+    def _idle_wait(cls) -> float:
+        """Seconds until the next pending task is due, at most TASK_QUEUE_POLL_SECONDS."""
+        try:
+            with cls._lock:
+                next_run_at = cls._connection().execute(
+                    "SELECT MIN(run_at) FROM tasks WHERE status = ?", (TASK_PENDING,)
+                ).fetchone()[0]
+        except sqlite3.Error:
+            return TASK_QUEUE_POLL_SECONDS
+        if next_run_at is None:
+            return TASK_QUEUE_POLL_SECONDS
+        return min(TASK_QUEUE_POLL_SECONDS, max(0.0, next_run_at - time.time()))
+    
+    @classmethod
+    def _work(cls):
+        """Worker thread: run due tasks until stopped (or, when draining, until none is due)."""
+        while not cls._stopping.is_set():
+            try:
+                task = cls._claim()
+            except sqlite3.Error:
+                with cls._lock:
+                    cls._stats["queue_errors"] += 1
+                task = None
+            
+            if task is None:
+                if cls._draining.is_set():
+                    return
+                cls._wakeup.wait(cls._idle_wait())
+                cls._wakeup.clear()
+                continue
+            try:
+                cls._run(task)
+            except sqlite3.Error:
+                # Outcome not recorded: the lease expires and the task is retried
+                with cls._lock:
+                    cls._stats["queue_errors"] += 1
+    
+    @classmethod
+    def start(cls, workers: int = TASK_QUEUE_WORKERS) -> int:
+        """
+        Start the worker threads (no-op if running or no handler is registered).
+        
+        Imports TASK_MODULES first, so built-in handlers are registered.
+        
+        Args:
+            workers: Number of worker threads
+        
+        Returns:
+            Number of running worker threads
+        """
+        for module in TASK_MODULES:
+            importlib.import_module(module)
+        
+        with cls._lock:
+            cls._workers = [worker for worker in cls._workers if worker.is_alive()]
+            if cls._workers or not cls._handlers:
+                return len(cls._workers)
+            cls._connection()
+            cls._draining.clear()
+            cls._stopping.clear()
+            cls._workers = [
+                threading.Thread(target=cls._work, name=f"task-worker-{i}", daemon=True)
+                for i in range(workers)
+            ]
+            for worker in cls._workers:
+                worker.start()
+            return len(cls._workers)
+    
+    @classmethod
+    def drain(cls, timeout: float) -> int:
+        """
+        Run the tasks that are due, then stop the workers.
+        
+        Workers stop claiming once nothing is due or the timeout passes;
+        tasks left pending (or cut off while running) run after the next
+        start.
+        
+        Args:
+            timeout: Seconds to wait for the workers
+        
+        Returns:
+            Number of tasks still pending
+        """
+        cls._draining.set()
+        cls._wakeup.set()
+        expires_at = time.monotonic() + timeout
+        for worker in list(cls._workers):
+            worker.join(max(0.0, expires_at - time.monotonic()))
+        cls._stopping.set()
+        
+        with cls._lock:
+            cls._workers = [worker for worker in cls._workers if worker.is_alive()]
+            if cls._conn is None:
+                return 0
+            return cls._conn.execute("SELECT COUNT(*) FROM tasks WHERE status = ?", (TASK_PENDING,)).fetchone()[0]
+    
+    @classmethod
+    def stats(cls) -> Dict[str, Any]:
+        """Counters of this process and task counts by status in the queue file."""
+        with cls._lock:
+            stats: Dict[str, Any] = {**cls._stats, "workers": len([w for w in cls._workers if w.is_alive()])}
+            if cls._conn is not None:
+                for status, count in cls._conn.execute("SELECT status, COUNT(*) FROM tasks GROUP BY status"):
+                    stats[status] = count
+        return stats
+    
+    @classmethod
+    def reset(cls):
+        """
+        Forget the connection and worker threads.
+        
+        Needed in child processes after fork: SQLite connections must not
+        be shared across a fork, and the parent's threads do not exist.
+        """
+        with cls._lock:
+            cls._conn = None
+            cls._workers = []
+            cls._draining.clear()
+            cls._stopping.clear()
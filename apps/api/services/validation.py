@@ -1,8 +1,332 @@
 """
 Validation service for data validation.
 """
-from typing import Dict, Any, Optional, Tuple, Union, List
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple, Union, List, Callable
 from services.base import BaseService
+from utils.constants import MAX_COMPILED_RULE_SETS, BATCH_VALIDATION_CHUNK_SIZE
+
+EMAIL_PATTERN = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
+# A compiled check returns an error message, or None if the data passes
+Check = Callable[[Dict[str, Any]], Optional[str]]
+
+# A column check gets row indexes and a column accessor (field -> values
+# aligned with the rows) and returns (row index, error message) pairs
+ColumnCheck = Callable[[List[int], Callable[[str], List[Any]]], List[Tuple[int, str]]]
+
+_MISSING = object()
+
+
+def _type_names(expected_type: Union[type, Tuple[type, ...]]) -> str:
+    """Type names used in type error messages."""
+    return expected_type.__name__ if isinstance(expected_type, type) else ', '.join(t.__name__ for t in expected_type)
+
+
+def _require_check(fields: Tuple[str, ...]) -> Check:
+    def check(data):
+        missing = [f for f in fields if data.get(f) is None]
+        if missing:
+            return f"Missing required fields: {', '.join(missing)}"
+        return None
+    return check
+
+
+def _type_check(field: str, expected_type: Union[type, Tuple[type, ...]]) -> Check:
+    types = expected_type if isinstance(expected_type, tuple) else (expected_type,)
+    message = f"{field} must be of type {_type_names(expected_type)}"
+    
+    def check(data):
+        value = data.get(field, _MISSING)
+        if value is not _MISSING and not isinstance(value, types):
+            return message
+        return None
+    return check
+
+
+def _range_check(field: str, min_val: Optional[float], max_val: Optional[float]) -> Check:
+    not_number = f"{field} must be a number"
+    too_small = f"{field} must be >= {min_val}"
+    too_large = f"{field} must be <= {max_val}"
+    
+    def check(data):
+        value = data.get(field, _MISSING)
+        if value is _MISSING:
+            return None
+        if not isinstance(value, (int, float)):
+            return not_number
+        if min_val is not None and value < min_val:
+            return too_small
+        if max_val is not None and value > max_val:
+            return too_large
+        return None
+    return check
+
+
+def _length_check(field: str, min_len: Optional[int], max_len: Optional[int]) -> Check:
+    too_short = f"{field} must be at least {min_len} characters"
+    too_long = f"{field} must be at most {max_len} characters"
+    
+    def check(data):
+        value = data.get(field, _MISSING)
+        if value is _MISSING:
+            return None
+        length = len(str(value))
+        if min_len is not None and length < min_len:
+            return too_short
+        if max_len is not None and length > max_len:
+            return too_long
+        return None
+    return check
+
+
+def _email_check(field: str) -> Check:
+    match = EMAIL_PATTERN.match
+    message = f"{field} must be a valid email address"
+    
+    def check(data):
+        value = data.get(field, _MISSING)
+        if value is not _MISSING and not match(str(value)):
+            return message
+        return None
+    return check
+
+
+def _require_column(fields: Tuple[str, ...]) -> ColumnCheck:
+    def check(rows, column):
+        missing: Dict[int, List[str]] = {}
+        for field in fields:
+            for row, value in zip(rows, column(field)):
+                if value is None or value is _MISSING:
+                    missing.setdefault(row, []).append(field)
+        return [(row, f"Missing required fields: {', '.join(missing[row])}") for row in rows if row in missing]
+    return check
+
+
+def _type_column(field: str, expected_type: Union[type, Tuple[type, ...]]) -> ColumnCheck:
+    types = expected_type if isinstance(expected_type, tuple) else (expected_type,)
+    message = f"{field} must be of type {_type_names(expected_type)}"
+    
+    def check(rows, column):
+        return [
+            (row, message) for row, value in zip(rows, column(field))
+            if value is not _MISSING and not isinstance(value, types)
+        ]
+    return check
+
+
+def _range_column(field: str, min_val: Optional[float], max_val: Optional[float]) -> ColumnCheck:
+    not_number = f"{field} must be a number"
+    too_small = f"{field} must be >= {min_val}"
+    too_large = f"{field} must be <= {max_val}"
+    
+    def check(rows, column):
+        values = column(field)
+        errors = [(row, not_number) for row, value in zip(rows, values)
+                  if value is not _MISSING and not isinstance(value, (int, float))]
+        if errors:
+            invalid = {row for row, _ in errors}
+            pairs = [(row, value) for row, value in zip(rows, values) if value is not _MISSING and row not in invalid]
+        else:
+            pairs = [(row, value) for row, value in zip(rows, values) if value is not _MISSING]
+        if min_val is not None:
+            errors += [(row, too_small) for row, value in pairs if value < min_val]
+        if max_val is not None:
+            errors += [(row, too_large) for row, value in pairs if value > max_val]
+        return errors
+    return check
+
+
+def _length_column(field: str, min_len: Optional[int], max_len: Optional[int]) -> ColumnCheck:
+    too_short = f"{field} must be at least {min_len} characters"
+    too_long = f"{field} must be at most {max_len} characters"
+    
+    def check(rows, column):
+        lengths = [(row, len(str(value))) for row, value in zip(rows, column(field)) if value is not _MISSING]
+        errors = []
+        if min_len is not None:
+            errors += [(row, too_short) for row, length in lengths if length < min_len]
+        if max_len is not None:
+            errors += [(row, too_long) for row, length in lengths if length > max_len]
+        return errors
+    return check
+
+
+def _email_column(field: str) -> ColumnCheck:
+    match = EMAIL_PATTERN.match
+    message = f"{field} must be a valid email address"
+    
+    def check(rows, column):
+        return [
+            (row, message) for row, value in zip(rows, column(field))
+            if value is not _MISSING and not match(str(value))
+        ]
+    return check
+
+
+class BatchValidationResult:
+    """
+    Outcome of validating a list of records.
+    """
+    
+    __slots__ = ("errors", "error_count", "checked", "truncated")
+    
+    def __init__(self):
+        """Initialize an empty result."""
+        self.errors: Dict[int, List[str]] = {}
+        self.error_count = 0
+        self.checked = 0
+        self.truncated = False
+    
+    @property
+    def valid(self) -> bool:
+        """Whether every checked record passed."""
+        return self.error_count == 0
+    
+    def add(self, row: int, message: str):
+        """Record an error for a row."""
+        self.errors.setdefault(row, []).append(message)
+        self.error_count += 1
+    
+    def to_list(self) -> List[Dict[str, Any]]:
+        """
+        Errors as a response-friendly list.
+        
+        Returns:
+            [{"row": index, "errors": [message, ...]}] sorted by row
+        """
+        return [{"row": row, "errors": self.errors[row]} for row in sorted(self.errors)]
+
+
+def _freeze(value: Any) -> Any:
+    """Hashable form of a rule spec (order preserved: it decides which error is reported)."""
+    if isinstance(value, dict):
+        return ("{}",) + tuple((k, _freeze(v)) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return ("[]",) + tuple(_freeze(v) for v in value)
+    return value
+
+
+class CompiledRules:
+    """
+    A rule list compiled into a flat sequence of checks.
+    
+    Calling it validates a document exactly like ValidationService.validate:
+    rules run in order and the first error is returned.
+    """
+    
+    __slots__ = ("rules", "checks", "column_checks", "labels")
+    
+    def __init__(
+        self,
+        rules: List[Dict[str, Any]],
+        checks: Tuple[Check, ...],
+        column_checks: Tuple[ColumnCheck, ...],
+        labels: Tuple[Optional[str], ...]
+    ):
+        """
+        Initialize compiled rules.
+        
+        Args:
+            rules: Source rule list
+            checks: Checks in evaluation order
+            column_checks: The same checks over columns of values (batch validation)
+            labels: Field checked by each check (None for require, which covers several)
+        """
+        self.rules = rules
+        self.checks = checks
+        self.column_checks = column_checks
+        self.labels = labels
+    
+    def __call__(self, data: Dict[str, Any]) -> Tuple[bool, Optional[str]]:
+        """
+        Validate data.
+        
+        Args:
+            data: Data dictionary to validate
+        
+        Returns:
+            (is_valid, error_message)
+        """
+        for check in self.checks:
+            error = check(data)
+            if error is not None:
+                return False, error
+        return True, None
+    
+    def errors(self, data: Dict[str, Any]) -> List[Dict[str, str]]:
+        """
+        Run every check and list all violations (not just the first).
+        
+        Args:
+            data: Data dictionary to validate
+        
+        Returns:
+            [{"field": name, "message": text}] in rule order ("field" is
+            omitted for missing-field errors, which name the fields themselves)
+        """
+        violations = []
+        for check, label in zip(self.checks, self.labels):
+            error = check(data)
+            if error is not None:
+                violations.append({"field": label, "message": error} if label else {"message": error})
+        return violations
+    
+    def validate_many(
+        self,
+        records: List[Dict[str, Any]],
+        max_errors: Optional[int] = None,
+        chunk_size: int = BATCH_VALIDATION_CHUNK_SIZE
+    ) -> BatchValidationResult:
+        """
+        Validate a list of records, collecting every error of every record.
+        
+        Records are checked a chunk at a time, one rule check per column of
+        values, so each record's errors follow rule order as in validate().
+        
+        Args:
+            records: Records to validate
+            max_errors: Error budget; stop (result.truncated) once it is exceeded.
+                Checked after each column check, so the result may hold
+                somewhat more errors than the budget.
+            chunk_size: Records evaluated together
+        
+        Returns:
+            BatchValidationResult with errors keyed by record index
+        """
+        result = BatchValidationResult()
+        
+        for offset in range(0, len(records), chunk_size):
+            chunk = records[offset:offset + chunk_size]
+            rows = []
+            documents = []
+            for row, record in enumerate(chunk, offset):
+                if isinstance(record, dict):
+                    rows.append(row)
+                    documents.append(record)
+                else:
+                    result.add(row, "Record must be an object")
+            
+            columns: Dict[str, List[Any]] = {}
+            
+            def column(field: str) -> List[Any]:
+                values = columns.get(field)
+                if values is None:
+                    values = columns[field] = [doc.get(field, _MISSING) for doc in documents]
+                return values
+            
+            for check in self.column_checks:
+                for row, message in check(rows, column):
+                    result.add(row, message)
+                if max_errors is not None and result.error_count > max_errors:
+                    result.checked = offset + len(chunk)
+                    result.truncated = True
+                    return result
+            result.checked = offset + len(chunk)
+        
+        return result
 
 
 class ValidationService(BaseService):
@@ -10,6 +334,96 @@ class ValidationService(BaseService):
     Service for validating data with reusable validation rules.
     """
     
+    # Compiled rule sets shared by every instance, keyed by the frozen spec;
+    # rule lists are also looked up by identity to skip freezing module-level
+    # constants: id(rules) -> (rules, compiled), the list kept so its id is not reused
+    _compiled: "OrderedDict[Any, CompiledRules]" = OrderedDict()
+    _compiled_by_id: "OrderedDict[int, Tuple[List[Dict[str, Any]], CompiledRules]]" = OrderedDict()
+    _compiled_lock = threading.Lock()
+    
+    @staticmethod
+    def _compile_rules(rules: List[Dict[str, Any]]) -> CompiledRules:
+        """
+        Translate a rule list into checks, in the order validate() applies them.
+        
+        Unknown rule keys are ignored.
+        """
+        checks: List[Check] = []
+        column_checks: List[ColumnCheck] = []
+        labels: List[Optional[str]] = []
+        for rule in rules:
+            if "require" in rule:
+                fields = tuple(rule["require"])
+                checks.append(_require_check(fields))
+                column_checks.append(_require_column(fields))
+                labels.append(None)
+            for field, expected_type in rule.get("type", {}).items():
+                if isinstance(expected_type, list):
+                    expected_type = tuple(expected_type)
+                checks.append(_type_check(field, expected_type))
+                column_checks.append(_type_column(field, expected_type))
+                labels.append(field)
+            for field, range_config in rule.get("range", {}).items():
+                bounds = (range_config.get("min"), range_config.get("max"))
+                checks.append(_range_check(field, *bounds))
+                column_checks.append(_range_column(field, *bounds))
+                labels.append(field)
+            for field, length_config in rule.get("length", {}).items():
+                bounds = (length_config.get("min"), length_config.get("max"))
+                checks.append(_length_check(field, *bounds))
+                column_checks.append(_length_column(field, *bounds))
+                labels.append(field)
+            for field in rule.get("email", []):
+                checks.append(_email_check(field))
+                column_checks.append(_email_column(field))
+                labels.append(field)
+        return CompiledRules(rules, tuple(checks), tuple(column_checks), tuple(labels))
+    
+    @classmethod
+    def compile(cls, rules: List[Dict[str, Any]]) -> CompiledRules:
+        """
+        Compile a rule list (see validate() for the format) into a reusable validator.
+        
+        Compiled validators are cached process-wide, so calling compile() per
+        request is cheap; holding on to the result is cheaper still. Rule
+        lists must not be mutated after they have been compiled.
+        
+        Args:
+            rules: List of validation rules
+        
+        Returns:
+            Callable validator: validator(data) -> (is_valid, error_message)
+        """
+        with cls._compiled_lock:
+            entry = cls._compiled_by_id.get(id(rules))
+            if entry is not None and entry[0] is rules:
+                cls._compiled_by_id.move_to_end(id(rules))
+                return entry[1]
+        
+        try:
+            key = _freeze(rules)
+            hash(key)
+        except TypeError:
+            key = None
+        
+        with cls._compiled_lock:
+            compiled = cls._compiled.get(key) if key is not None else None
+        if compiled is None:
+            compiled = cls._compile_rules(rules)
+        
+        with cls._compiled_lock:
+            if key is not None:
+                cls._compiled[key] = compiled
+                cls._compiled.move_to_end(key)
+                while len(cls._compiled) > MAX_COMPILED_RULE_SETS:
+                    cls._compiled.popitem(last=False)
+            # The caller's list, which may be an equal copy of compiled.rules
+            cls._compiled_by_id[id(rules)] = (rules, compiled)
+            cls._compiled_by_id.move_to_end(id(rules))
+            while len(cls._compiled_by_id) > MAX_COMPILED_RULE_SETS:
+                cls._compiled_by_id.popitem(last=False)
+        return compiled
+    
     def require(self, data: Dict[str, Any], *fields: str) -> Tuple[bool, Optional[str]]:
         """
         Validate that required fields are present in data.
@@ -110,10 +524,7 @@ class ValidationService(BaseService):
         if field not in data:
             return True, None
         
-        import re
-        email = str(data[field])
-        pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        if not re.match(pattern, email):
+        if not EMAIL_PATTERN.match(str(data[field])):
             return False, f"{field} must be a valid email address"
         return True, None
     
@@ -137,48 +548,38 @@ class ValidationService(BaseService):
         Returns:
             (is_valid, error_message)
         """
-        for rule in rules:
-            # Require fields
-            if "require" in rule:
-                is_valid, error = self.require(data, *rule["require"])
-                if not is_valid:
-                    return False, error
-            
-            # Type validation
-            if "type" in rule:
-                for field, expected_type in rule["type"].items():
-                    is_valid, error = self.type_check(data, field, expected_type)
-                    if not is_valid:
-                        return False, error
-            
-            # Range validation
-            if "range" in rule:
-                for field, range_config in rule["range"].items():
-                    is_valid, error = self.range_check(
-                        data, field,
-                        min_val=range_config.get("min"),
-                        max_val=range_config.get("max")
-                    )
-                    if not is_valid:
-                        return False, error
-            
-            # Length validation
-            if "length" in rule:
-                for field, length_config in rule["length"].items():
-                    is_valid, error = self.length_check(
-                        data, field,
-                        min_len=length_config.get("min"),
-                        max_len=length_config.get("max")
-                    )
-                    if not is_valid:
-                        return False, error
-            
-            # Email validation
-            if "email" in rule:
-                for field in rule["email"]:
-                    is_valid, error = self.email_check(data, field)
-                    if not is_valid:
-                        return False, error
+        return self.compile(rules)(data)
+    
+    def validate_many(
+        self,
+        records: List[Dict[str, Any]],
+        rules: Union[List[Dict[str, Any]], CompiledRules],
+        max_errors: Optional[int] = None
+    ) -> BatchValidationResult:
+        """
+        Validate a list of records and report every error of every record.
         
-        return True, None
-
+        Unlike validate(), which stops at the first error, this returns all
+        errors keyed by record index, so a bulk import can be fixed in one
+        round trip.
+        
+        Args:
+            records: Records to validate (e.g. rows of a bulk import)
+            rules: Rule list or compiled rules (see compile())
+            max_errors: Error budget; validation stops once it is exceeded
+                and result.truncated is set
+        
+        Returns:
+            BatchValidationResult (errors, error_count, checked, truncated, valid)
+        """
+        compiled = rules if isinstance(rules, CompiledRules) else self.compile(rules)
+        result = compiled.validate_many(records, max_errors)
+        
+        self._log("info", "Batch validated", {
+            "records": len(records),
+            "checked": result.checked,
+            "invalid_records": len(result.errors),
+            "errors": result.error_count,
+            "truncated": result.truncated
+        })
+        return result
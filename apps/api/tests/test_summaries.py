@@ -0,0 +1,30 @@
+"""
+SummaryService: summaries follow movement writes.
+
+Run from apps/api: python -m pytest tests
+"""
+import uuid
+from services.storage.base import DELETE_FIELD
+from services.summaries import SummaryService
+
+
+def _service() -> SummaryService:
+    """Summary service on a fresh in-memory database."""
+    return SummaryService({"database": {"backend": "memory", "database_id": f"test-{uuid.uuid4().hex}"}})
+
+
+def test_restoring_soft_deleted_movement_adds_it_back():
+    service = _service()
+    movement = service.create_movement({"assetId": "a1", "month": "2024-01", "contribution": 10})
+    service.create_movement({"assetId": "a1", "month": "2024-01", "contribution": 5})
+    
+    service.soft_delete_movement(movement["id"])
+    summary = service.db.get("summaries", "a1_2024-01")
+    assert (summary["movementCount"], summary["contributions"]) == (1, 5)
+    
+    restored = service.update_movement(movement["id"], {"deletedAt": DELETE_FIELD})
+    assert "deletedAt" not in restored
+    assert restored["isDeleted"] is False
+    summary = service.db.get("summaries", "a1_2024-01")
+    assert (summary["movementCount"], summary["contributions"]) == (2, 15)
+    assert service.check()["consistent"]
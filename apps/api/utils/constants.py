@@ -19,3 +19,144 @@ TIMESTAMP_MULTIPLIER = 1000  # Convert seconds to milliseconds
 COLLECTION_ASSETS = "assets"
 COLLECTION_MOVEMENTS = "movements"
 COLLECTION_SUMMARIES = "summaries"
+
+# Database Write Modes
+WRITE_RETURN_DOCUMENT = "document"  # Re-read the document after writing (extra RPC)
+WRITE_RETURN_MERGED = "merged"  # Local merge of written fields, no extra read
+WRITE_RETURN_RESULT = "result"  # Only the write result (id + update time)
+VALID_WRITE_RETURN_MODES = [WRITE_RETURN_DOCUMENT, WRITE_RETURN_MERGED, WRITE_RETURN_RESULT]
+
+# Document metadata keys added by DatabaseService
+UPDATE_TIME_FIELD = "_updateTime"
+
+# Database Pagination
+DEFAULT_PAGE_SIZE = 100
+DEFAULT_ITER_CHUNK_SIZE = 500
+
+# Soft Delete
+DELETED_AT_FIELD = "deletedAt"
+SOFT_DELETE_FIELD = "isDeleted"  # Indexed boolean, filtered on inside Firestore queries
+SOFT_DELETE_FILTER_SERVER = "server"
+SOFT_DELETE_FILTER_CLIENT = "client"
+# Server filtering hides documents without isDeleted: switch only after migrate_soft_delete.py
+DEFAULT_SOFT_DELETE_FILTER = SOFT_DELETE_FILTER_CLIENT
+
+# Sparse Fieldsets
+FIELDS_PARAM = "fields"  # Query parameter: ?fields=name,type,balance
+FIELDS_KEY = "_fields"  # Key injected into workflow data
+MAX_FIELDS = 50
+
+# Database Aggregations
+AGGREGATION_COUNT = "count"
+AGGREGATION_SUM = "sum"
+AGGREGATION_AVG = "avg"
+VALID_AGGREGATIONS = [AGGREGATION_COUNT, AGGREGATION_SUM, AGGREGATION_AVG]
+
+# Storage Backends
+STORAGE_BACKEND_FIRESTORE = "firestore"
+STORAGE_BACKEND_MEMORY = "memory"
+STORAGE_BACKEND_SQLITE = "sqlite"
+VALID_STORAGE_BACKENDS = [STORAGE_BACKEND_FIRESTORE, STORAGE_BACKEND_MEMORY, STORAGE_BACKEND_SQLITE]
+DEFAULT_SQLITE_PATH = "pipuli.db"
+
+# Database Transactions
+DEFAULT_TRANSACTION_ATTEMPTS = 5
+DEFAULT_TRANSACTION_BACKOFF = 0.05  # Base delay in seconds, doubled per retry
+MAX_TRANSACTION_BACKOFF = 2.0
+
+# Movement Fields
+MOVEMENT_ASSET_ID_FIELD = "assetId"
+MOVEMENT_MONTH_FIELD = "month"
+MOVEMENT_UID_FIELD = "uid"
+
+# Summaries: movement field -> summary field (values are summed per asset/month)
+SUMMARY_METRICS = {
+    "contribution": "contributions",
+    "withdraw": "withdrawals",
+    "balance": "balance",
+    "marketValue": "marketValue",
+    "outstandingBalance": "outstandingBalance",
+}
+SUMMARY_COUNT_FIELD = "movementCount"
+SUMMARY_TOLERANCE = 1e-6  # Max drift accepted by the consistency checker
+
+# Sharded Counters
+COLLECTION_COUNTERS = "counters"
+COUNTER_SHARDS_SUBCOLLECTION = "shards"
+COUNTER_VALUE_FIELD = "count"
+DEFAULT_COUNTER_SHARDS = 10
+MAX_COUNTER_SHARDS = 500  # Firestore transaction write limit (shards are initialized together)
+
+# Request Deadlines
+DEFAULT_REQUEST_TIMEOUT = 30.0  # Seconds; override with REQUEST_TIMEOUT env or config
+REQUEST_TIMEOUTS_KEY = "request_timeouts"  # Config: {"default": s, "<project>": s, "<project>/<flow>": s}
+DEADLINE_KEY = "_deadline"  # Config key carrying the request Deadline to services
+MIN_RPC_TIMEOUT = 0.05  # Don't start an RPC with less budget than this
+ERROR_DEADLINE_EXCEEDED = "deadline_exceeded"
+
+# Query Stats
+DEFAULT_SLOW_QUERY_MS = 1000.0
+MAX_QUERY_SHAPES = 1000  # Distinct shapes kept in memory per process
+OVERSCAN_RATIO = 10.0  # Documents read per document returned before a shape is flagged
+EQUALITY_OPERATORS = ("==", "in")
+ARRAY_OPERATORS = ("array-contains", "array-contains-any")
+
+# Collection Mirrors
+DEFAULT_MIRROR_MAX_DOCUMENTS = 5000
+DEFAULT_MIRROR_RESTART_SECONDS = 30.0  # Min delay between listener restarts
+MIRROR_STALE_SECONDS = 5.0  # Max wait for the listener to echo a local write
+MIRROR_STARTING = "starting"
+MIRROR_LIVE = "live"
+MIRROR_FAILED = "failed"
+MIRROR_OVER_CAPACITY = "over_capacity"
+MIRROR_STOPPED = "stopped"
+
+# Soft-Delete Purge
+DEFAULT_PURGE_RETENTION_DAYS = 30  # Override with config "database": {"purge_retention_days": n}
+DEFAULT_PURGE_BATCH_SIZE = 500  # Firestore batch write limit
+DEFAULT_PURGE_MAX_OPS = 200  # Deletes per second
+FIRESTORE_READ_COST_PER_100K = 0.06  # USD, used for purge reports
+
+# Validation
+MAX_COMPILED_RULE_SETS = 256  # Compiled rule lists cached per process
+BATCH_VALIDATION_CHUNK_SIZE = 500  # Records evaluated together by validate_many
+
+# Workflow Input Schemas
+WORKFLOWS_PACKAGE = "workflows"
+WORKFLOW_SCHEMA_ATTRIBUTE = "INPUT_SCHEMA"  # Module-level rule list or Pydantic model
+ERROR_INVALID_INPUT = "invalid_input"
+
+# Secrets
+DEFAULT_SECRET_VERSION = "latest"
+SECRET_CACHE_TTL_SECONDS = 300.0  # Served from cache without a refresh
+SECRET_MAX_STALE_SECONDS = 3600.0  # Served stale (refreshed in the background) after the TTL
+SECRET_FETCH_WORKERS = 8
+SECRET_FETCH_TIMEOUT = 10.0  # Seconds per Secret Manager call; requests stop waiting at their deadline
+SECRET_RECHECK_SECONDS = 30.0  # Min age before a rejected API key triggers a re-read (rotation)
+
+# Warm-up
+WORKFLOW_WARMUP_ATTRIBUTE = "warmup"  # Optional module-level warmup(config, logger) run at startup
+WARMUP_CALL_TIMEOUT = 10.0  # Deadline (seconds) of each workflow warm-up call
+
+# Serving (serve.py)
+DEFAULT_WORKER_MAX_REQUESTS = 10000  # Requests before a worker is recycled (0 disables recycling)
+DEFAULT_WORKER_MAX_REQUESTS_JITTER = 1000  # Random extra requests, so workers are not recycled together
+DEFAULT_WORKER_GRACEFUL_TIMEOUT = 8  # Seconds to finish in-flight requests (Cloud Run kills 10s after SIGTERM)
+DEFAULT_WORKER_TIMEOUT = 300  # Seconds a worker may block before it is restarted (Cloud Run request timeout)
+
+# Workflow Step Graphs
+WORKFLOW_STEP_WORKERS = 16  # Threads shared by all step graphs in the process
+
+# Background Tasks
+DEFAULT_TASK_QUEUE_PATH = ".tasks/queue.db"  # SQLite file (TASK_QUEUE_PATH env overrides)
+TASK_QUEUE_WORKERS = 2  # Task threads per process
+TASK_QUEUE_POLL_SECONDS = 1.0  # Idle workers check for due (delayed, retried, other process's) tasks this often
+TASK_TIMEOUT = 60.0  # Deadline (seconds) of one task attempt
+TASK_LEASE_SECONDS = 120.0  # A running task is retried if its process has not finished it by then
+TASK_MAX_ATTEMPTS = 5
+TASK_RETRY_BACKOFF = 2.0  # Seconds before the first retry, doubled per attempt
+TASK_MAX_RETRY_BACKOFF = 300.0
+TASK_DRAIN_TIMEOUT = 5.0  # Seconds to finish due tasks on shutdown (Cloud Run kills 10s after SIGTERM)
+TASK_MODULES = ["services.summaries"]  # Modules registering built-in task handlers
+TASK_REBUILD_SUMMARIES = "summaries.rebuild"
+SUMMARY_REBUILD_DELAY = 2.0  # Seconds a scheduled rebuild waits, so bursts of writes share one
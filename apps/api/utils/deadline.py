@@ -0,0 +1,209 @@
+"""
+Per-request deadlines.
+
+The gateway creates one Deadline per request and passes it to services
+(via config[DEADLINE_KEY]) so every RPC runs with the remaining budget as
+its timeout and retries stop once the budget is spent.
+"""
+import os
+import time
+from typing import Dict, Any, Optional
+from utils.constants import (
+    DEFAULT_REQUEST_TIMEOUT,
+    REQUEST_TIMEOUTS_KEY,
+    DEADLINE_KEY,
+    MIN_RPC_TIMEOUT,
+)
+
+
+class DeadlineExceededError(Exception):
+    """Raised when the request deadline has been exhausted."""
+    pass
+
+
+class Deadline:
+    """
+    Fixed point in time by which a request must complete.
+    
+    Usage:
+        deadline = Deadline(10.0)
+        client.call(**deadline.rpc_kwargs())
+    """
+    
+    def __init__(self, seconds: float, started_at: Optional[float] = None):
+        """
+        Initialize deadline.
+        
+        Args:
+            seconds: Total budget in seconds
+            started_at: time.monotonic() at which the budget started (now if omitted)
+        """
+        self.seconds = seconds
+        self.started_at = time.monotonic() if started_at is None else started_at
+        self.expires_at = self.started_at + seconds
+    
+    def with_timeout(self, seconds: float) -> "Deadline":
+        """
+        Deadline with a different budget counted from the same start.
+        
+        Args:
+            seconds: Total budget in seconds
+        
+        Returns:
+            New Deadline
+        """
+        return Deadline(seconds, started_at=self.started_at)
+    
+    def remaining(self) -> float:
+        """Seconds left (never negative)."""
+        return max(0.0, self.expires_at - time.monotonic())
+    
+    def elapsed(self) -> float:
+        """Seconds since the request started."""
+        return time.monotonic() - self.started_at
+    
+    @property
+    def expired(self) -> bool:
+        """Whether too little budget is left to start an RPC."""
+        return self.remaining() < MIN_RPC_TIMEOUT
+    
+    def check(self, operation: str = "request"):
+        """
+        Raise if the deadline is exhausted.
+        
+        Args:
+            operation: Operation name for the error message
+        
+        Raises:
+            DeadlineExceededError: If the budget is spent
+        """
+        if self.expired:
+            raise DeadlineExceededError(f"Deadline of {self.seconds:g}s exceeded before {operation}")
+    
+    def timeout(self, cap: Optional[float] = None, operation: str = "request") -> float:
+        """
+        Timeout for the next call: remaining budget, optionally capped.
+        
+        Args:
+            cap: Maximum timeout for this call
+            operation: Operation name for the error message
+        
+        Returns:
+            Timeout in seconds
+        
+        Raises:
+            DeadlineExceededError: If the budget is spent
+        """
+        self.check(operation)
+        remaining = self.remaining()
+        return min(remaining, cap) if cap is not None else remaining
+    
+    def allows_retry(self, delay: float = 0.0) -> bool:
+        """
+        Whether a retry after sleeping `delay` seconds still fits the budget.
+        
+        Args:
+            delay: Backoff before the retry
+        
+        Returns:
+            True if budget remains after the delay
+        """
+        return self.remaining() - delay >= MIN_RPC_TIMEOUT
+    
+    def rpc_kwargs(self, operation: str = "request") -> Dict[str, Any]:
+        """
+        timeout/retry kwargs for Google Cloud client calls.
+        
+        The retry keeps the client's transient-error policy but stops
+        retrying once the remaining budget is spent.
+        
+        Args:
+            operation: Operation name for the error message
+        
+        Returns:
+            Keyword arguments: timeout, retry
+        
+        Raises:
+            DeadlineExceededError: If the budget is spent
+        """
+        from google.api_core import retry as gcp_retry
+        
+        timeout = self.timeout(operation=operation)
+        retry = gcp_retry.Retry(predicate=gcp_retry.if_transient_error).with_deadline(timeout)
+        return {"timeout": timeout, "retry": retry}
+    
+    def __repr__(self):
+        return f"Deadline({self.seconds:g}s, remaining={self.remaining():.3f}s)"
+
+
+def rpc_kwargs(deadline: Optional[Deadline], operation: str = "request") -> Dict[str, Any]:
+    """
+    timeout/retry kwargs for a client call, empty without a deadline.
+    
+    Args:
+        deadline: Request deadline (None keeps client defaults)
+        operation: Operation name for the error message
+    
+    Returns:
+        Keyword arguments for the call
+    """
+    return deadline.rpc_kwargs(operation) if deadline else {}
+
+
+def is_timeout_error(error: Exception) -> bool:
+    """
+    Check whether an exception means a call ran out of time.
+    
+    Args:
+        error: Exception raised by a call
+    
+    Returns:
+        True for deadline/timeout errors (ours, builtin or Google API)
+    """
+    if isinstance(error, (DeadlineExceededError, TimeoutError)):
+        return True
+    try:
+        from google.api_core import exceptions as gcp_exceptions
+    except ImportError:
+        return False
+    return isinstance(error, (gcp_exceptions.DeadlineExceeded, gcp_exceptions.RetryError))
+
+
+def get_deadline(config: Dict[str, Any]) -> Optional[Deadline]:
+    """
+    Get the request deadline carried in a config.
+    
+    Args:
+        config: Project configuration
+    
+    Returns:
+        Deadline or None
+    """
+    return config.get(DEADLINE_KEY)
+
+
+def resolve_request_timeout(config: Dict[str, Any], project_id: str, flow_name: str) -> float:
+    """
+    Resolve the request timeout for a project/flow.
+    
+    Priority: request_timeouts["<project>/<flow>"] > request_timeouts["<project>"] >
+    request_timeouts["default"] > REQUEST_TIMEOUT env > DEFAULT_REQUEST_TIMEOUT.
+    
+    Args:
+        config: Project configuration
+        project_id: Project identifier
+        flow_name: Workflow name
+    
+    Returns:
+        Timeout in seconds
+    """
+    timeouts = config.get(REQUEST_TIMEOUTS_KEY, {})
+    for key in (f"{project_id}/{flow_name}", project_id, "default"):
+        if key in timeouts:
+            return float(timeouts[key])
+    return default_request_timeout()
+
+
+def default_request_timeout() -> float:
+    """Request timeout before project config is loaded (REQUEST_TIMEOUT env or default)."""
+    return float(os.getenv("REQUEST_TIMEOUT", DEFAULT_REQUEST_TIMEOUT))
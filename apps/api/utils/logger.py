@@ -2,10 +2,10 @@
 Logger module for Cloud Logging integration.
 """
 import uuid
+import threading
 import time
 from datetime import datetime
-from typing import Dict, Any, Optional
-from google.cloud import logging as cloud_logging
+from typing import Dict, Any, Optional, Tuple
 import os
 
 
@@ -47,11 +47,17 @@ class Logger:
     Logger for tracking request/response and workflow logs.
     """
     
+    # Cloud Logging loggers shared by every request, keyed by (GCP project, service name).
+    # google.cloud.logging is imported on first save(), not at startup.
+    _cloud_loggers: Dict[Tuple[str, str], Any] = {}
+    _cloud_lock = threading.Lock()
+    
     def __init__(
         self,
         project_id: str,
         flow_name: str,
-        execution_id: Optional[str] = None
+        execution_id: Optional[str] = None,
+        service_name: Optional[str] = None
     ):
         """
         Initialize logger.
@@ -60,6 +66,7 @@ class Logger:
             project_id: Project identifier
             flow_name: Workflow name
             execution_id: Optional execution ID (generated if not provided)
+            service_name: Cloud Logging log name (defaults to SERVICE_NAME env or "pipuli-api")
         """
         self.project_id = project_id
         self.flow_name = flow_name
@@ -67,10 +74,35 @@ class Logger:
         self.start_time = time.time()
         self.log_entries = []
         
-        # Initialize Cloud Logging client
-        self.client = cloud_logging.Client(project=os.getenv("GOOGLE_CLOUD_PROJECT", "pipuli-api"))
         self.service_name = service_name or os.getenv("SERVICE_NAME", "pipuli-api")
-        self.logger = self.client.logger(self.service_name)
+    
+    @classmethod
+    def _cloud_logger(cls, service_name: str):
+        """
+        Shared Cloud Logging logger for a service, created on first use.
+        
+        Args:
+            service_name: Log name
+        
+        Returns:
+            google.cloud.logging Logger
+        """
+        key = (os.getenv("GOOGLE_CLOUD_PROJECT", "pipuli-api"), service_name)
+        cloud_logger = cls._cloud_loggers.get(key)
+        if cloud_logger is None:
+            with cls._cloud_lock:
+                cloud_logger = cls._cloud_loggers.get(key)
+                if cloud_logger is None:
+                    from google.cloud import logging as cloud_logging
+                    client = cloud_logging.Client(project=key[0])
+                    cloud_logger = cls._cloud_loggers[key] = client.logger(service_name)
+        return cloud_logger
+    
+    @classmethod
+    def reset_clients(cls):
+        """Drop shared Cloud Logging clients (e.g. in a child process after fork)."""
+        with cls._cloud_lock:
+            cls._cloud_loggers = {}
     
     def info(self, message: str, data: Optional[Dict[str, Any]] = None, module: Optional[str] = None):
         """
@@ -224,7 +256,7 @@ class Logger:
             log_data["response"] = self.response_data
         
         # Log to Cloud Logging with structured data for filtering
-        self.logger.log_struct(
+        self._cloud_logger(self.service_name).log_struct(
             log_data,
             severity="INFO",
             labels={
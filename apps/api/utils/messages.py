@@ -57,6 +57,12 @@ class ErrorMessages:
     DB_ERROR_SAVE = "Ink spill on the ledger! We couldn't save that {item}. Try again."
     DB_ERROR_UPDATE = "Ink spill on the ledger! We couldn't update that {item}. Try again."
     DB_ERROR_DELETE = "The vault is locked. We couldn't delete that {item}. Try again."
+    
+    # Timeouts
+    DEADLINE_EXCEEDED = "Time's up! The request ran out of time before we could finish. Try again."
+    
+    # Input validation
+    INVALID_INPUT = "That request doesn't fit the mold. Fix the fields listed in details and try again."
 
 
 class SuccessMessages:
@@ -0,0 +1,233 @@
+"""
+Partitioned collection scans with resumable checkpoints.
+
+Shared by the operational scripts (export, migrations, purge) that walk
+whole collections: a source splits a collection into document-path ranges
+and reads each range in pages; a Checkpoint records per-range progress in
+a local JSON file so an interrupted run can resume.
+"""
+import json
+import os
+import threading
+from typing import Dict, Any, Optional, List, Iterator, Tuple
+
+# (document ID, document path, data)
+ScannedDocument = Tuple[str, str, Dict[str, Any]]
+
+DEFAULT_SCAN_PAGE_SIZE = 1000
+
+
+class Checkpoint:
+    """
+    Thread-safe progress of a partitioned scan, persisted atomically.
+    
+    State: {"partitions": [{"start", "end", "last", "done", ...}], ...}
+    """
+    
+    def __init__(self, path: str, state: Dict[str, Any]):
+        """
+        Initialize checkpoint.
+        
+        Args:
+            path: Checkpoint file path
+            state: Checkpoint state (must contain "partitions")
+        """
+        self.path = path
+        self.state = state
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def load(cls, path: str) -> Optional["Checkpoint"]:
+        """Load a checkpoint file, or None if missing."""
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return cls(path, json.load(f))
+    
+    @classmethod
+    def create(cls, path: str, ranges: List[Dict[str, Any]], **state) -> "Checkpoint":
+        """
+        Start a checkpoint for fresh partitions.
+        
+        Args:
+            path: Checkpoint file path
+            ranges: Partitions from a source ({"start", "end"})
+            **state: Extra top-level state (e.g. collection, format)
+        
+        Returns:
+            Saved checkpoint
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        checkpoint = cls(path, {
+            **state,
+            "partitions": [{**r, "last": None, "done": False} for r in ranges]
+        })
+        checkpoint.save()
+        return checkpoint
+    
+    def partition(self, index: int) -> Dict[str, Any]:
+        """Copy of one partition's progress."""
+        with self._lock:
+            return dict(self.state["partitions"][index])
+    
+    def pending(self) -> List[int]:
+        """Indexes of partitions not finished yet."""
+        with self._lock:
+            return [i for i, p in enumerate(self.state["partitions"]) if not p.get("done")]
+    
+    def update(self, index: int, **values):
+        """Update one partition's progress and persist."""
+        with self._lock:
+            self.state["partitions"][index].update(values)
+            self._save()
+    
+    def add(self, index: int, **counts):
+        """Add to one partition's counters (e.g. scanned=100) without persisting."""
+        with self._lock:
+            partition = self.state["partitions"][index]
+            for key, value in counts.items():
+                partition[key] = partition.get(key, 0) + value
+    
+    def total(self, key: str) -> int:
+        """Sum a counter over every partition."""
+        with self._lock:
+            return sum(p.get(key, 0) for p in self.state["partitions"])
+    
+    def save(self):
+        """Write the checkpoint atomically."""
+        with self._lock:
+            self._save()
+    
+    def _save(self):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.state, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+class FirestoreSource:
+    """
+    Reads a collection through Firestore partition queries.
+    """
+    
+    def __init__(self, client, collection: str, include_group: bool = False, page_size: int = DEFAULT_SCAN_PAGE_SIZE):
+        """
+        Initialize source.
+        
+        Args:
+            client: Firestore client
+            collection: Collection ID
+            include_group: Scan every collection with this ID (collection group),
+                not only the top-level one
+            page_size: Documents per read page
+        """
+        self.client = client
+        self.collection = collection
+        self.include_group = include_group
+        self.page_size = page_size
+    
+    def partitions(self, count: int) -> List[Dict[str, Any]]:
+        """
+        Split the collection into ranges of document paths.
+        
+        Args:
+            count: Desired number of partitions (Firestore may return fewer)
+        
+        Returns:
+            List of {"start", "end"} document paths (None = open end)
+        """
+        ranges = []
+        for partition in self.client.collection_group(self.collection).get_partitions(count):
+            ranges.append({
+                "start": partition.start_at.path if partition.start_at else None,
+                "end": partition.end_at.path if partition.end_at else None
+            })
+        return ranges
+    
+    def stream(self, start: Optional[str], end: Optional[str], after: Optional[str]) -> Iterator[ScannedDocument]:
+        """
+        Stream a partition in document path order, one page per query.
+        
+        Args:
+            start: Inclusive start document path
+            end: Exclusive end document path
+            after: Resume after this document path (overrides start)
+        
+        Yields:
+            (document ID, document path, data)
+        """
+        from google.cloud import firestore
+        
+        doc_id = firestore.FieldPath.document_id()
+        while True:
+            query = self.client.collection_group(self.collection).order_by(doc_id)
+            if after:
+                query = query.start_after({doc_id: self.client.document(after)})
+            elif start:
+                query = query.start_at({doc_id: self.client.document(start)})
+            if end:
+                query = query.end_before({doc_id: self.client.document(end)})
+            
+            read = 0
+            for doc in query.limit(self.page_size).stream():
+                read += 1
+                after = doc.reference.path
+                # Collection groups also match nested collections with the same ID
+                if not self.include_group and doc.reference.parent.parent is not None:
+                    continue
+                yield doc.id, doc.reference.path, doc.to_dict() or {}
+            if read < self.page_size:
+                return
+
+
+class BackendSource:
+    """
+    Reads a collection from a local storage backend as a single partition.
+    """
+    
+    def __init__(self, backend, collection: str, page_size: int = DEFAULT_SCAN_PAGE_SIZE):
+        """
+        Initialize source.
+        
+        Args:
+            backend: StorageBackend (memory/sqlite)
+            collection: Collection name
+            page_size: Documents per read page
+        """
+        self.backend = backend
+        self.collection = collection
+        self.page_size = page_size
+    
+    def partitions(self, count: int) -> List[Dict[str, Any]]:
+        return [{"start": None, "end": None}]
+    
+    def stream(self, start: Optional[str], end: Optional[str], after: Optional[str]) -> Iterator[ScannedDocument]:
+        last_id = after.rsplit("/", 1)[-1] if after else None
+        while True:
+            page = list(self.backend.stream(
+                self.collection, [], limit=self.page_size,
+                start_after=[last_id] if last_id else None, order_by_id=True
+            ))
+            for doc in page:
+                yield doc.id, f"{self.collection}/{doc.id}", doc.data
+            if len(page) < self.page_size:
+                return
+            last_id = page[-1].id
+
+
+def create_source(db, collection: str, include_group: bool = False, page_size: int = DEFAULT_SCAN_PAGE_SIZE):
+    """
+    Pick the scan source for a DatabaseService's backend.
+    
+    Args:
+        db: DatabaseService
+        collection: Collection name
+        include_group: Firestore only: scan the whole collection group
+        page_size: Documents per read page
+    
+    Returns:
+        FirestoreSource or BackendSource
+    """
+    if db.db is not None:
+        return FirestoreSource(db.db, collection, include_group, page_size)
+    return BackendSource(db.backend, collection, page_size)
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Sharded Counter Benchmark.
+
+Compares sustained increment throughput of a sharded counter against a
+single counter document, with concurrent writers:
+
+- single doc (transaction): read-modify-write, as per-user totals are
+  updated today; concurrent writers contend and retry
+- single doc (increment): server-side increment on one document
+- sharded (N shards): server-side increment on a random shard
+
+Local backends have no per-document write limit, so the gap there comes
+from contention only; run against Firestore to include the sustained
+single-document write limit.
+
+Usage:
+    python apps/api/utils/scripts/benchmark_counters.py
+    python apps/api/utils/scripts/benchmark_counters.py --backend sqlite --writers 16 --shards 20
+    ENV=dev python apps/api/utils/scripts/benchmark_counters.py --backend firestore --increments 50
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+# Add apps/api to path so internal imports work
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.abspath(os.path.join(current_dir, "../..")))
+
+from services.database import DatabaseService
+from utils.constants import (
+    COLLECTION_COUNTERS,
+    COUNTER_VALUE_FIELD,
+    STORAGE_BACKEND_FIRESTORE,
+    STORAGE_BACKEND_MEMORY,
+    STORAGE_BACKEND_SQLITE,
+)
+
+
+def create_service(backend: str) -> DatabaseService:
+    """Create a DatabaseService for the benchmarked backend."""
+    if backend == STORAGE_BACKEND_FIRESTORE:
+        from configs.loader import load_config
+        return DatabaseService(load_config("counter-benchmark"))
+    db_config = {"backend": backend, "database_id": f"bench-{time.time_ns()}"}
+    if backend == STORAGE_BACKEND_SQLITE:
+        db_config["sqlite_path"] = os.path.join(tempfile.mkdtemp(), "bench.db")
+    return DatabaseService({"database": db_config})
+
+
+def run_writers(label: str, writers: int, increments: int, func, read):
+    """Run func concurrently from several threads and print throughput."""
+    errors = []
+    
+    def worker():
+        for _ in range(increments):
+            try:
+                func()
+            except Exception as e:
+                errors.append(e)
+    
+    threads = [threading.Thread(target=worker) for _ in range(writers)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    
+    total = writers * increments
+    print(f"   {label:<30} {total / elapsed:>10,.0f} inc/s   value={read():,.0f}/{total:,}   errors={len(errors)}")
+
+
+def benchmark_backend(backend: str, writers: int, increments: int, shards: int):
+    """
+    Benchmark one backend.
+    
+    Args:
+        backend: Storage backend name
+        writers: Concurrent writer threads
+        increments: Increments per writer
+        shards: Shard count for the sharded counter
+    """
+    db = create_service(backend)
+    run_id = time.time_ns()
+    print(f"\n📦 Backend: {backend} ({writers} writers x {increments} increments)")
+    
+    doc_id = f"bench-txn-{run_id}"
+    db.create(COLLECTION_COUNTERS, {COUNTER_VALUE_FIELD: 0}, document_id=doc_id)
+    
+    def add_in_transaction(txn):
+        current = txn.get(COLLECTION_COUNTERS, doc_id)
+        txn.update(COLLECTION_COUNTERS, doc_id, {COUNTER_VALUE_FIELD: current[COUNTER_VALUE_FIELD] + 1})
+    
+    run_writers(
+        "single doc (transaction)", writers, increments,
+        lambda: db.run_transaction(add_in_transaction, max_attempts=50),
+        lambda: db.get(COLLECTION_COUNTERS, doc_id, use_cache=False)[COUNTER_VALUE_FIELD]
+    )
+    
+    single = db.counter(f"bench-single-{run_id}", num_shards=1)
+    single.initialize()
+    run_writers("single doc (increment)", writers, increments, single.increment, single.value)
+    
+    sharded = db.counter(f"bench-sharded-{run_id}", num_shards=shards)
+    sharded.initialize()
+    run_writers(f"sharded ({shards} shards)", writers, increments, sharded.increment, sharded.value)
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Benchmark sharded counters against a single document")
+    parser.add_argument("--writers", type=int, default=8, help="Concurrent writer threads")
+    parser.add_argument("--increments", type=int, default=500, help="Increments per writer")
+    parser.add_argument("--shards", type=int, default=10, help="Shards of the sharded counter")
+    parser.add_argument(
+        "--backend",
+        choices=[STORAGE_BACKEND_MEMORY, STORAGE_BACKEND_SQLITE, STORAGE_BACKEND_FIRESTORE],
+        help="Only run one backend (firestore uses the ENV project config)"
+    )
+    args = parser.parse_args()
+    
+    backends = [args.backend] if args.backend else [STORAGE_BACKEND_MEMORY, STORAGE_BACKEND_SQLITE]
+    for backend in backends:
+        benchmark_backend(backend, args.writers, args.increments, args.shards)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Startup Benchmark.
+
+Measures cold start the way a new Cloud Run instance sees it:
+1. `python -X importtime -c "import main"`: total import time and the
+   heaviest top-level packages (google.cloud.*, firebase_admin, ...
+   should not appear: they are imported on first use).
+2. Time from launching `uvicorn main:app` to the first successful
+   `GET /health`.
+
+Each measurement runs in a fresh process. With --max-import-ms or
+--max-ready-ms the script exits non-zero when the median exceeds the
+budget, so CI catches cold start regressions.
+
+Usage:
+    python apps/api/utils/scripts/benchmark_startup.py
+    python apps/api/utils/scripts/benchmark_startup.py --runs 5 --max-import-ms 800 --max-ready-ms 2500
+    python apps/api/utils/scripts/benchmark_startup.py --skip-server --top 25
+"""
+import argparse
+import os
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from typing import Dict, List, Set, Tuple
+
+# Script is at: apps/api/utils/scripts/benchmark_startup.py; the app runs from apps/api
+current_dir = os.path.dirname(os.path.abspath(__file__))
+app_dir = os.path.abspath(os.path.join(current_dir, "../.."))
+
+# Libraries that must stay out of the import path of main.py
+DEFERRED_PACKAGES = ["google.cloud.firestore", "google.cloud.logging", "google.cloud.secretmanager", "firebase_admin"]
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def measure_imports(env: Dict[str, str]) -> Tuple[float, Dict[str, float], Set[str]]:
+    """
+    Import main in a fresh interpreter with -X importtime.
+    
+    Args:
+        env: Environment for the subprocess
+    
+    Returns:
+        (total ms, {top-level package: cumulative ms}, every imported module)
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=app_dir, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import main failed:\n{result.stderr[-2000:]}")
+    
+    # Per top-level package: cumulative time at its shallowest nesting level
+    packages: Dict[str, Tuple[int, float]] = {}
+    imported: Set[str] = set()
+    total_us = 0
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, depth, name = int(match.group(1)), int(match.group(2)), len(match.group(3)), match.group(4)
+        total_us += self_us
+        imported.add(name)
+        root = name.split(".")[0]
+        if root == "main":
+            continue
+        best_depth, ms = packages.get(root, (depth, 0.0))
+        if depth < best_depth:
+            packages[root] = (depth, cumulative_us / 1000)
+        elif depth == best_depth:
+            packages[root] = (depth, ms + cumulative_us / 1000)
+    return total_us / 1000, {root: ms for root, (_, ms) in packages.items()}, imported
+
+
+def free_port() -> int:
+    """Pick an unused local port."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_ready(env: Dict[str, str], timeout: float) -> float:
+    """
+    Start uvicorn and poll /health until it answers 200.
+    
+    Args:
+        env: Environment for the server
+        timeout: Seconds to wait before giving up
+    
+    Returns:
+        Milliseconds from process start to the first healthy response
+    """
+    port = free_port()
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=app_dir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            if server.poll() is not None:
+                raise RuntimeError(f"server exited:\n{server.stderr.read().decode()[-2000:]}")
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=0.5) as response:
+                    if response.status == 200:
+                        return (time.perf_counter() - started) * 1000
+            except (urllib.error.URLError, ConnectionError, socket.timeout):
+                time.sleep(0.01)
+        raise RuntimeError(f"/health not ready after {timeout}s")
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            server.kill()
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Measure import time and time to first /health")
+    parser.add_argument("--runs", type=int, default=3, help="Fresh processes per measurement")
+    parser.add_argument("--top", type=int, default=15, help="Heaviest top-level imports to list")
+    parser.add_argument("--skip-server", action="store_true", help="Only measure imports")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Seconds to wait for /health")
+    parser.add_argument("--max-import-ms", type=float, help="Fail if the median import time exceeds this")
+    parser.add_argument("--max-ready-ms", type=float, help="Fail if the median time to /health exceeds this")
+    args = parser.parse_args()
+    
+    env = {**os.environ, "PYTHONDONTWRITEBYTECODE": "1"}
+    failures: List[str] = []
+    
+    print(f"🚀 Startup benchmark ({args.runs} runs, app: {app_dir})")
+    
+    totals = []
+    modules: Dict[str, float] = {}
+    imported: Set[str] = set()
+    for _ in range(args.runs):
+        total, modules, imported = measure_imports(env)
+        totals.append(total)
+    import_ms = statistics.median(totals)
+    print(f"\n📦 import main: median {import_ms:,.0f} ms (runs: {', '.join(f'{t:,.0f}' for t in totals)})")
+    for name, ms in sorted(modules.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"   {name:<40} {ms:>8,.1f} ms")
+    
+    eager = [p for p in DEFERRED_PACKAGES if any(name == p or name.startswith(p + ".") for name in imported)]
+    if eager:
+        failures.append(f"imported at startup: {', '.join(eager)}")
+    if args.max_import_ms is not None and import_ms > args.max_import_ms:
+        failures.append(f"import time {import_ms:,.0f} ms > {args.max_import_ms:,.0f} ms")
+    
+    if not args.skip_server:
+        ready = [measure_ready(env, args.timeout) for _ in range(args.runs)]
+        ready_ms = statistics.median(ready)
+        print(f"\n🩺 first /health: median {ready_ms:,.0f} ms (runs: {', '.join(f'{t:,.0f}' for t in ready)})")
+        if args.max_ready_ms is not None and ready_ms > args.max_ready_ms:
+            failures.append(f"time to /health {ready_ms:,.0f} ms > {args.max_ready_ms:,.0f} ms")
+    
+    if failures:
+        for failure in failures:
+            print(f"\n❌ {failure}")
+        sys.exit(1)
+    print("\n✅ Startup within budget")
+
+
+if __name__ == "__main__":
+    main()
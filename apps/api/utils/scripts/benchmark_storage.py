@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Storage Backend Benchmark.
+
+Drives DatabaseService against the in-memory and SQLite backends and
+reports operations per second for create/get/update/query/list, so
+workflow and gateway benchmarks can run without Firestore credentials.
+
+Usage:
+    python apps/api/utils/scripts/benchmark_storage.py
+    python apps/api/utils/scripts/benchmark_storage.py --ops 20000 --backend sqlite
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+# Add apps/api to path so internal imports work
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.abspath(os.path.join(current_dir, "../..")))
+
+from services.database import DatabaseService
+from utils.constants import (
+    COLLECTION_ASSETS,
+    ASSET_TYPE_INVESTMENT,
+    ASSET_TYPE_PROPERTY,
+    WRITE_RETURN_RESULT,
+    STORAGE_BACKEND_MEMORY,
+    STORAGE_BACKEND_SQLITE,
+)
+
+
+def timed(label: str, ops: int, func):
+    """Run func ops times and print throughput."""
+    start = time.perf_counter()
+    for i in range(ops):
+        func(i)
+    elapsed = time.perf_counter() - start
+    print(f"   {label:<28} {ops / elapsed:>12,.0f} ops/s   ({elapsed * 1000 / ops:.3f} ms/op)")
+
+
+def benchmark_backend(backend: str, ops: int, query_ops: int):
+    """
+    Benchmark one backend.
+    
+    Args:
+        backend: "memory" or "sqlite"
+        ops: Number of point operations (create/get/update)
+        query_ops: Number of query/list operations
+    """
+    db_config = {"backend": backend, "database_id": f"bench-{time.time_ns()}"}
+    if backend == STORAGE_BACKEND_SQLITE:
+        db_config["sqlite_path"] = os.path.join(tempfile.mkdtemp(), "bench.db")
+    db = DatabaseService({"database": db_config})
+    
+    print(f"\n📦 Backend: {backend} ({ops:,} documents)")
+    timed("create", ops, lambda i: db.create(COLLECTION_ASSETS, {
+        "name": f"Asset {i}",
+        "type": ASSET_TYPE_INVESTMENT if i % 2 else ASSET_TYPE_PROPERTY,
+        "balance": i * 10.0,
+        "uid": f"user{i % 100}"
+    }, document_id=f"asset{i}"))
+    timed("get", ops, lambda i: db.get(COLLECTION_ASSETS, f"asset{i}"))
+    timed("update (result mode)", ops, lambda i: db.update(
+        COLLECTION_ASSETS, f"asset{i}", {"balance": i * 11.0}, return_mode=WRITE_RETURN_RESULT
+    ))
+    timed("query (uid ==, order, 20)", query_ops, lambda i: db.query(
+        COLLECTION_ASSETS, [("uid", "==", f"user{i % 100}")], order_by="balance", limit=20
+    ))
+    timed("list_page (100)", query_ops, lambda i: db.list_page(COLLECTION_ASSETS, limit=100))
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Benchmark DatabaseService storage backends")
+    parser.add_argument("--ops", type=int, default=5000, help="Point operations per step")
+    parser.add_argument("--query-ops", type=int, default=200, help="Query operations per step")
+    parser.add_argument("--backend", choices=[STORAGE_BACKEND_MEMORY, STORAGE_BACKEND_SQLITE], help="Only run one backend")
+    args = parser.parse_args()
+    
+    backends = [args.backend] if args.backend else [STORAGE_BACKEND_MEMORY, STORAGE_BACKEND_SQLITE]
+    for backend in backends:
+        benchmark_backend(backend, args.ops, args.query_ops)
+
+
+if __name__ == "__main__":
+    main()
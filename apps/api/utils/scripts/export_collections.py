@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Parallel Collection Export Script.
+
+Splits each collection into ranges with Firestore partition queries, reads
+the partitions concurrently and streams documents to compressed NDJSON
+(one gzip file per partition) or Parquet (one file per chunk). Memory use
+is bounded by --chunk-size documents per worker.
+
+Progress is checkpointed after every chunk in <output>/<collection>/_checkpoint.json;
+rerunning with --resume continues each partition after its last exported
+document (partial output past the checkpoint is discarded).
+
+Local backends (DATABASE_BACKEND=memory/sqlite) have no partition queries
+and are exported as a single partition.
+
+Usage:
+    ENV=dev python apps/api/utils/scripts/export_collections.py --output exports/dev
+    ENV=prod python apps/api/utils/scripts/export_collections.py assets movements --partitions 32 --workers 8
+    ENV=prod python apps/api/utils/scripts/export_collections.py movements --format parquet --resume --output exports/prod
+"""
+import argparse
+import base64
+import gzip
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from typing import Dict, Any, List
+
+# Add project root to python path
+# Script is at: apps/api/utils/scripts/export_collections.py
+# Root is 4 levels up
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, "../../../../"))
+sys.path.append(project_root)
+# Also add apps/api to path so internal imports work
+sys.path.append(os.path.join(project_root, "apps", "api"))
+
+from apps.api.configs.loader import load_config
+from apps.api.services.database import DatabaseService
+from apps.api.utils.partitions import Checkpoint, create_source
+from apps.api.utils.constants import (
+    COLLECTION_ASSETS,
+    COLLECTION_MOVEMENTS,
+    COLLECTION_SUMMARIES,
+)
+
+FORMAT_NDJSON = "ndjson"
+FORMAT_PARQUET = "parquet"
+CHECKPOINT_FILE = "_checkpoint.json"
+
+
+def _json_default(value: Any) -> Any:
+    """Serialize Firestore values that JSON does not know."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, bytes):
+        return base64.b64encode(value).decode("ascii")
+    if hasattr(value, "latitude") and hasattr(value, "longitude"):
+        return {"latitude": value.latitude, "longitude": value.longitude}
+    if hasattr(value, "path"):
+        # DocumentReference
+        return value.path
+    return str(value)
+
+
+def _jsonable(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Round-trip a document through JSON so every value is a plain type."""
+    return json.loads(json.dumps(data, default=_json_default))
+
+
+class PartitionWriter:
+    """
+    Writes one partition's chunks to disk.
+    
+    NDJSON: every chunk is a complete gzip member appended to one file, so
+    the file can be truncated back to the last checkpointed chunk.
+    Parquet: every chunk is its own file.
+    """
+    
+    def __init__(self, directory: str, index: int, output_format: str):
+        """
+        Initialize writer.
+        
+        Args:
+            directory: Collection output directory
+            index: Partition index
+            output_format: "ndjson" or "parquet"
+        """
+        self.directory = directory
+        self.index = index
+        self.output_format = output_format
+        self.path = os.path.join(directory, f"part-{index:05d}.ndjson.gz")
+    
+    def truncate(self, offset: int):
+        """Drop NDJSON output past the last checkpointed chunk."""
+        if self.output_format != FORMAT_NDJSON:
+            return
+        if offset == 0:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+            return
+        with open(self.path, "r+b") as f:
+            f.truncate(offset)
+    
+    def write_chunk(self, rows: List[Dict[str, Any]], chunk: int) -> int:
+        """
+        Write a chunk of documents.
+        
+        Args:
+            rows: Documents ({"_id", "_path", **data})
+            chunk: Chunk number within the partition
+        
+        Returns:
+            NDJSON file size after the chunk (0 for Parquet)
+        """
+        if self.output_format == FORMAT_PARQUET:
+            self._write_parquet(rows, chunk)
+            return 0
+        
+        with open(self.path, "ab") as raw:
+            with gzip.GzipFile(fileobj=raw, mode="wb") as out:
+                for row in rows:
+                    out.write(json.dumps(row, default=_json_default, separators=(",", ":")).encode("utf-8"))
+                    out.write(b"\n")
+            return raw.tell()
+    
+    def _write_parquet(self, rows: List[Dict[str, Any]], chunk: int):
+        """Write a chunk as a Parquet file (falls back to a JSON column on mixed types)."""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        
+        plain = [_jsonable(row) for row in rows]
+        try:
+            table = pa.Table.from_pylist(plain)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            table = pa.Table.from_pylist([
+                {"_id": row["_id"], "_path": row["_path"], "data": json.dumps(row)} for row in plain
+            ])
+        path = os.path.join(self.directory, f"part-{self.index:05d}-{chunk:06d}.parquet")
+        tmp_path = f"{path}.tmp"
+        pq.write_table(table, tmp_path, compression="zstd")
+        os.replace(tmp_path, path)
+
+
+def export_partition(
+    source,
+    checkpoint: Checkpoint,
+    index: int,
+    directory: str,
+    output_format: str,
+    chunk_size: int
+) -> int:
+    """
+    Export one partition, checkpointing after every chunk.
+    
+    Args:
+        source: Scan source (see utils/partitions.py)
+        checkpoint: Collection checkpoint
+        index: Partition index
+        directory: Collection output directory
+        output_format: "ndjson" or "parquet"
+        chunk_size: Documents per chunk
+    
+    Returns:
+        Documents exported by this run
+    """
+    progress = checkpoint.partition(index)
+    if progress.get("done"):
+        return 0
+    
+    writer = PartitionWriter(directory, index, output_format)
+    writer.truncate(progress.get("bytes", 0))
+    
+    exported = 0
+    count = progress.get("count", 0)
+    chunk = progress.get("chunks", 0)
+    rows: List[Dict[str, Any]] = []
+    last_path = progress.get("last")
+    
+    def flush():
+        nonlocal rows, chunk, count
+        if not rows:
+            return
+        offset = writer.write_chunk(rows, chunk)
+        chunk += 1
+        count += len(rows)
+        checkpoint.update(index, last=rows[-1]["_path"], count=count, chunks=chunk, bytes=offset)
+        rows = []
+    
+    for doc_id, path, data in source.stream(progress.get("start"), progress.get("end"), last_path):
+        rows.append({"_id": doc_id, "_path": path, **data})
+        exported += 1
+        if len(rows) >= chunk_size:
+            flush()
+    flush()
+    
+    checkpoint.update(index, done=True)
+    return exported
+
+
+def export_collection(db: DatabaseService, collection: str, args) -> Dict[str, Any]:
+    """
+    Export one collection.
+    
+    Args:
+        db: Database service
+        collection: Collection name
+        args: Parsed command line arguments
+    
+    Returns:
+        Summary: partitions, exported, total, seconds
+    """
+    directory = os.path.join(args.output, collection)
+    os.makedirs(directory, exist_ok=True)
+    checkpoint_path = os.path.join(directory, CHECKPOINT_FILE)
+    
+    source = create_source(db, collection, args.group, args.chunk_size)
+    
+    checkpoint = Checkpoint.load(checkpoint_path) if args.resume else None
+    if checkpoint and checkpoint.state.get("format") != args.format:
+        raise ValueError(f"Checkpoint was written for format '{checkpoint.state.get('format')}'")
+    if checkpoint is None:
+        # Fresh export: clear previous output
+        for name in os.listdir(directory):
+            if name.startswith("part-") or name == CHECKPOINT_FILE:
+                os.remove(os.path.join(directory, name))
+        ranges = source.partitions(args.partitions)
+        checkpoint = Checkpoint.create(checkpoint_path, ranges, collection=collection, format=args.format)
+    
+    partitions = checkpoint.state["partitions"]
+    pending = checkpoint.pending()
+    print(f"   📦 '{collection}': {len(partitions)} partitions, {len(pending)} to export")
+    
+    started = time.monotonic()
+    exported = 0
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        futures = {
+            executor.submit(export_partition, source, checkpoint, i, directory, args.format, args.chunk_size): i
+            for i in pending
+        }
+        for future in as_completed(futures):
+            exported += future.result()
+    
+    return {
+        "partitions": len(partitions),
+        "exported": exported,
+        "total": checkpoint.total("count"),
+        "seconds": time.monotonic() - started
+    }
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Export collections to NDJSON.gz or Parquet using partition queries")
+    parser.add_argument("collections", nargs="*", help="Collections to export (default: assets movements summaries)")
+    parser.add_argument("--output", default="exports", help="Output directory")
+    parser.add_argument("--format", choices=[FORMAT_NDJSON, FORMAT_PARQUET], default=FORMAT_NDJSON)
+    parser.add_argument("--partitions", type=int, default=16, help="Partitions requested per collection")
+    parser.add_argument("--workers", type=int, default=8, help="Partitions read concurrently")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="Documents buffered per worker")
+    parser.add_argument("--group", action="store_true", help="Export the whole collection group (nested collections too)")
+    parser.add_argument("--resume", action="store_true", help="Continue from existing checkpoints")
+    args = parser.parse_args()
+    
+    if args.format == FORMAT_PARQUET:
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            print("❌ Parquet export requires pyarrow: pip install pyarrow")
+            sys.exit(1)
+    
+    env = os.getenv("ENV", "dev")
+    collections = args.collections or [COLLECTION_ASSETS, COLLECTION_MOVEMENTS, COLLECTION_SUMMARIES]
+    print(f"📤 Exporting {', '.join(collections)} for environment: {env.upper()} → {args.output} ({args.format})")
+    
+    config = load_config("export-script")
+    db = DatabaseService(config)
+    
+    for collection in collections:
+        try:
+            summary = export_collection(db, collection, args)
+        except Exception as e:
+            print(f"   ❌ Error exporting '{collection}': {e}")
+            continue
+        rate = summary["exported"] / summary["seconds"] if summary["seconds"] else 0
+        print(f"   ✅ '{collection}': {summary['exported']:,} exported this run, {summary['total']:,} total "
+              f"({summary['seconds']:.1f}s, {rate:,.0f} docs/s)")
+    
+    print(f"\n✅ Export complete for {env.upper()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Composite Index Advisor.
+
+Reads query shapes recorded by DatabaseService (enable with
+`"database": {"query_stats": {"log_path": "query_shapes.jsonl"}}`) and:
+
+- suggests a firestore.indexes.json covering every shape that needs a
+  composite index (merged with an existing file if given)
+- flags shapes that read far more documents than they return
+- lists shapes that failed (e.g. FailedPrecondition: missing index)
+
+Usage:
+    python apps/api/utils/scripts/index_advisor.py query_shapes.jsonl
+    python apps/api/utils/scripts/index_advisor.py logs/*.jsonl --existing firestore.indexes.json --output firestore.indexes.json
+"""
+import argparse
+import json
+import os
+import sys
+from typing import Dict, Any, List
+
+# Add apps/api to path so internal imports work
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.abspath(os.path.join(current_dir, "../..")))
+
+from services.query_stats import required_index
+from utils.constants import OVERSCAN_RATIO
+
+
+def load_shapes(paths: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Aggregate recorded queries per shape.
+    
+    Args:
+        paths: JSONL files written by QueryRecorder
+    
+    Returns:
+        Shape key -> {shape, count, errors, total_ms, max_ms, read, returned, last_error}
+    """
+    shapes: Dict[str, Dict[str, Any]] = {}
+    for path in paths:
+        with open(path) as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    print(f"   ⚠️  Skipping malformed line {path}:{line_number}")
+                    continue
+                shape = record["shape"]
+                stats = shapes.setdefault(shape["key"], {
+                    "shape": shape,
+                    "count": 0,
+                    "errors": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "read": 0,
+                    "returned": 0,
+                    "last_error": None
+                })
+                stats["count"] += 1
+                stats["total_ms"] += record.get("duration_ms", 0.0)
+                stats["max_ms"] = max(stats["max_ms"], record.get("duration_ms", 0.0))
+                stats["read"] += record.get("read", 0)
+                stats["returned"] += record.get("returned", 0)
+                if record.get("error"):
+                    stats["errors"] += 1
+                    stats["last_error"] = record["error"]
+    return shapes
+
+
+def index_key(index: Dict[str, Any]) -> str:
+    """Identity of an index definition, for de-duplication."""
+    return json.dumps([index["collectionGroup"], index.get("queryScope", "COLLECTION"), index["fields"]], sort_keys=True)
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Suggest Firestore composite indexes from recorded query shapes")
+    parser.add_argument("logs", nargs="+", help="Query shape JSONL files")
+    parser.add_argument("--existing", help="Existing firestore.indexes.json to merge with")
+    parser.add_argument("--output", help="Write the suggested firestore.indexes.json here (default: stdout)")
+    parser.add_argument("--overscan-ratio", type=float, default=OVERSCAN_RATIO, help="Read/returned ratio to flag")
+    args = parser.parse_args()
+    
+    shapes = load_shapes(args.logs)
+    print(f"🔎 {len(shapes)} query shapes from {sum(s['count'] for s in shapes.values()):,} queries\n", file=sys.stderr)
+    
+    indexes_file = {"indexes": [], "fieldOverrides": []}
+    if args.existing and os.path.exists(args.existing):
+        with open(args.existing) as f:
+            indexes_file = json.load(f)
+        indexes_file.setdefault("indexes", [])
+        indexes_file.setdefault("fieldOverrides", [])
+    known = {index_key(index) for index in indexes_file["indexes"]}
+    
+    new_indexes = 0
+    overscanning = []
+    failing = []
+    for key, stats in sorted(shapes.items(), key=lambda item: item[1]["total_ms"], reverse=True):
+        index = required_index(stats["shape"])
+        status = "-"
+        if index:
+            if index_key(index) in known:
+                status = "indexed"
+            else:
+                indexes_file["indexes"].append(index)
+                known.add(index_key(index))
+                new_indexes += 1
+                status = "NEW INDEX"
+        
+        ratio = stats["read"] / max(stats["returned"], 1)
+        if stats["read"] and ratio >= args.overscan_ratio:
+            overscanning.append((key, ratio, stats))
+        if stats["errors"]:
+            failing.append((key, stats))
+        
+        avg_ms = stats["total_ms"] / stats["count"]
+        print(f"   {key:<60} n={stats['count']:<6} avg={avg_ms:>8.1f}ms max={stats['max_ms']:>8.1f}ms  {status}", file=sys.stderr)
+    
+    if overscanning:
+        print(f"\n⚠️  Shapes reading ≥{args.overscan_ratio:g}x the documents they return:", file=sys.stderr)
+        for key, ratio, stats in overscanning:
+            print(f"   {key}: read {stats['read']:,}, returned {stats['returned']:,} ({ratio:.1f}x)", file=sys.stderr)
+    
+    if failing:
+        print("\n❌ Failing shapes:", file=sys.stderr)
+        for key, stats in failing:
+            print(f"   {key}: {stats['errors']} errors (last: {stats['last_error']})", file=sys.stderr)
+    
+    output = json.dumps(indexes_file, indent=2) + "\n"
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+        print(f"\n✅ {new_indexes} new indexes, written to {args.output}", file=sys.stderr)
+    else:
+        print(f"\n✅ {new_indexes} new indexes\n", file=sys.stderr)
+        print(output, end="")
+
+
+if __name__ == "__main__":
+    main()
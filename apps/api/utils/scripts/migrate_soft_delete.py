@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Soft Delete Migration Script.
+
+Backfills the indexed `isDeleted` flag on existing documents so that
+DatabaseService can filter soft-deleted documents inside Firestore queries
+instead of reading and discarding them.
+
+DatabaseService filters in Python ("client", the default) until an
+environment's config sets `"database": {"soft_delete_filter": "server"}`,
+or lists the collection in `"database": {"soft_delete_migrated": [...]}`.
+Run this first: server filtering hides documents without the flag.
+
+Usage:
+    ENV=dev python apps/api/utils/scripts/migrate_soft_delete.py
+    ENV=dev python apps/api/utils/scripts/migrate_soft_delete.py --dry-run
+    ENV=prod python apps/api/utils/scripts/migrate_soft_delete.py assets movements
+"""
+import sys
+import os
+
+# Add project root to python path
+# Script is at: apps/api/utils/scripts/migrate_soft_delete.py
+# Root is 4 levels up
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, "../../../../"))
+sys.path.append(project_root)
+# Also add apps/api to path so internal imports work
+sys.path.append(os.path.join(project_root, "apps", "api"))
+
+from apps.api.configs.loader import load_config
+from apps.api.services.database import DatabaseService
+from apps.api.utils.logger import Logger
+from apps.api.utils.constants import (
+    COLLECTION_ASSETS,
+    COLLECTION_MOVEMENTS,
+    COLLECTION_SUMMARIES,
+    DELETED_AT_FIELD,
+    SOFT_DELETE_FIELD,
+    SOFT_DELETE_FILTER_CLIENT,
+    WRITE_RETURN_RESULT,
+)
+
+BATCH_SIZE = 500  # Firestore batch write limit
+
+
+def migrate_collection(db: DatabaseService, collection: str, dry_run: bool) -> dict:
+    """
+    Set isDeleted on every document of a collection that is missing it.
+    
+    Args:
+        db: Database service
+        collection: Collection name
+        dry_run: If True, only count documents
+    
+    Returns:
+        Counts: scanned, updated, deleted
+    """
+    stats = {"scanned": 0, "updated": 0, "deleted": 0}
+    batch = db.db.batch() if db.db is not None else None
+    pending = 0
+    
+    for doc in db.iter_list(collection, exclude_deleted=False):
+        stats["scanned"] += 1
+        is_deleted = bool(doc.get(DELETED_AT_FIELD))
+        if is_deleted:
+            stats["deleted"] += 1
+        if doc.get(SOFT_DELETE_FIELD) == is_deleted:
+            continue
+        
+        stats["updated"] += 1
+        if dry_run:
+            continue
+        if db.db is None:
+            # Local (memory/sqlite) backend: no batched writes
+            db.update(collection, doc["id"], {SOFT_DELETE_FIELD: is_deleted}, return_mode=WRITE_RETURN_RESULT)
+            continue
+        batch.update(db.db.collection(collection).document(doc["id"]), {SOFT_DELETE_FIELD: is_deleted})
+        pending += 1
+        if pending >= BATCH_SIZE:
+            batch.commit()
+            batch = db.db.batch()
+            pending = 0
+    
+    if pending:
+        batch.commit()
+    return stats
+
+
+def migrate_soft_delete():
+    env = os.getenv("ENV", "dev")
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    dry_run = "--dry-run" in sys.argv
+    collections = args or [COLLECTION_ASSETS, COLLECTION_MOVEMENTS, COLLECTION_SUMMARIES]
+    
+    print(f"🔧 Migrating soft delete flag for environment: {env.upper()}{' (dry run)' if dry_run else ''}")
+    
+    config = load_config("migration-script")
+    # Read everything: the isDeleted filter cannot match unmigrated documents
+    config.setdefault("database", {})["soft_delete_filter"] = SOFT_DELETE_FILTER_CLIENT
+    
+    logger = Logger("migration-script", "migrate_soft_delete")
+    db = DatabaseService(config, logger)
+    
+    total_deleted = 0
+    for col in collections:
+        try:
+            stats = migrate_collection(db, col, dry_run)
+        except Exception as e:
+            print(f"   ❌ Error migrating '{col}': {e}")
+            continue
+        total_deleted += stats["deleted"]
+        verb = "would update" if dry_run else "updated"
+        print(f"   ✅ '{col}': scanned {stats['scanned']}, {verb} {stats['updated']}, soft-deleted {stats['deleted']}")
+    
+    # Every soft-deleted document used to be read and discarded by a full scan
+    print(f"\n📉 Reads saved per full scan once filtering is server-side: {total_deleted}")
+    print(f"\n✅ Migration complete for {env.upper()}")
+
+
+if __name__ == "__main__":
+    migrate_soft_delete()
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Soft-Deleted Document Purge.
+
+Hard-deletes documents that were soft-deleted (`deletedAt` set) longer ago
+than the retention period. Purging an asset also purges its dependent
+movements and summaries. Deletes run in rate-limited batches and carry the
+update time that was read, so a document restored in the meantime is
+skipped. With --archive, every document is appended to a local NDJSON file
+(and synced to disk) before it is deleted.
+
+The job is idempotent: rerun it after an interruption and it picks up the
+documents that are left.
+
+Retention: --retention-days, else config `"database": {"purge_retention_days": n}`,
+else 30 days.
+
+Usage:
+    ENV=dev python apps/api/utils/scripts/purge_deleted.py --dry-run
+    ENV=prod python apps/api/utils/scripts/purge_deleted.py --retention-days 90 --archive purged-prod.ndjson
+    ENV=prod python apps/api/utils/scripts/purge_deleted.py movements --max-ops 100
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timezone, timedelta
+from typing import Dict, Any, Optional, List, Tuple
+
+# Add project root to python path
+# Script is at: apps/api/utils/scripts/purge_deleted.py
+# Root is 4 levels up
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, "../../../../"))
+sys.path.append(project_root)
+# Also add apps/api to path so internal imports work
+sys.path.append(os.path.join(project_root, "apps", "api"))
+
+from apps.api.configs.loader import load_config
+from apps.api.services.database import DatabaseService
+from apps.api.services.storage.base import StoredDocument, DocumentConflictError
+from apps.api.utils.constants import (
+    COLLECTION_ASSETS,
+    COLLECTION_MOVEMENTS,
+    COLLECTION_SUMMARIES,
+    DELETED_AT_FIELD,
+    MOVEMENT_ASSET_ID_FIELD,
+    DEFAULT_PURGE_RETENTION_DAYS,
+    DEFAULT_PURGE_BATCH_SIZE,
+    DEFAULT_PURGE_MAX_OPS,
+    FIRESTORE_READ_COST_PER_100K,
+)
+
+# Collections whose documents reference an asset through assetId
+ASSET_DEPENDENTS = [COLLECTION_MOVEMENTS, COLLECTION_SUMMARIES]
+
+# gRPC codes retried by the BulkWriter
+RETRYABLE_CODES = (4, 8, 10, 13, 14)  # DEADLINE_EXCEEDED, RESOURCE_EXHAUSTED, ABORTED, INTERNAL, UNAVAILABLE
+FAILED_PRECONDITION = 9
+MAX_DELETE_ATTEMPTS = 5
+
+# (collection, stored document, check update time)
+PurgeItem = Tuple[str, StoredDocument, bool]
+
+
+def _json_default(value: Any) -> Any:
+    """Serialize Firestore values that JSON does not know."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+class Purger:
+    """
+    Finds, archives and deletes expired soft-deleted documents.
+    """
+    
+    def __init__(self, db: DatabaseService, args, archive_path: Optional[str]):
+        """
+        Initialize purger.
+        
+        Args:
+            db: Database service
+            args: Parsed command line arguments
+            archive_path: NDJSON archive file (None to skip archiving)
+        """
+        self.db = db
+        self.backend = db.backend
+        self.dry_run = args.dry_run
+        self.batch_size = min(args.batch_size, DEFAULT_PURGE_BATCH_SIZE)
+        self.max_ops = args.max_ops
+        self.archive_path = archive_path
+        self.archived_bytes = 0
+        self.stats: Dict[str, Dict[str, int]] = {}
+        self._next_batch_at = 0.0
+        self._lock = threading.Lock()
+    
+    def _stats(self, collection: str) -> Dict[str, int]:
+        return self.stats.setdefault(collection, {"purged": 0, "skipped": 0, "failed": 0, "bytes": 0})
+    
+    def _pace(self, operations: int):
+        """Sleep so batches stay under max_ops deletes per second."""
+        if self.max_ops <= 0:
+            return
+        now = time.monotonic()
+        if now < self._next_batch_at:
+            time.sleep(self._next_batch_at - now)
+        self._next_batch_at = max(now, self._next_batch_at) + operations / self.max_ops
+    
+    def _archive(self, items: List[PurgeItem]):
+        """Append documents to the archive and sync it before they are deleted."""
+        if not self.archive_path:
+            return
+        with open(self.archive_path, "a") as f:
+            for collection, doc, _ in items:
+                line = json.dumps({"_collection": collection, "_id": doc.id, **doc.data}, default=_json_default)
+                f.write(line + "\n")
+                self.archived_bytes += len(line) + 1
+            f.flush()
+            os.fsync(f.fileno())
+    
+    def _delete(self, items: List[PurgeItem]):
+        """
+        Delete one batch, recording purged/skipped/failed per collection.
+        
+        Each delete is independent: a document that changed since it was
+        read (e.g. restored) fails its precondition and is skipped without
+        affecting the rest of the batch.
+        """
+        for collection, doc, _ in items:
+            # Rough document size: what every unfiltered read of it was paying for
+            self._stats(collection)["bytes"] += len(json.dumps(doc.data, default=_json_default))
+        if self.dry_run:
+            for collection, _, _ in items:
+                self._stats(collection)["purged"] += 1
+            return
+        
+        self._archive(items)
+        self._pace(len(items))
+        
+        if self.db.db is None:
+            for collection, doc, check in items:
+                try:
+                    deleted = self.backend.delete(collection, doc.id, doc.update_time if check else None)
+                    self._stats(collection)["purged" if deleted else "skipped"] += 1
+                except DocumentConflictError:
+                    self._stats(collection)["skipped"] += 1
+                except Exception as e:
+                    print(f"   ❌ {collection}/{doc.id}: {e}")
+                    self._stats(collection)["failed"] += 1
+            return
+        
+        client = self.db.db
+        writer = client.bulk_writer()
+        collections = {}
+        
+        def on_result(reference, result, bulk_writer):
+            with self._lock:
+                self._stats(collections[reference.path])["purged"] += 1
+        
+        def on_error(error) -> bool:
+            if error.code in RETRYABLE_CODES and error.attempts < MAX_DELETE_ATTEMPTS:
+                return True
+            path = error.operation.reference.path
+            with self._lock:
+                if error.code == FAILED_PRECONDITION:
+                    self._stats(collections[path])["skipped"] += 1
+                else:
+                    print(f"   ❌ {path}: {error.message}")
+                    self._stats(collections[path])["failed"] += 1
+            return False
+        
+        writer.on_write_result(on_result)
+        writer.on_write_error(on_error)
+        for collection, doc, check in items:
+            reference = client.collection(collection).document(doc.id)
+            collections[reference.path] = collection
+            option = client.write_option(last_update_time=doc.update_time) if check else None
+            writer.delete(reference, option=option)
+        writer.close()
+    
+    def _scan(self, collection: str, filters: List[tuple], order_by: Optional[str] = None):
+        """
+        Page through matching documents with a cursor.
+        
+        Yields:
+            Stored documents (with update time)
+        """
+        cursor = None
+        while True:
+            page = list(self.backend.stream(
+                collection, filters, order_by=order_by, limit=self.batch_size,
+                start_after=cursor, order_by_id=True
+            ))
+            yield from page
+            if len(page) < self.batch_size:
+                return
+            last = page[-1]
+            cursor = ([last.data.get(order_by)] if order_by else []) + [last.id]
+    
+    def _dependents(self, asset_id: str) -> List[PurgeItem]:
+        """Movements and summaries of an asset (deleted unconditionally)."""
+        items = []
+        for collection in ASSET_DEPENDENTS:
+            for doc in self._scan(collection, [(MOVEMENT_ASSET_ID_FIELD, "==", asset_id)]):
+                items.append((collection, doc, False))
+        return items
+    
+    def purge(self, collection: str, cutoff: datetime):
+        """
+        Purge one collection's documents soft-deleted before the cutoff.
+        
+        Dependents are deleted in the batches before their asset, so an
+        interrupted run never leaves orphans behind a purged asset.
+        
+        Args:
+            collection: Collection name
+            cutoff: Purge documents with deletedAt earlier than this
+        """
+        self._stats(collection)
+        pending: List[PurgeItem] = []
+        
+        def flush():
+            nonlocal pending
+            for i in range(0, len(pending), self.batch_size):
+                self._delete(pending[i:i + self.batch_size])
+            pending = []
+        
+        for doc in self._scan(collection, [(DELETED_AT_FIELD, "<", cutoff)], order_by=DELETED_AT_FIELD):
+            if collection == COLLECTION_ASSETS:
+                pending.extend(self._dependents(doc.id))
+            pending.append((collection, doc, True))
+            if len(pending) >= self.batch_size:
+                flush()
+        flush()
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Hard-delete documents soft-deleted longer than the retention period")
+    parser.add_argument("collections", nargs="*", help="Collections to purge (default: assets movements)")
+    parser.add_argument("--retention-days", type=float, help=f"Days a soft-deleted document is kept (default: config or {DEFAULT_PURGE_RETENTION_DAYS})")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_PURGE_BATCH_SIZE, help="Documents per delete batch (max 500)")
+    parser.add_argument("--max-ops", type=float, default=DEFAULT_PURGE_MAX_OPS, help="Max deletes per second (0 = unlimited)")
+    parser.add_argument("--archive", help="Append purged documents to this NDJSON file before deleting")
+    parser.add_argument("--dry-run", action="store_true", help="Only count what would be purged")
+    args = parser.parse_args()
+    
+    env = os.getenv("ENV", "dev")
+    config = load_config("purge-script")
+    retention_days = args.retention_days
+    if retention_days is None:
+        retention_days = config.get("database", {}).get("purge_retention_days", DEFAULT_PURGE_RETENTION_DAYS)
+    cutoff = datetime.now(timezone.utc) - timedelta(days=retention_days)
+    collections = args.collections or [COLLECTION_ASSETS, COLLECTION_MOVEMENTS]
+    
+    print(f"🧹 Purging documents soft-deleted before {cutoff.isoformat()} ({retention_days:g} days) "
+          f"for environment: {env.upper()}{' (dry run)' if args.dry_run else ''}")
+    
+    db = DatabaseService(config)
+    purger = Purger(db, args, None if args.dry_run else args.archive)
+    started = time.monotonic()
+    
+    for collection in collections:
+        try:
+            purger.purge(collection, cutoff)
+        except Exception as e:
+            print(f"   ❌ Error purging '{collection}': {e}")
+    
+    elapsed = time.monotonic() - started
+    verb = "would purge" if args.dry_run else "purged"
+    purged = 0
+    size = 0
+    for collection, stats in purger.stats.items():
+        purged += stats["purged"]
+        size += stats["bytes"]
+        line = f"   ✅ '{collection}': {verb} {stats['purged']:,}"
+        if stats["skipped"] or stats["failed"]:
+            line += f", skipped {stats['skipped']:,} (changed since read), failed {stats['failed']:,}"
+        print(line)
+    
+    # Each purged document was read by every scan that does not filter deleted documents server-side
+    cost = purged / 100_000 * FIRESTORE_READ_COST_PER_100K * 1000
+    print(f"\n📉 Documents removed: {purged:,} (~{size / 1024:,.1f} KiB) in {elapsed:.1f}s")
+    print(f"   Reads removed per unfiltered full scan: {purged:,} (~${cost:,.2f} per 1,000 scans)")
+    if purger.archive_path:
+        print(f"   Archived {purger.archived_bytes / 1024:,.1f} KiB to {purger.archive_path}")
+    
+    print(f"\n✅ Purge complete for {env.upper()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+"""
+Migration Runner.
+
+Applies a migration function to every document of a collection with
+parallel workers: partitioned, paged reads and BulkWriter writes, a global
+write rate limit, local checkpoints for resuming, and a throughput/failure
+summary.
+
+A migration is a Python file defining COLLECTION and migrate(doc), which
+returns the fields to update (field paths allowed) or None to leave the
+document unchanged:
+
+    # migrations/add_currency.py
+    COLLECTION = "movements"
+
+    def migrate(doc):
+        if "currency" in doc:
+            return None
+        return {"currency": "BRL"}
+
+migrate() may run more than once for a document when a run is resumed, so
+it must be idempotent.
+
+Usage:
+    ENV=dev python apps/api/utils/scripts/run_migration.py migrations/add_currency.py --dry-run
+    ENV=prod python apps/api/utils/scripts/run_migration.py migrations/add_currency.py --workers 8 --max-ops 500
+    ENV=prod python apps/api/utils/scripts/run_migration.py migrations/add_currency.py --resume
+"""
+import argparse
+import importlib.util
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Any, Optional, List, Callable
+
+# Add project root to python path
+# Script is at: apps/api/utils/scripts/run_migration.py
+# Root is 4 levels up
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, "../../../../"))
+sys.path.append(project_root)
+# Also add apps/api to path so internal imports work
+sys.path.append(os.path.join(project_root, "apps", "api"))
+
+from apps.api.configs.loader import load_config
+from apps.api.services.database import DatabaseService
+from apps.api.utils.partitions import Checkpoint, create_source
+
+CHECKPOINT_DIR = ".migrations"
+MAX_WRITE_ATTEMPTS = 5
+MAX_REPORTED_FAILURES = 20
+
+
+class RateLimiter:
+    """
+    Token bucket shared by all workers (operations per second).
+    """
+    
+    def __init__(self, rate: float):
+        """
+        Initialize limiter.
+        
+        Args:
+            rate: Operations per second (0 disables limiting)
+        """
+        self.rate = rate
+        self._tokens = rate
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self):
+        """Block until one operation is allowed."""
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.rate, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class FailureLog:
+    """
+    Thread-safe NDJSON log of documents the migration could not apply.
+    """
+    
+    def __init__(self, path: Optional[str]):
+        """
+        Initialize log.
+        
+        Args:
+            path: NDJSON file (None keeps failures in memory only)
+        """
+        self.path = path
+        self.recent: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+    
+    def add(self, path: str, error: str):
+        """Record a failed document."""
+        record = {"path": path, "error": error, "ts": time.time()}
+        with self._lock:
+            if len(self.recent) < MAX_REPORTED_FAILURES:
+                self.recent.append(record)
+            if self.path:
+                with open(self.path, "a") as f:
+                    f.write(json.dumps(record) + "\n")
+
+
+class DocumentWriter:
+    """
+    Per-worker writer: a BulkWriter on Firestore, direct updates on local backends.
+    
+    flush() blocks until every queued update has been written or has
+    failed for good, so checkpoints never get ahead of the data.
+    """
+    
+    def __init__(self, db: DatabaseService, collection: str, max_ops: float, failures: FailureLog):
+        """
+        Initialize writer.
+        
+        Args:
+            db: Database service
+            collection: Collection name (local backends)
+            max_ops: BulkWriter ops/s ceiling for this worker (0 for no ceiling)
+            failures: Failure log
+        """
+        self.db = db
+        self.collection = collection
+        self.failures = failures
+        self.failed = 0
+        self._lock = threading.Lock()
+        self.bulk_writer = None
+        
+        if db.db is not None:
+            from google.cloud.firestore_v1.bulk_writer import BulkWriterOptions
+            options = BulkWriterOptions(
+                initial_ops_per_second=min(max_ops, 500) if max_ops else 500,
+                max_ops_per_second=max_ops or None
+            )
+            self.bulk_writer = db.db.bulk_writer(options=options)
+            self.bulk_writer.on_write_error(self._on_write_error)
+    
+    def _on_write_error(self, error) -> bool:
+        """BulkWriter error callback: retry transient errors, record the rest."""
+        if error.attempts < MAX_WRITE_ATTEMPTS and error.code in (4, 8, 10, 13, 14):
+            # DEADLINE_EXCEEDED, RESOURCE_EXHAUSTED, ABORTED, INTERNAL, UNAVAILABLE
+            return True
+        with self._lock:
+            self.failed += 1
+        self.failures.add(error.operation.reference.path, f"{error.code}: {error.message}")
+        return False
+    
+    def update(self, path: str, document_id: str, updates: Dict[str, Any]):
+        """Queue (Firestore) or apply (local) an update."""
+        if self.bulk_writer is not None:
+            self.bulk_writer.update(self.db.db.document(path), updates)
+            return
+        try:
+            self.db.backend.update(self.collection, document_id, updates)
+        except Exception as e:
+            with self._lock:
+                self.failed += 1
+            self.failures.add(path, f"{type(e).__name__}: {e}")
+    
+    def flush(self) -> int:
+        """
+        Wait for queued writes.
+        
+        Returns:
+            Writes that failed since the last flush
+        """
+        if self.bulk_writer is not None:
+            self.bulk_writer.flush()
+        with self._lock:
+            failed, self.failed = self.failed, 0
+        return failed
+    
+    def close(self):
+        """Flush and release the writer."""
+        if self.bulk_writer is not None:
+            self.bulk_writer.close()
+
+
+def load_migration(path: str):
+    """
+    Load a migration file.
+    
+    Args:
+        path: Path to a Python file defining COLLECTION and migrate(doc)
+    
+    Returns:
+        Loaded module
+    
+    Raises:
+        ValueError: If the file does not define migrate()
+    """
+    spec = importlib.util.spec_from_file_location("migration", path)
+    if spec is None:
+        raise ValueError(f"Cannot load migration '{path}'")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    if not callable(getattr(module, "migrate", None)):
+        raise ValueError(f"Migration '{path}' must define migrate(doc)")
+    return module
+
+
+def run_partition(
+    db: DatabaseService,
+    source,
+    checkpoint: Checkpoint,
+    index: int,
+    migrate: Callable[[Dict[str, Any]], Optional[Dict[str, Any]]],
+    limiter: RateLimiter,
+    failures: FailureLog,
+    args,
+    samples: List[Dict[str, Any]]
+):
+    """
+    Migrate one partition page by page, checkpointing after each flushed page.
+    
+    Args:
+        db: Database service
+        source: Scan source (see utils/partitions.py)
+        checkpoint: Run checkpoint
+        index: Partition index
+        migrate: Migration function
+        limiter: Shared write rate limiter
+        failures: Failure log
+        args: Parsed command line arguments
+        samples: Dry-run sample updates (appended to)
+    """
+    progress = checkpoint.partition(index)
+    writer = None if args.dry_run else DocumentWriter(db, source.collection, args.max_ops / args.workers, failures)
+    counts = {"scanned": 0, "updated": 0, "unchanged": 0, "failed": 0}
+    last_path = progress.get("last")
+    
+    def commit_page():
+        nonlocal counts
+        if writer is not None:
+            failed = writer.flush()
+            counts["failed"] += failed
+            counts["updated"] -= failed
+        checkpoint.add(index, **counts)
+        checkpoint.update(index, last=last_path)
+        counts = {"scanned": 0, "updated": 0, "unchanged": 0, "failed": 0}
+    
+    try:
+        for doc_id, path, data in source.stream(progress.get("start"), progress.get("end"), progress.get("last")):
+            counts["scanned"] += 1
+            last_path = path
+            try:
+                updates = migrate({"id": doc_id, **data})
+            except Exception as e:
+                counts["failed"] += 1
+                failures.add(path, f"migrate() raised {type(e).__name__}: {e}")
+                continue
+            
+            if not updates:
+                counts["unchanged"] += 1
+            elif args.dry_run:
+                counts["updated"] += 1
+                if len(samples) < args.samples:
+                    samples.append({"path": path, "updates": updates})
+            else:
+                limiter.acquire()
+                writer.update(path, doc_id, updates)
+                counts["updated"] += 1
+            
+            if counts["scanned"] >= args.page_size:
+                commit_page()
+        
+        commit_page()
+        checkpoint.update(index, done=True)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Run a document migration across a collection")
+    parser.add_argument("migration", help="Migration file defining COLLECTION and migrate(doc)")
+    parser.add_argument("--collection", help="Override the migration's COLLECTION")
+    parser.add_argument("--partitions", type=int, default=16, help="Partitions requested")
+    parser.add_argument("--workers", type=int, default=4, help="Partitions migrated concurrently")
+    parser.add_argument("--page-size", type=int, default=500, help="Documents per read page and checkpoint")
+    parser.add_argument("--max-ops", type=float, default=500, help="Max writes per second across workers (0 = unlimited)")
+    parser.add_argument("--dry-run", action="store_true", help="Compute updates without writing")
+    parser.add_argument("--samples", type=int, default=5, help="Updates to print in dry-run mode")
+    parser.add_argument("--resume", action="store_true", help="Continue from the local checkpoint")
+    parser.add_argument("--checkpoint-dir", default=CHECKPOINT_DIR, help="Where checkpoints and failure logs go")
+    args = parser.parse_args()
+    
+    module = load_migration(args.migration)
+    collection = args.collection or getattr(module, "COLLECTION", None)
+    if not collection:
+        print("❌ No collection: define COLLECTION in the migration or pass --collection")
+        sys.exit(1)
+    
+    env = os.getenv("ENV", "dev")
+    name = os.path.splitext(os.path.basename(args.migration))[0]
+    print(f"🔧 Migration '{name}' on '{collection}' for environment: {env.upper()}{' (dry run)' if args.dry_run else ''}")
+    
+    config = load_config("migration-runner")
+    db = DatabaseService(config)
+    source = create_source(db, collection, page_size=args.page_size)
+    
+    # Dry runs never touch the real checkpoint
+    checkpoint_dir = tempfile.mkdtemp() if args.dry_run else os.path.join(args.checkpoint_dir, env)
+    checkpoint_path = os.path.join(checkpoint_dir, f"{name}.{collection}.json")
+    failures = FailureLog(None if args.dry_run else os.path.join(checkpoint_dir, f"{name}.{collection}.failures.ndjson"))
+    
+    checkpoint = Checkpoint.load(checkpoint_path) if args.resume else None
+    if checkpoint is None:
+        if os.path.exists(checkpoint_path) and not args.dry_run:
+            print(f"❌ A checkpoint exists at {checkpoint_path}. Pass --resume to continue it or delete it to start over.")
+            sys.exit(1)
+        checkpoint = Checkpoint.create(checkpoint_path, source.partitions(args.partitions), migration=name, collection=collection)
+    
+    pending = checkpoint.pending()
+    print(f"   {len(checkpoint.state['partitions'])} partitions, {len(pending)} to run, {args.workers} workers")
+    
+    limiter = RateLimiter(args.max_ops)
+    samples: List[Dict[str, Any]] = []
+    scanned_before = checkpoint.total("scanned")
+    started = time.monotonic()
+    
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        futures = [
+            executor.submit(run_partition, db, source, checkpoint, i, module.migrate, limiter, failures, args, samples)
+            for i in pending
+        ]
+        errors = []
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except Exception as e:
+                errors.append(e)
+    
+    elapsed = time.monotonic() - started
+    scanned = checkpoint.total("scanned") - scanned_before
+    verb = "Would update" if args.dry_run else "Updated"
+    
+    print(f"\n📊 Summary ({elapsed:.1f}s, {scanned / elapsed if elapsed else 0:,.0f} docs/s this run)")
+    print(f"   Scanned:   {checkpoint.total('scanned'):,}")
+    print(f"   {verb}: {checkpoint.total('updated'):,}")
+    print(f"   Unchanged: {checkpoint.total('unchanged'):,}")
+    print(f"   Failed:    {checkpoint.total('failed'):,}")
+    
+    for sample in samples:
+        print(f"   ↳ {sample['path']}: {json.dumps(sample['updates'], default=str)}")
+    for failure in failures.recent:
+        print(f"   ❌ {failure['path']}: {failure['error']}")
+    if failures.path and failures.recent:
+        print(f"   Failures logged to {failures.path}")
+    
+    if errors:
+        print(f"\n❌ {len(errors)} partitions stopped with errors (rerun with --resume): {errors[0]}")
+        sys.exit(1)
+    print(f"\n✅ Migration '{name}' complete for {env.upper()}")
+
+
+if __name__ == "__main__":
+    main()
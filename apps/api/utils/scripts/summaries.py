@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Summaries Maintenance Script.
+
+Rebuilds the summaries collection from movements (repair) or checks the
+materialized summaries against a full recomputation.
+
+Usage:
+    ENV=dev python apps/api/utils/scripts/summaries.py check
+    ENV=dev python apps/api/utils/scripts/summaries.py rebuild
+    ENV=prod python apps/api/utils/scripts/summaries.py rebuild --asset <asset_id>
+"""
+import sys
+import os
+
+# Add project root to python path
+# Script is at: apps/api/utils/scripts/summaries.py
+# Root is 4 levels up
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, "../../../../"))
+sys.path.append(project_root)
+# Also add apps/api to path so internal imports work
+sys.path.append(os.path.join(project_root, "apps", "api"))
+
+from apps.api.configs.loader import load_config
+from apps.api.services.summaries import SummaryService
+from apps.api.utils.logger import Logger
+
+MAX_REPORTED_MISMATCHES = 20
+
+
+def main():
+    env = os.getenv("ENV", "dev")
+    args = sys.argv[1:]
+    command = args[0] if args else None
+    asset_id = args[args.index("--asset") + 1] if "--asset" in args and args.index("--asset") + 1 < len(args) else None
+    
+    if command not in ("check", "rebuild"):
+        print(__doc__)
+        sys.exit(1)
+    
+    scope = f"asset {asset_id}" if asset_id else "all assets"
+    print(f"📊 Summaries {command} for environment: {env.upper()} ({scope})")
+    
+    config = load_config("summaries-script")
+    logger = Logger("summaries-script", "summaries")
+    service = SummaryService(config, logger)
+    
+    if command == "rebuild":
+        stats = service.rebuild(asset_id)
+        print(f"   ✅ Written {stats['written']}, removed {stats['deleted']} stale summaries")
+        return
+    
+    report = service.check(asset_id)
+    if report["consistent"]:
+        print(f"   ✅ {report['checked']} summaries consistent")
+        return
+    
+    print(f"   ❌ {len(report['mismatches'])} mismatches in {report['checked']} summaries:")
+    for mismatch in report["mismatches"][:MAX_REPORTED_MISMATCHES]:
+        print(f"      {mismatch['id']} {mismatch['field'] or ''}: "
+              f"materialized={mismatch['materialized']} expected={mismatch['expected']}")
+    print("\n   Run with 'rebuild' to repair.")
+    sys.exit(2)
+
+
+if __name__ == "__main__":
+    main()
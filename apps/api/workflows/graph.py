@@ -0,0 +1,308 @@
+"""
+Step graphs: workflows declared as named steps with dependencies.
+
+A monolithic execute() runs independent reads (asset, its movements, its
+summary) one after another. A StepGraph declares each step and the steps it
+needs; steps whose dependencies are done run concurrently on a shared thread
+pool, so the workflow takes as long as its slowest chain:
+
+    from workflows.graph import StepGraph
+
+    graph = StepGraph("get_asset_overview")
+
+    @graph.step()
+    def asset(ctx):
+        asset = DatabaseService(ctx.config, ctx.logger).get(COLLECTION_ASSETS, ctx.data["assetId"])
+        if not asset:
+            return error_response(error="not_found", message=ErrorMessages.ASSET_NOT_FOUND)
+        return asset
+
+    @graph.step()
+    def movements(ctx):
+        return DatabaseService(ctx.config, ctx.logger).query(COLLECTION_MOVEMENTS, [("assetId", "==", ctx.data["assetId"])])
+
+    @graph.step(depends_on=["asset", "movements"])
+    def response(ctx, asset, movements):
+        return success_response({"asset": asset, "movements": movements})
+
+    execute = graph.execute
+
+Each step receives a StepContext and the outputs of its dependencies as
+keyword arguments. The workflow's response is the output of the `result`
+step (by default the only step nothing depends on). A step returning an
+error_response() ends the workflow with that response; steps not started
+yet are skipped. Timings of every step are logged under module "steps".
+
+Steps run on pool threads, so they must not start another step graph
+(the pool could run out of threads waiting on itself).
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from typing import Dict, Any, Optional, List, Callable, Tuple
+from utils.deadline import Deadline, DeadlineExceededError, get_deadline
+from utils.logger import Logger
+from utils.constants import WORKFLOW_STEP_WORKERS
+
+# Shared by every graph; threads are started on first use
+_step_executor = ThreadPoolExecutor(max_workers=WORKFLOW_STEP_WORKERS, thread_name_prefix="workflow-step")
+
+
+def is_error_response(result: Any) -> bool:
+    """Whether a step output is an error_response() (ends the workflow)."""
+    return isinstance(result, dict) and result.get("success") is False and "error" in result
+
+
+class StepContext:
+    """
+    Request inputs shared by every step of a run.
+    """
+    
+    def __init__(self, data: Dict[str, Any], config: Dict[str, Any], logger: Optional[Logger]):
+        """
+        Initialize context.
+        
+        Args:
+            data: Workflow input
+            config: Project configuration
+            logger: Logger instance
+        """
+        self.data = data
+        self.config = config
+        self.logger = logger
+        self.deadline: Optional[Deadline] = get_deadline(config)
+
+
+class Step:
+    """
+    A named step: a function and the steps whose outputs it needs.
+    """
+    
+    __slots__ = ("name", "fn", "depends_on")
+    
+    def __init__(self, name: str, fn: Callable[..., Any], depends_on: List[str]):
+        self.name = name
+        self.fn = fn
+        self.depends_on = depends_on
+
+
+class StepGraph:
+    """
+    A workflow built from steps; independent steps run concurrently.
+    """
+    
+    def __init__(self, name: Optional[str] = None, result: Optional[str] = None):
+        """
+        Initialize graph.
+        
+        Args:
+            name: Workflow name for logs
+            result: Step whose output is the workflow response (defaults to
+                the only step no other step depends on)
+        """
+        self.name = name
+        self.result = result
+        self.steps: Dict[str, Step] = {}
+        self._result: Optional[str] = None
+    
+    def add_step(self, name: str, fn: Callable[..., Any], depends_on: Optional[List[str]] = None) -> Step:
+        """
+        Register a step.
+        
+        Args:
+            name: Step name (also the keyword its output is passed as)
+            fn: Called as fn(ctx, **outputs of depends_on)
+            depends_on: Names of the steps it needs
+        
+        Returns:
+            Step
+        
+        Raises:
+            ValueError: If a step with that name exists
+        """
+        if name in self.steps:
+            raise ValueError(f"Step '{name}' is already defined")
+        step = self.steps[name] = Step(name, fn, list(depends_on or []))
+        self._result = None
+        return step
+    
+    def step(self, name: Optional[str] = None, depends_on: Optional[List[str]] = None):
+        """
+        Decorator registering a function as a step (named after the function by default).
+        
+        Args:
+            name: Step name
+            depends_on: Names of the steps it needs
+        """
+        def decorator(fn: Callable[..., Any]) -> Callable[..., Any]:
+            self.add_step(name or fn.__name__, fn, depends_on)
+            return fn
+        return decorator
+    
+    def validate(self) -> str:
+        """
+        Check dependencies and pick the result step.
+        
+        Returns:
+            Name of the result step
+        
+        Raises:
+            ValueError: If a dependency is unknown, the steps form a cycle or
+                the result step is ambiguous
+        """
+        if self._result is not None:
+            return self._result
+        if not self.steps:
+            raise ValueError("Step graph has no steps")
+        for step in self.steps.values():
+            unknown = [dependency for dependency in step.depends_on if dependency not in self.steps]
+            if unknown:
+                raise ValueError(f"Step '{step.name}' depends on unknown steps: {', '.join(unknown)}")
+        
+        # Kahn's algorithm: every step must become runnable
+        pending = {name: len(step.depends_on) for name, step in self.steps.items()}
+        runnable = [name for name, count in pending.items() if count == 0]
+        visited = 0
+        while runnable:
+            name = runnable.pop()
+            visited += 1
+            for dependent in self._dependents(name):
+                pending[dependent] -= 1
+                if pending[dependent] == 0:
+                    runnable.append(dependent)
+        if visited < len(self.steps):
+            cycle = sorted(name for name, count in pending.items() if count > 0)
+            raise ValueError(f"Steps form a cycle: {', '.join(cycle)}")
+        
+        if self.result is not None:
+            if self.result not in self.steps:
+                raise ValueError(f"Result step '{self.result}' is not defined")
+            result = self.result
+        else:
+            sinks = [name for name in self.steps if not self._dependents(name)]
+            if len(sinks) != 1:
+                raise ValueError(f"Several steps could be the result ({', '.join(sinks)}): pass result=")
+            result = sinks[0]
+        self._result = result
+        return result
+    
+    def _dependents(self, name: str) -> List[str]:
+        """Steps that depend on a step."""
+        return [step.name for step in self.steps.values() if name in step.depends_on]
+    
+    @staticmethod
+    def _call(step: Step, ctx: StepContext, inputs: Dict[str, Any]) -> Tuple[Any, float]:
+        """Run a step, returning (output, milliseconds)."""
+        started = time.perf_counter()
+        output = step.fn(ctx, **inputs)
+        return output, (time.perf_counter() - started) * 1000
+    
+    def run(self, data: Dict[str, Any], config: Dict[str, Any], logger: Optional[Logger] = None) -> Dict[str, Any]:
+        """
+        Run every step, returning all outputs.
+        
+        Stops early when a step returns an error_response(): steps not
+        started yet are skipped and missing from the outputs.
+        
+        Args:
+            data: Workflow input
+            config: Project configuration
+            logger: Logger instance
+        
+        Returns:
+            Step name -> output, for the steps that ran
+        
+        Raises:
+            DeadlineExceededError: If the request deadline ran out between steps
+            Exception: Whatever a step raised (remaining steps are skipped)
+        """
+        self.validate()
+        ctx = StepContext(data, config, logger)
+        steps_logger = logger.for_module("steps") if logger else None
+        
+        outputs: Dict[str, Any] = {}
+        timings: Dict[str, float] = {}
+        waiting = {name: set(step.depends_on) for name, step in self.steps.items()}
+        ready = [name for name, dependencies in waiting.items() if not dependencies]
+        running: Dict[Future, str] = {}
+        failed_step = None
+        stopped_by = None
+        started = time.perf_counter()
+        
+        try:
+            while ready or running:
+                if ready and ctx.deadline:
+                    ctx.deadline.check(operation=f"workflow step '{ready[0]}'")
+                
+                completed = []
+                if len(ready) == 1 and not running:
+                    # Nothing to overlap with: run in this thread
+                    name = ready.pop()
+                    step = self.steps[name]
+                    failed_step = name
+                    completed.append((name, self._call(step, ctx, {d: outputs[d] for d in step.depends_on})))
+                    failed_step = None
+                else:
+                    for name in ready:
+                        step = self.steps[name]
+                        running[_step_executor.submit(self._call, step, ctx, {d: outputs[d] for d in step.depends_on})] = name
+                    ready = []
+                    timeout = ctx.deadline.timeout(operation="workflow steps") if ctx.deadline else None
+                    done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+                    if not done:
+                        raise DeadlineExceededError(f"Timed out waiting for workflow steps: {', '.join(sorted(running.values()))}")
+                    for future in done:
+                        failed_step = running.pop(future)
+                        completed.append((failed_step, future.result()))
+                    failed_step = None
+                
+                for name, (output, ms) in completed:
+                    outputs[name] = output
+                    timings[name] = round(ms, 1)
+                    if is_error_response(output):
+                        stopped_by = name
+                        return outputs
+                    for dependent in self._dependents(name):
+                        waiting[dependent].discard(name)
+                        if not waiting[dependent]:
+                            ready.append(dependent)
+            return outputs
+        except Exception as e:
+            if steps_logger and failed_step:
+                steps_logger.error(f"Step '{failed_step}' failed", error=e, data={"workflow": self.name})
+            raise
+        finally:
+            # Steps already running finish in the background; their outputs are discarded
+            for future in running:
+                future.cancel()
+            if steps_logger:
+                summary: Dict[str, Any] = {
+                    "workflow": self.name,
+                    "steps_ms": timings,
+                    "total_ms": round((time.perf_counter() - started) * 1000, 1),
+                    "sequential_ms": round(sum(timings.values()), 1),
+                }
+                if stopped_by:
+                    summary["stopped_by"] = stopped_by
+                unfinished = [name for name in self.steps if name not in outputs]
+                if unfinished:
+                    summary["unfinished"] = unfinished
+                steps_logger.info("Workflow steps finished", summary)
+    
+    def execute(self, data: Dict[str, Any], config: Dict[str, Any], logger: Optional[Logger] = None) -> Dict[str, Any]:
+        """
+        Run the graph as a workflow: `execute = graph.execute` in the module.
+        
+        Args:
+            data: Workflow input
+            config: Project configuration
+            logger: Logger instance
+        
+        Returns:
+            Output of the result step, or the error_response() that stopped the run
+        """
+        result = self.validate()
+        outputs = self.run(data, config, logger)
+        for output in outputs.values():
+            if is_error_response(output):
+                return output
+        return outputs[result]